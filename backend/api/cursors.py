@@ -0,0 +1,36 @@
+import base64
+import binascii
+import hashlib
+import json
+from typing import Optional, Tuple
+
+def view_digest(*filters: object) -> str:
+    """Short digest of the filters of a news view, so a cursor only applies to the view it came from"""
+    return hashlib.sha1(json.dumps(filters).encode('utf-8')).hexdigest()[:8]
+
+def encode_cursor(version: int, view: str) -> str:
+    """
+    Build the opaque cursor returned with a news response
+
+    Args:
+        version: Snapshot version the response was built from
+        view: Digest of the view's filters
+
+    Returns:
+        URL-safe token
+    """
+    payload = json.dumps({"v": version, "q": view}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).rstrip(b'=').decode('ascii')
+
+def decode_cursor(cursor: str) -> Optional[Tuple[int, str]]:
+    """
+    Read a cursor sent back by a client
+
+    Returns:
+        (snapshot version, view digest), or None if the cursor is malformed
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return int(payload["v"]), str(payload["q"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        return None
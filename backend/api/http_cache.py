@@ -0,0 +1,215 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import parse_qs
+
+from fastapi.responses import JSONResponse
+
+from config import Config
+from utils.article_store import ArticleStore
+from utils.encoding import choose_encoding, compress, dumps, supported_encodings
+
+# GET routes under /api/v1/news whose responses only depend on the snapshot and the URL
+SNAPSHOT_ROUTES = ("latest", "category/", "source/", "search", "summary", "trending")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded by utils.encoding.dumps, with orjson when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class EncodedResponse(NamedTuple):
+    """A response body encoded once, with its precompressed variants"""
+    body: bytes
+    media_type: bytes
+    variants: Dict[str, bytes]  # content coding -> compressed body
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held, for the cache's memory accounting"""
+        return len(self.body) + sum(len(variant) for variant in self.variants.values())
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """
+    Check an If-None-Match header against the ETags of a resource
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so
+    W/"1" matches "1", and "*" matches any ETag.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.replace('W/', '', 1) in etags:
+            return True
+    return False
+
+def content_etag(content: Any) -> str:
+    """Strong ETag of a JSON-serializable value that never changes while the process runs"""
+    payload = json.dumps(content, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return '"' + hashlib.sha1(payload).hexdigest()[:16] + '"'
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag of one content coding of a response; strong ETags differ per coding"""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+def store_state(store: ArticleStore) -> str:
+    """'fresh' or 'stale', as the 'stale' field of responses built from the store's snapshot says"""
+    return 'fresh' if store.fresh_ttl() is not None else 'stale'
+
+class SnapshotCacheMiddleware:
+    """
+    Validators, freshness headers and encoded-once bodies for responses built from the news snapshot
+
+    Such a response only changes when a new snapshot is published or the
+    current one goes stale, so the snapshot version and that state make its
+    ETag, and it is fresh for as long as the snapshot is fresh in the cache.
+    A request whose If-None-Match holds the current ETag gets a 304, without
+    running the route once its 200 response for that URL is cached.
+
+    The first response for a URL and snapshot is kept in the snapshot's
+    cache as bytes, along with its gzip and brotli variants. Later requests
+    get one of those as is, picked by Accept-Encoding, without the route
+    running or anything being serialized. A request that asks to bypass the
+    cache (use_cache=false) always runs the route, as it may wait for a new
+    snapshot.
+    """
+
+    def __init__(
+        self,
+        app,
+        store: Callable[[], ArticleStore],
+        prefix: str = "/api/v1/news/",
+        encodings: Optional[List[str]] = None,
+        min_size: Optional[int] = None
+    ):
+        """
+        Args:
+            app: ASGI app to wrap
+            store: Returns the article store the news routes read from
+            prefix: Path prefix of the news routes
+            encodings: Content codings to precompress, most preferred first, defaults to Config.RESPONSE_ENCODINGS
+            min_size: Bytes below which bodies are not compressed, defaults to Config.RESPONSE_COMPRESS_MIN_SIZE
+        """
+        self.app = app
+        self.store = store
+        self.routes = tuple(prefix + route for route in SNAPSHOT_ROUTES)
+        self.encodings = supported_encodings(encodings if encodings is not None else Config.RESPONSE_ENCODINGS)
+        self.min_size = min_size if min_size is not None else Config.RESPONSE_COMPRESS_MIN_SIZE
+
+    def _is_snapshot_route(self, scope: Dict[str, Any]) -> bool:
+        path = scope['path']
+        if scope['method'] not in ('GET', 'HEAD') or path.endswith('/stream'):
+            return False
+        return any(path == route or (route.endswith('/') and path.startswith(route)) for route in self.routes)
+
+    def _encode(self, body: bytes, media_type: bytes) -> EncodedResponse:
+        variants = {}
+        if len(body) >= self.min_size:
+            for encoding in self.encodings:
+                compressed = compress(body, encoding)
+                if len(compressed) < len(body):
+                    variants[encoding] = compressed
+        return EncodedResponse(body, media_type, variants)
+
+    def _choose_encoding(self, request_headers: Dict[bytes, bytes], encoded: EncodedResponse) -> Optional[str]:
+        accept_encoding = request_headers.get(b'accept-encoding', b'').decode('latin-1')
+        return choose_encoding(accept_encoding, [encoding for encoding in self.encodings if encoding in encoded.variants])
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self._is_snapshot_route(scope):
+            await self.app(scope, receive, send)
+            return
+
+        store = self.store()
+        snapshot = store.peek()
+        query_string = scope.get('query_string', b'').decode('latin-1')
+        bypass = parse_qs(query_string).get('use_cache', ['true'])[-1].lower() in ('false', '0', 'no', 'off')
+        if snapshot is None or bypass:
+            # The route may build or wait for a new snapshot
+            await self._run_uncached(scope, receive, send, store)
+            return
+
+        fresh_ttl = store.fresh_ttl()
+        state = 'fresh' if fresh_ttl is not None else 'stale'
+        # The body says whether the snapshot is stale, so the state is part of its tag
+        etag = f'"{store.epoch}-{snapshot.version}-{state}"'
+        cache_control = f'public, max-age={fresh_ttl or 0}'.encode('ascii')
+        request_headers = dict(scope['headers'])
+
+        key = f"response:{snapshot.version}:{state}:{scope['path']}?{query_string}"
+        encoded = store.cache.get(key)
+        encoding = self._choose_encoding(request_headers, encoded) if encoded is not None else None
+
+        if encoded is None:
+            # Validators only apply to a 200 of the route, so it runs first:
+            # invalid parameters get their 400 or 422 whatever If-None-Match says
+            encoded = await self._render(scope, receive, send, store, snapshot.version, state)
+            if encoded is None:
+                return
+            # Fresh and stale responses differ in their 'stale' flag, so each lives as long as its state
+            store.cache.set(key, encoded, expire=fresh_ttl or store.stale_ttl or 1)
+            encoding = self._choose_encoding(request_headers, encoded)
+
+        if_none_match = request_headers.get(b'if-none-match', b'').decode('latin-1')
+        if etag_matches(if_none_match, etag, *(variant_etag(etag, coding) for coding in self.encodings)):
+            await send({
+                'type': 'http.response.start',
+                'status': 304,
+                'headers': [(b'etag', variant_etag(etag, encoding).encode('ascii')), (b'cache-control', cache_control)]
+            })
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        body = encoded.variants[encoding] if encoding is not None else encoded.body
+        headers = [
+            (b'content-type', encoded.media_type),
+            (b'content-length', str(len(body)).encode('ascii')),
+            (b'etag', variant_etag(etag, encoding).encode('ascii')),
+            (b'cache-control', cache_control),
+            (b'vary', b'accept-encoding')
+        ]
+        if encoding is not None:
+            headers.append((b'content-encoding', encoding.encode('ascii')))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body if scope['method'] != 'HEAD' else b''})
+
+    async def _render(self, scope, receive, send, store: ArticleStore, version: int, state: str) -> Optional[EncodedResponse]:
+        # Run the route and keep its response. Errors, HEAD responses (no
+        # body) and responses from a snapshot published or gone stale
+        # meanwhile are passed on as they are, and None is returned
+        messages = []
+
+        async def collect(message):
+            messages.append(message)
+
+        await self.app(scope, receive, collect)
+        start = messages[0]
+        if start['status'] != 200 or scope['method'] == 'HEAD' or (store.version, store_state(store)) != (version, state):
+            for message in messages:
+                await send(message)
+            return None
+
+        body = b''.join(message.get('body', b'') for message in messages[1:])
+        media_type = dict(start.get('headers', [])).get(b'content-type', b'application/json')
+        return self._encode(body, media_type)
+
+    async def _run_uncached(self, scope, receive, send, store: ArticleStore) -> None:
+        version, state = store.version, store_state(store)
+
+        async def send_with_validators(message):
+            # Only tag the response if the snapshot neither changed nor went stale while the route ran
+            if (
+                message['type'] == 'http.response.start' and message['status'] == 200
+                and (store.version, store_state(store)) == (version, state)
+            ):
+                snapshot = store.peek()
+                if snapshot is not None:
+                    validators = [
+                        (b'etag', f'"{store.epoch}-{snapshot.version}-{state}"'.encode('ascii')),
+                        (b'cache-control', f'public, max-age={store.fresh_ttl() or 0}'.encode('ascii'))
+                    ]
+                    message = dict(message, headers=list(message.get('headers', [])) + validators)
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
@@ -1,65 +1,233 @@
 from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, Depends, Response
-from typing import List, Optional, Dict, Any
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import asyncio
+import json
 import logging
-import aiohttp
 
-from scrapers.news_scraper import NewsScraper
-from utils.cache_manager import CacheManager
+from api.cursors import decode_cursor, encode_cursor, view_digest
+from scrapers.ingestion import news_ingestor
+from utils.article_store import NewsSnapshot, flatten_news
+from utils.cache_manager import CacheResult
+from utils.date_utils import parse_published_date
+from utils.search_index import document_key
+from utils.http_client import http_client
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Initialize cache manager
-cache_manager = CacheManager()
+async def current_snapshot(use_cache: bool = True) -> CacheResult:
+    """
+    Get the news snapshot published by the ingestion scheduler
+    
+    Args:
+        use_cache: Accept a stale snapshot; if False, wait for the refresh instead
+    """
+    result = await news_ingestor.get_snapshot()
+    if result.stale and not use_cache:
+        await news_ingestor.refresh()
+        return CacheResult(news_ingestor.store.latest, False, False)
+    return result
+
+def snapshot_time(snapshot: NewsSnapshot) -> str:
+    """When a snapshot was built, as the timestamp of responses served from it"""
+    return datetime.fromtimestamp(snapshot.created_at).isoformat()
+
+def parse_time_param(value: Optional[str], name: str) -> Optional[float]:
+    """Parse a time query parameter given as epoch seconds or an ISO 8601 / RFC 822 date"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    timestamp = parse_published_date(value)
+    if timestamp is None:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {value}")
+    return timestamp
+
+def news_delta(
+    since_cursor: str,
+    view: str,
+    news_items: List[Dict[str, Any]]
+) -> Optional[Tuple[List[Dict[str, Any]], List[str], bool]]:
+    """
+    Work out what a client holding a cursor is missing from a view
+    
+    The view is compared with what the cursor's response listed, not with
+    the whole snapshot, so articles that move up into a view cut to a limit
+    are sent as added when others leave it.
+    
+    Args:
+        since_cursor: Cursor the client got with its last response
+        view: Digest of the requested view's filters
+        news_items: The view as it is now
+    
+    Returns:
+        (articles to add, keys of articles to drop, reset), None if nothing
+        changed; with reset the client replaces its articles with the ones
+        given, because the cursor is unknown, too old or for another view
+    """
+    decoded = decode_cursor(since_cursor)
+    previous = None
+    if decoded is not None and decoded[1] == view:
+        previous = news_ingestor.store.served_view(*decoded)
+    if previous is None:
+        return news_items, [], True
+    
+    previous_keys = set(previous)
+    keys = [document_key(news) for news in news_items]
+    added = [news for news, key in zip(news_items, keys) if key not in previous_keys]
+    removed = previous_keys.difference(keys)
+    if not added and not removed:
+        return None
+    return added, sorted(removed), False
 
 @router.get("/news/latest")
 async def get_latest_news(
     category: Optional[str] = Query(None, description="Filter by category: tech, programming, interview"),
     limit: int = Query(50, ge=1, le=100, description="Number of news items to return"),
     source: Optional[str] = Query(None, description="Filter by specific source"),
-    use_cache: bool = Query(True, description="Use cached results if available")
+    use_cache: bool = Query(True, description="Use cached results if available"),
+    since: Optional[str] = Query(None, description="Only news published at or after this time (epoch seconds or ISO 8601)"),
+    until: Optional[str] = Query(None, description="Only news published at or before this time (epoch seconds or ISO 8601)"),
+    since_cursor: Optional[str] = Query(None, description="Cursor of an earlier response; only return what changed since")
 ):
     """
     Get latest news from all sources or filtered by category
+    
+    Every response carries a cursor. Sent back as since_cursor, it turns the
+    response into a delta: the articles added since (in `data`) and the keys
+    of the articles removed since (in `removed`), or just `"changed": false`.
     """
+    since_ts = parse_time_param(since, "since")
+    until_ts = parse_time_param(until, "until")
+    view = view_digest(category, source, limit, since_ts, until_ts)
     try:
-        # Check cache first
-        cache_key = f"latest_news_{category}_{limit}_{source}"
-        if use_cache:
-            cached_data = cache_manager.get(cache_key)
-            if cached_data:
+        # Every filter combination is a prebuilt view of the one snapshot
+        snapshot, stale, cached = await current_snapshot(use_cache)
+        news_items = snapshot.select(category=category, source=source, since=since_ts, until=until_ts)[:limit]
+        cursor = encode_cursor(snapshot.version, view)
+        news_ingestor.store.record_view(snapshot.version, view, [document_key(news) for news in news_items])
+        
+        if since_cursor is not None:
+            delta = news_delta(since_cursor, view, news_items)
+            if delta is None:
                 return {
                     "success": True,
-                    "data": cached_data,
-                    "cached": True,
-                    "timestamp": datetime.now().isoformat()
+                    "changed": False,
+                    "cursor": cursor,
+                    "version": snapshot.version,
+                    "timestamp": snapshot_time(snapshot)
                 }
-
-        # Scrape fresh data
-        scraper = NewsScraper()
-        news_items = await scraper.get_latest_news(category=category, limit=limit)
-        
-        # Filter by source if specified
-        if source:
-            news_items = [item for item in news_items if item.get('source_name') == source]
-        
-        # Cache the results
-        cache_manager.set(cache_key, news_items, expire=1800)  # Cache for 30 minutes
+            news_items, removed, reset = delta
+            return {
+                "success": True,
+                "changed": True,
+                "reset": reset,
+                "data": news_items,
+                "removed": removed,
+                "cursor": cursor,
+                "cached": cached,
+                "stale": stale,
+                "version": snapshot.version,
+                "source_status": snapshot.source_status,
+                "count": len(news_items),
+                "timestamp": snapshot_time(snapshot)
+            }
         
         return {
             "success": True,
             "data": news_items,
-            "cached": False,
+            "cursor": cursor,
+            "cached": cached,
+            "stale": stale,
+            "version": snapshot.version,
+            "source_status": snapshot.source_status,
             "count": len(news_items),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": snapshot_time(snapshot)
         }
         
     except Exception as e:
         logger.error(f"Error fetching latest news: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch news: {str(e)}")
 
+# Content type of each streaming format
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
+def format_stream_record(record: Dict[str, Any], stream_format: str) -> str:
+    """Encode one stream record as an NDJSON line or a Server-Sent Event"""
+    payload = json.dumps(record, default=str)
+    if stream_format == "sse":
+        return f"event: {record['type']}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+async def news_stream_records(category: Optional[str], limit: int) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Produce the records of a news stream
+    
+    One 'source' record per source, then a 'summary' record. With a
+    snapshot available the sources come straight from it; otherwise they
+    are emitted as the ingestion run finishes each one.
+    """
+    remaining = limit
+    source_status = {}
+    snapshot = news_ingestor.store.peek()
+    
+    if snapshot is not None:
+        sources = (
+            (source, snapshot.select(category=category, source=source), snapshot.source_status[source])
+            for source in snapshot.sources
+        )
+        for source, news_items, status in sources:
+            source_status[source] = status
+            data = news_items[:remaining]
+            remaining -= len(data)
+            yield {"type": "source", "source": source, "status": status, "count": len(data), "data": data}
+    else:
+        async for source, news_items, status in news_ingestor.stream_sources():
+            source_status[source] = status
+            data = flatten_news({source: news_items}, category)[:remaining]
+            remaining -= len(data)
+            yield {"type": "source", "source": source, "status": status, "count": len(data), "data": data}
+        snapshot = news_ingestor.store.latest
+    
+    yield {
+        "type": "summary",
+        "count": limit - remaining,
+        "source_status": source_status,
+        "version": snapshot.version if snapshot is not None else None,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.get("/news/latest/stream")
+async def stream_latest_news(
+    category: Optional[str] = Query(None, description="Filter by category: tech, programming, interview"),
+    limit: int = Query(50, ge=1, le=100, description="Number of news items to return"),
+    stream_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$", description="ndjson or sse")
+):
+    """
+    Stream latest news source by source, as NDJSON lines or Server-Sent Events
+    """
+    async def body():
+        try:
+            async for record in news_stream_records(category, limit):
+                yield format_stream_record(record, stream_format)
+        except Exception as e:
+            # The status line is already sent, so report the failure in-band
+            logger.error(f"Error streaming latest news: {e}")
+            yield format_stream_record({"type": "error", "detail": f"Failed to fetch news: {str(e)}"}, stream_format)
+    
+    return StreamingResponse(
+        body(),
+        media_type=STREAM_MEDIA_TYPES[stream_format],
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @router.get("/news/category/{category}")
 async def get_news_by_category(
     category: str,
@@ -73,15 +241,15 @@ async def get_news_by_category(
         if category not in valid_categories:
             raise HTTPException(status_code=400, detail=f"Invalid category. Must be one of: {valid_categories}")
         
-        scraper = NewsScraper()
-        news_items = await scraper.get_latest_news(category=category, limit=limit)
+        snapshot, _, _ = await current_snapshot()
+        news_items = snapshot.select(category=category)[:limit]
         
         return {
             "success": True,
             "data": news_items,
             "category": category,
             "count": len(news_items),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": snapshot_time(snapshot)
         }
         
     except HTTPException:
@@ -106,18 +274,15 @@ async def get_news_by_source(
         if source_name not in valid_sources:
             raise HTTPException(status_code=400, detail=f"Invalid source. Must be one of: {valid_sources}")
         
-        scraper = NewsScraper()
-        all_news = await scraper.scrape_all_sources()
-        
-        news_items = all_news.get(source_name, [])
-        news_items = news_items[:limit]
+        snapshot, _, _ = await current_snapshot()
+        news_items = snapshot.select(source=source_name)[:limit]
         
         return {
             "success": True,
             "data": news_items,
             "source": source_name,
             "count": len(news_items),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": snapshot_time(snapshot)
         }
         
     except HTTPException:
@@ -128,29 +293,18 @@ async def get_news_by_source(
 
 @router.get("/news/search")
 async def search_news(
-    query: str = Query(..., description="Search query"),
+    query: str = Query(..., description='Search query: words, "quoted phrases" and prefix* words'),
     category: Optional[str] = Query(None, description="Filter by category"),
     limit: int = Query(50, ge=1, le=100, description="Number of results to return")
 ):
     """
-    Search news by keyword
+    Search news with the full-text index, best match first
     """
     try:
-        scraper = NewsScraper()
-        all_news = await scraper.get_latest_news(category=category, limit=200)  # Get more for searching
-        
-        # Simple keyword search
-        query_lower = query.lower()
-        filtered_news = []
-        
-        for news in all_news:
-            title = news.get('title', '').lower()
-            description = news.get('description', '').lower()
-            
-            if query_lower in title or query_lower in description:
-                filtered_news.append(news)
-        
-        filtered_news = filtered_news[:limit]
+        # Makes sure articles have been ingested; the index follows the newest snapshot
+        snapshot, _, _ = await current_snapshot()
+        results, total = news_ingestor.store.search_index.search(query, category=category, limit=limit)
+        filtered_news = [dict(news, score=round(score, 3)) for score, news in results]
         
         return {
             "success": True,
@@ -158,7 +312,8 @@ async def search_news(
             "query": query,
             "category": category,
             "count": len(filtered_news),
-            "timestamp": datetime.now().isoformat()
+            "total": total,
+            "timestamp": snapshot_time(snapshot)
         }
         
     except Exception as e:
@@ -171,32 +326,14 @@ async def get_news_summary():
     Get a summary of news from all sources
     """
     try:
-        scraper = NewsScraper()
-        all_news = await scraper.scrape_all_sources()
-        
-        summary = {
-            "total_sources": len(all_news),
-            "total_articles": sum(len(news_list) for news_list in all_news.values()),
-            "sources": {}
-        }
-        
-        for source, news_list in all_news.items():
-            summary["sources"][source] = {
-                "count": len(news_list),
-                "categories": {}
-            }
-            
-            # Count by category
-            for news in news_list:
-                category = news.get('category', 'unknown')
-                if category not in summary["sources"][source]["categories"]:
-                    summary["sources"][source]["categories"][category] = 0
-                summary["sources"][source]["categories"][category] += 1
+        # Counts are computed once when the snapshot is built
+        snapshot, _, _ = await current_snapshot()
+        summary = snapshot.summary
         
         return {
             "success": True,
             "data": summary,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": snapshot_time(snapshot)
         }
         
     except Exception as e:
@@ -228,14 +365,8 @@ async def refresh_cache_task():
     """
     try:
         logger.info("Starting background cache refresh...")
-        scraper = NewsScraper()
-        
-        # Refresh all categories
-        categories = ["tech", "programming", "interview"]
-        for category in categories:
-            news_items = await scraper.get_latest_news(category=category, limit=50)
-            cache_key = f"latest_news_{category}_50_None"
-            cache_manager.set(cache_key, news_items, expire=1800)
+        # One ingestion run rebuilds every category, source and summary view
+        await news_ingestor.refresh()
         
         logger.info("Background cache refresh completed")
         
@@ -246,34 +377,21 @@ async def refresh_cache_task():
 async def get_trending_news(limit: int = Query(20, ge=1, le=50)):
     """
     Get trending news based on relevance and recency
+    
+    Scores are keyword relevance decaying with age (halving every
+    TRENDING_HALF_LIFE seconds), ranked once per snapshot at ingest.
     """
     try:
-        scraper = NewsScraper()
-        all_news = await scraper.get_latest_news(limit=100)
-        
-        # Simple trending algorithm: prioritize recent news with more keywords
-        for news in all_news:
-            title = news.get('title', '').lower()
-            description = news.get('description', '').lower()
-            
-            # Count keyword matches
-            coding_keywords = scraper.coding_keywords
-            interview_keywords = scraper.interview_keywords
-            
-            coding_matches = sum(1 for keyword in coding_keywords if keyword.lower() in title + " " + description)
-            interview_matches = sum(1 for keyword in interview_keywords if keyword.lower() in title + " " + description)
-            
-            news['relevance_score'] = coding_matches + interview_matches
-        
-        # Sort by relevance score and take top results
-        trending_news = sorted(all_news, key=lambda x: x.get('relevance_score', 0), reverse=True)
-        trending_news = trending_news[:limit]
+        snapshot, _, _ = await current_snapshot()
+        trending_news = [
+            dict(news, trending_score=round(score, 4)) for score, news in snapshot.trending[:limit]
+        ]
         
         return {
             "success": True,
             "data": trending_news,
             "count": len(trending_news),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": snapshot_time(snapshot)
         }
         
     except Exception as e:
@@ -288,8 +406,8 @@ async def proxy_image(url: str = Query(..., description="URL of the image to pro
         if not url.startswith(('http://', 'https://')):
             raise HTTPException(status_code=400, detail="Invalid URL")
         
-        # Fetch image from external source
-        async with aiohttp.ClientSession() as session:
+        # Fetch image from external source through the shared client
+        async with http_client.borrow() as session:
             async with session.get(url, timeout=10) as response:
                 if response.status == 200:
                     content = await response.read()
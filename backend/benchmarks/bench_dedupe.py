@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the near-duplicate detection on a synthetic article archive
+
+Measures the batch clustering at growing archive sizes (time per article
+should stay flat), the recall on planted duplicates, and an all-pairs
+comparison for reference.
+
+Usage:
+    python benchmarks/bench_dedupe.py [--articles N] [--duplicates SHARE]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from utils.dedupe import collapse_duplicates, minhash, similarity
+
+SOURCES = ["techcrunch", "hackernews", "dev_to", "leetcode", "geeksforgeeks", "stackoverflow"]
+
+def make_articles(count: int, duplicate_share: float, seed: int = 1):
+    """
+    Random articles, a share of them an earlier story posted by another source
+
+    Like the real feeds, a repost keeps the story's title but comes with
+    the source's own description.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(20000)]
+    articles = []
+    # story -> sources that posted it
+    story_sources = []
+    for i in range(count):
+        article = None
+        if articles and rng.random() < duplicate_share:
+            original = articles[rng.randrange(len(articles))]
+            sources = [source for source in SOURCES if source not in story_sources[original['story']]]
+            if sources:
+                article = {'title': original['title'], 'source_name': rng.choice(sources), 'story': original['story']}
+                story_sources[original['story']].add(article['source_name'])
+        if article is None:
+            article = {'title': ' '.join(rng.sample(vocabulary, 8)), 'source_name': rng.choice(SOURCES), 'story': len(story_sources)}
+            story_sources.append({article['source_name']})
+        article['description'] = ' '.join(rng.sample(vocabulary, 20))
+        article['url'] = f"https://example.com/{i}"
+        articles.append(article)
+    return articles
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=100000, help="Size of the largest archive")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="Share of articles reposting an earlier story")
+    parser.add_argument("--pairs-sample", type=int, default=1000, help="Articles compared all-pairs for reference")
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles, args.duplicates)
+
+    start = time.perf_counter()
+    for article in articles:
+        minhash(article)
+    signing = time.perf_counter() - start
+    print(f"signatures: {args.articles} articles in {signing:.2f}s ({signing / args.articles * 1e6:.1f} us/article)")
+
+    print(f"\n{'articles':>10}{'cluster s':>12}{'us/article':>12}{'clusters':>10}{'stories':>10}")
+    print("-" * 54)
+    for size in sorted({args.articles // 10, args.articles // 2, args.articles}):
+        batch = [dict(article) for article in articles[:size]]
+        start = time.perf_counter()
+        representatives = collapse_duplicates(batch)
+        elapsed = time.perf_counter() - start
+        stories = len({article['story'] for article in batch})
+        print(f"{size:>10}{elapsed:>12.2f}{elapsed / size * 1e6:>12.1f}{len(representatives):>10}{stories:>10}")
+
+    sample = articles[:args.pairs_sample]
+    signatures = [minhash(article) for article in sample]
+    start = time.perf_counter()
+    for i, signature in enumerate(signatures):
+        for other in signatures[:i]:
+            similarity(signature, other)
+    elapsed = time.perf_counter() - start
+    pairs = len(sample) * (len(sample) - 1) / 2
+    full_pairs = args.articles * (args.articles - 1) / 2
+    print(f"\nall pairs: {len(sample)} articles in {elapsed:.2f}s, "
+          f"~{elapsed / pairs * full_pairs / 3600:.1f}h extrapolated to {args.articles}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Measure how long the event loop is blocked while scraped pages are parsed
+
+Parses the stored fixture pages with each parse executor mode while the
+event loop monitor samples the loop, so "inline" shows the behaviour
+before parsing was moved off the loop.
+
+Usage:
+    python benchmarks/bench_event_loop.py [--rounds N]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from scrapers.news_scraper import NewsScraper
+from scrapers.source_parsers import parse_hackernews, parse_blog_index
+from utils.loop_monitor import EventLoopMonitor
+from utils.parse_executor import ParseExecutor
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+async def run_mode(mode: str, rounds: int) -> None:
+    executor = ParseExecutor(mode=mode)
+    scraper = NewsScraper(executor=executor)
+    hackernews = (FIXTURES_DIR / "hackernews.html").read_text(encoding="utf-8")
+    blog = (FIXTURES_DIR / "blog_index.html").read_text(encoding="utf-8")
+
+    # Warm up the pool so worker start-up is not measured
+    await executor.run(parse_hackernews, hackernews, is_relevant=scraper.relevance_check)
+
+    monitor = EventLoopMonitor(interval=0.01, stall_threshold=0.02)
+    monitor.start()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        # One job per source, as during a scrape
+        await asyncio.gather(
+            executor.run(parse_hackernews, hackernews, is_relevant=scraper.relevance_check),
+            executor.run(
+                parse_blog_index, blog, base_url="https://example.com/blog",
+                source="Example", category="programming", is_relevant=scraper.relevance_check
+            ),
+        )
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+    executor.shutdown()
+
+    stats = monitor.get_stats()
+    print(f"{mode:<10}{elapsed * 1000:>12.0f}{stats['max_lag_ms']:>14.1f}"
+          f"{stats['total_blocked_ms']:>18.1f}{stats['stalls']:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Event loop blocking during parsing")
+    parser.add_argument("--rounds", type=int, default=20, help="Scrape cycles to parse")
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'total ms':>12}{'max lag ms':>14}{'total blocked ms':>18}{'stalls':>9}")
+    print("-" * 63)
+    for mode in ParseExecutor.MODES[::-1]:
+        asyncio.run(run_mode(mode, args.rounds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark comparing the HTML parser backends on stored fixture pages
+
+Usage:
+    python benchmarks/bench_parsers.py [--repeat N]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from scrapers.html_parser import (
+    make_soup, html_to_text, LXML_AVAILABLE,
+    HACKERNEWS_STORIES, BLOG_ARTICLES, PAGE_IMAGES
+)
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Fixture page -> strainer the scrapers use for it
+CASES = {
+    "hackernews.html": HACKERNEWS_STORIES,
+    "blog_index.html": BLOG_ARTICLES,
+    "article.html": PAGE_IMAGES,
+}
+
+def time_call(func, repeat: int) -> float:
+    """Best time per call in milliseconds"""
+    timings = timeit.repeat(func, number=1, repeat=repeat)
+    return min(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per case")
+    args = parser.parse_args()
+
+    backends = ["html.parser"] + (["lxml"] if LXML_AVAILABLE else [])
+    if not LXML_AVAILABLE:
+        print("⚠️  lxml is not installed, only html.parser is measured")
+
+    print(f"{'fixture':<18}{'backend':<13}{'full tree ms':>14}{'strained ms':>14}{'text ms':>10}")
+    print("-" * 69)
+
+    for fixture, strainer in CASES.items():
+        markup = (FIXTURES_DIR / fixture).read_text(encoding="utf-8")
+        for backend in backends:
+            full = time_call(lambda: make_soup(markup, backend=backend), args.repeat)
+            strained = time_call(lambda: make_soup(markup, parse_only=strainer, backend=backend), args.repeat)
+            text = time_call(lambda: html_to_text(markup, backend=backend), args.repeat)
+            print(f"{fixture:<18}{backend:<13}{full:>14.2f}{strained:>14.2f}{text:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark of /api/v1/news/latest throughput on a warm snapshot
+
+Calls the ASGI app in-process, so the numbers are the app's own cost per
+request without sockets or an HTTP server, and compares:
+
+    stdlib json    the route's dict re-encoded by FastAPI and json per request
+    orjson         the same with FastJSONResponse
+    cached         encoded-once bytes from SnapshotCacheMiddleware
+    cached gzip    the same, precompressed variant for Accept-Encoding: gzip
+
+Usage:
+    python benchmarks/bench_responses.py [--articles 1000] [--limit 100] [--seconds 2]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from api import news_routes
+from api.http_cache import FastJSONResponse, SnapshotCacheMiddleware
+from scrapers.ingestion import NewsIngestor
+from utils.article_store import ArticleStore
+from utils.cache_manager import CacheManager
+
+def make_news_data(count: int):
+    """Articles shaped like scraped ones, spread over three sources"""
+    sources = {"hackernews": "tech", "dev_to": "programming", "geeksforgeeks": "interview"}
+    news_data = {source: [] for source in sources}
+    for i in range(count):
+        source = list(sources)[i % len(sources)]
+        news_data[source].append({
+            'title': f"Article {i} about python and " + ' '.join(f"topic{(i * 13 + j) % 5000}" for j in range(6)),
+            'description': ' '.join(f"word{(i * 31 + j) % 5000}" for j in range(40)),
+            'url': f"https://example.com/{source}/{i}",
+            'image_url': f"https://example.com/images/{i}.jpg",
+            'published_date': f"2024-09-{1 + i % 28:02d}T{i % 24:02d}:00:00Z",
+            'category': sources[source],
+            'source': source,
+            'relevance_score': i % 7
+        })
+    return news_data
+
+def make_app(store: ArticleStore, response_class, cached: bool) -> FastAPI:
+    app = FastAPI(default_response_class=response_class)
+    if cached:
+        app.add_middleware(SnapshotCacheMiddleware, store=lambda: store)
+    app.include_router(news_routes.router, prefix="/api/v1")
+    return app
+
+async def call(app, query: bytes, headers) -> int:
+    """One GET request straight through the ASGI interface, returning the body size"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': '/api/v1/news/latest', 'raw_path': b'/api/v1/news/latest',
+        'query_string': query, 'root_path': '', 'headers': headers,
+        'client': ('127.0.0.1', 1234), 'server': ('test', 80)
+    }
+    size = 0
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal size
+        if message['type'] == 'http.response.body':
+            size += len(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return size
+
+async def measure(app, query: bytes, headers, seconds: float):
+    """Requests per second and response size over a timed run, after a warm-up request"""
+    size = await call(app, query, headers)
+    requests = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        await call(app, query, headers)
+        requests += 1
+    return requests / (time.perf_counter() - start), size
+
+async def run(args):
+    store = ArticleStore(CacheManager(), expire=3600)
+    store.publish(make_news_data(args.articles))
+    news_routes.news_ingestor = NewsIngestor(store)
+
+    query = f"limit={args.limit}".encode('ascii')
+    identity = [(b'accept-encoding', b'identity')]
+    gzip = [(b'accept-encoding', b'gzip')]
+    cases = [
+        ("stdlib json", make_app(store, JSONResponse, cached=False), identity),
+        ("orjson", make_app(store, FastJSONResponse, cached=False), identity),
+        ("cached", make_app(store, FastJSONResponse, cached=True), identity),
+        ("cached gzip", make_app(store, FastJSONResponse, cached=True), gzip)
+    ]
+
+    print(f"{'mode':<14}{'req/s':>10}{'body KB':>10}{'speedup':>10}")
+    print("-" * 44)
+    baseline = None
+    for name, app, headers in cases:
+        rps, size = await measure(app, query, headers, args.seconds)
+        baseline = baseline or rps
+        print(f"{name:<14}{rps:>10.0f}{size / 1024:>10.1f}{rps / baseline:>9.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=1000, help="Articles in the snapshot")
+    parser.add_argument("--limit", type=int, default=100, help="limit parameter of the requests")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duration of each run")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the full-text search index on synthetic articles
+
+Builds the index at each size and reports build time, index memory and
+query latency for term, multi-term, phrase and prefix queries.
+
+Usage:
+    python benchmarks/bench_search.py [--sizes 10000,100000,1000000] [--queries N]
+"""
+
+import argparse
+import gc
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from utils.search_index import SearchIndex
+
+VOCABULARY_SIZE = 50000
+CATEGORIES = ["tech", "programming", "interview"]
+
+def make_articles(count: int, seed: int = 1):
+    """Articles with Zipf-distributed words, like real text"""
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(VOCABULARY_SIZE)]
+    cumulative = list(itertools.accumulate(1 / rank for rank in range(1, VOCABULARY_SIZE + 1)))
+    for i in range(count):
+        words = rng.choices(vocabulary, cum_weights=cumulative, k=38)
+        yield {
+            'title': ' '.join(words[:8]),
+            'description': ' '.join(words[8:]),
+            'category': CATEGORIES[i % len(CATEGORIES)],
+            'url': f"https://example.com/{i}"
+        }
+
+def resident_memory() -> float:
+    """Resident memory of this process in MB, 0 where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        return 0.0
+
+def make_queries(count: int, seed: int = 2):
+    """Query mix: a common word, two words, a phrase from an article and a prefix"""
+    rng = random.Random(seed)
+    articles = list(make_articles(1000, seed=1))
+    queries = []
+    for _ in range(count):
+        words = rng.choice(articles)['title'].split()
+        queries.append(("term", words[0]))
+        queries.append(("two terms", f"{words[0]} {words[3]}"))
+        queries.append(("phrase", f'"{words[1]} {words[2]}"'))
+        queries.append(("prefix", f"w{rng.randrange(10, 100)}*"))
+    return queries
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma separated index sizes")
+    parser.add_argument("--queries", type=int, default=50, help="Queries of each kind per size")
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries)
+    kinds = list(dict.fromkeys(kind for kind, _ in queries))
+
+    header = f"{'documents':>10}{'build s':>10}{'memory MB':>11}" + ''.join(f"{kind + ' ms':>16}" for kind in kinds)
+    print(header)
+    print("-" * len(header))
+
+    for size in (int(size) for size in args.sizes.split(",")):
+        gc.collect()
+        baseline = resident_memory()
+        # The collector would rescan the growing index over and over; ingestion
+        # adds a few hundred articles at a time, where this does not matter
+        gc.disable()
+        start = time.perf_counter()
+        index = SearchIndex()
+        for article in make_articles(size):
+            index.add(article)
+        build = time.perf_counter() - start
+        gc.enable()
+        memory = resident_memory() - baseline
+
+        timings = {kind: [] for kind in kinds}
+        for kind, query in queries:
+            start = time.perf_counter()
+            index.search(query, limit=20)
+            timings[kind].append((time.perf_counter() - start) * 1000)
+
+        row = f"{size:>10}{build:>10.1f}{memory:>11.0f}"
+        row += ''.join(f"{statistics.median(timings[kind]):>16.2f}" for kind in kinds)
+        print(row)
+        del index
+        gc.collect()
+
+    print("\nquery columns are median latency; memory is resident growth and includes the article dicts")
+
+if __name__ == "__main__":
+    main()
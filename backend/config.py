@@ -24,13 +24,68 @@ class Config:
     
     # Cache Configuration
     CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", 1800))  # 30 minutes
-    CACHE_CLEANUP_INTERVAL = int(os.getenv("CACHE_CLEANUP_INTERVAL", 3600))  # 1 hour
+    CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", 1800))  # seconds a stale entry is served while it refreshes
+    CACHE_CLEANUP_INTERVAL = int(os.getenv("CACHE_CLEANUP_INTERVAL", 60))  # seconds between sweeps of expired entries
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1000))  # 0 for no limit
+    CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 64 * 1024 * 1024))  # approximate, 0 for no limit
+    CACHE_EVICTION_POLICY = os.getenv("CACHE_EVICTION_POLICY", "lru")  # lru or lfu
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # memory (per process), local, or a redis:// URL shared by all workers
+    
+    # Response Encoding
+    RESPONSE_ENCODINGS = [encoding.strip() for encoding in os.getenv("RESPONSE_ENCODINGS", "br,gzip").split(",")]  # precompressed variants of cached responses, most preferred first
+    RESPONSE_COMPRESS_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESS_MIN_SIZE", 1024))  # bytes below which responses are sent uncompressed
     
     # Scraper Configuration
-    SCRAPER_TIMEOUT = int(os.getenv("SCRAPER_TIMEOUT", 30))  # seconds
+    SCRAPER_TIMEOUT = int(os.getenv("SCRAPER_TIMEOUT", 30))  # seconds, also the timeout of each source
+    SCRAPER_DEADLINE = float(os.getenv("SCRAPER_DEADLINE", 10))  # seconds an ingestion run waits before publishing
     SCRAPER_MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", 3))
     SCRAPER_DELAY_MIN = float(os.getenv("SCRAPER_DELAY_MIN", 1.0))  # seconds
     SCRAPER_DELAY_MAX = float(os.getenv("SCRAPER_DELAY_MAX", 3.0))  # seconds
+    SCRAPER_SCHEDULER_ENABLED = os.getenv("SCRAPER_SCHEDULER_ENABLED", "True").lower() == "true"
+    SCRAPER_REFRESH_INTERVAL = int(os.getenv("SCRAPER_REFRESH_INTERVAL", 900))  # seconds between ingestion runs
+    ARTICLE_RETENTION = int(os.getenv("ARTICLE_RETENTION", 172800))  # seconds a processed article is remembered after it was last seen
+    
+    # Trending
+    TRENDING_HALF_LIFE = int(os.getenv("TRENDING_HALF_LIFE", 21600))  # seconds after which an article's trending score has halved
+    TRENDING_SIZE = int(os.getenv("TRENDING_SIZE", 50))  # trending articles precomputed per snapshot
+    DELTA_HISTORY = int(os.getenv("DELTA_HISTORY", 100))  # snapshot versions a delta-sync cursor can be behind
+    DELTA_VIEWS = int(os.getenv("DELTA_VIEWS", 1000))  # served views whose articles are remembered for delta syncs
+    
+    # Near-Duplicate Detection
+    DEDUPE_ENABLED = os.getenv("DEDUPE_ENABLED", "True").lower() == "true"  # collapse the same story from several sources
+    DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", 0.6))  # title word overlap (Jaccard, 0-1) counted as the same story
+    
+    # HTML Parsing Configuration
+    HTML_PARSER = os.getenv("HTML_PARSER", "lxml")  # lxml or html.parser
+    
+    PARSE_EXECUTOR = os.getenv("PARSE_EXECUTOR", "thread")  # thread, process or inline
+    PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", 4))
+    
+    # Event Loop Monitoring
+    LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", 0.1))  # seconds between samples
+    LOOP_STALL_THRESHOLD = float(os.getenv("LOOP_STALL_THRESHOLD", 0.05))  # seconds of lag counted as a stall
+    
+    # HTTP Client Configuration
+    USER_AGENT = os.getenv(
+        "USER_AGENT",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    )
+    HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", 100))  # open connections in total
+    HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", 10))  # open connections per host
+    HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", 30))  # seconds
+    HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", 300))  # seconds
+    
+    # Image Extraction Configuration
+    IMAGE_FETCH_CONCURRENCY = int(os.getenv("IMAGE_FETCH_CONCURRENCY", 10))  # article pages fetched at once
+    IMAGE_FETCH_PER_HOST = int(os.getenv("IMAGE_FETCH_PER_HOST", 2))  # article pages fetched at once per host
+    IMAGE_STREAMING_FETCH = os.getenv("IMAGE_STREAMING_FETCH", "True").lower() == "true"  # stop reading at the image
+    IMAGE_SCAN_CHUNK_SIZE = int(os.getenv("IMAGE_SCAN_CHUNK_SIZE", 8192))  # bytes
+    IMAGE_SCAN_MAX_BYTES = int(os.getenv("IMAGE_SCAN_MAX_BYTES", 524288))  # bytes read before giving up
+    IMAGE_CACHE_PATH = os.getenv(
+        "IMAGE_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "image_urls.sqlite3")
+    )
+    IMAGE_CACHE_TTL = int(os.getenv("IMAGE_CACHE_TTL", 604800))  # 7 days
+    IMAGE_CACHE_NEGATIVE_TTL = int(os.getenv("IMAGE_CACHE_NEGATIVE_TTL", 21600))  # 6 hours for failed lookups
     
     # News Sources Configuration
     NEWS_SOURCES = {
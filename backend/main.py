@@ -1,22 +1,53 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
 from typing import List, Optional
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 
+from api.http_cache import FastJSONResponse, SnapshotCacheMiddleware, content_etag, etag_matches
 from api.news_routes import router as news_router
 from api.mentor_routes import router as mentor_router
+from scrapers.ingestion import news_ingestor
 from scrapers.news_scraper import NewsScraper
-from utils.cache_manager import CacheManager
+from config import Config
+from utils.cache_manager import cache_manager
+from utils.http_client import http_client
+from utils.image_cache import image_cache
+from utils.loop_monitor import loop_monitor
+from utils.parse_executor import parse_executor
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start shared resources with the app and release them on shutdown"""
+    await http_client.start()
+    loop_monitor.start()
+    cache_manager.start_sweeper()
+    if Config.SCRAPER_SCHEDULER_ENABLED:
+        news_ingestor.start()
+    try:
+        yield
+    finally:
+        await news_ingestor.stop()
+        await loop_monitor.stop()
+        await cache_manager.close()
+        parse_executor.shutdown()
+        image_cache.close()
+        await http_client.close()
 
 app = FastAPI(
     title="Sttarkel News Scraper API",
     description="Real-time news scraper for coding languages and interview preparation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# ETags, Cache-Control and encoded-once bodies for the news routes; added first so CORS headers reach them too
+app.add_middleware(SnapshotCacheMiddleware, store=lambda: news_ingestor.store)
+
 # CORS middleware - Updated to handle preflight requests properly
 app.add_middleware(
     CORSMiddleware,
@@ -35,9 +66,6 @@ app.add_middleware(
     expose_headers=["*"],  # Expose all headers
 )
 
-# Initialize cache manager
-cache_manager = CacheManager()
-
 # Include routers
 app.include_router(news_router, prefix="/api/v1")
 app.include_router(mentor_router, prefix="/api/v1")
@@ -47,57 +75,72 @@ async def root():
     return {"message": "Sttarkel News Scraper API is running!"}
 
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+async def health_check(response: Response):
+    # Live status, never to be served from a cache
+    response.headers['Cache-Control'] = 'no-store'
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "event_loop": loop_monitor.get_stats(),
+        "ingestion": news_ingestor.get_stats(),
+        "cache": cache_manager.get_stats()
+    }
+
+NEWS_SOURCES = [
+    {
+        "name": "TechCrunch",
+        "url": "https://techcrunch.com",
+        "category": "tech",
+        "description": "Latest technology news and startup information"
+    },
+    {
+        "name": "Hacker News",
+        "url": "https://news.ycombinator.com",
+        "category": "tech",
+        "description": "Social news website focusing on computer science and entrepreneurship"
+    },
+    {
+        "name": "Stack Overflow Blog",
+        "url": "https://stackoverflow.blog",
+        "category": "programming",
+        "description": "Programming and developer community blog"
+    },
+    {
+        "name": "Dev.to",
+        "url": "https://dev.to",
+        "category": "programming",
+        "description": "Developer community platform"
+    },
+    {
+        "name": "Medium Programming",
+        "url": "https://medium.com/topic/programming",
+        "category": "programming",
+        "description": "Programming articles and tutorials"
+    },
+    {
+        "name": "LeetCode Blog",
+        "url": "https://leetcode.com/blog",
+        "category": "interview",
+        "description": "Interview preparation and coding challenges"
+    },
+    {
+        "name": "GeeksforGeeks",
+        "url": "https://www.geeksforgeeks.org",
+        "category": "interview",
+        "description": "Computer science portal for geeks"
+    }
+]
+
+# The list is fixed, so its ETag is computed once
+NEWS_SOURCES_ETAG = content_etag(NEWS_SOURCES)
 
 @app.get("/api/v1/news/sources")
-async def get_news_sources():
+async def get_news_sources(request: Request):
     """Get list of available news sources"""
-    sources = [
-        {
-            "name": "TechCrunch",
-            "url": "https://techcrunch.com",
-            "category": "tech",
-            "description": "Latest technology news and startup information"
-        },
-        {
-            "name": "Hacker News",
-            "url": "https://news.ycombinator.com",
-            "category": "tech",
-            "description": "Social news website focusing on computer science and entrepreneurship"
-        },
-        {
-            "name": "Stack Overflow Blog",
-            "url": "https://stackoverflow.blog",
-            "category": "programming",
-            "description": "Programming and developer community blog"
-        },
-        {
-            "name": "Dev.to",
-            "url": "https://dev.to",
-            "category": "programming",
-            "description": "Developer community platform"
-        },
-        {
-            "name": "Medium Programming",
-            "url": "https://medium.com/topic/programming",
-            "category": "programming",
-            "description": "Programming articles and tutorials"
-        },
-        {
-            "name": "LeetCode Blog",
-            "url": "https://leetcode.com/blog",
-            "category": "interview",
-            "description": "Interview preparation and coding challenges"
-        },
-        {
-            "name": "GeeksforGeeks",
-            "url": "https://www.geeksforgeeks.org",
-            "category": "interview",
-            "description": "Computer science portal for geeks"
-        }
-    ]
-    return {"sources": sources}
+    headers = {'ETag': NEWS_SOURCES_ETAG, 'Cache-Control': 'public, max-age=3600'}
+    if etag_matches(request.headers.get('if-none-match'), NEWS_SOURCES_ETAG):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse({"sources": NEWS_SOURCES}, headers=headers)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
@@ -0,0 +1,97 @@
+import html
+import logging
+from typing import Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:  # pragma: no cover - lxml is listed in requirements.txt
+    LXML_AVAILABLE = False
+
+# Strainers that restrict parsing to the parts of a page the scrapers read
+HACKERNEWS_STORIES = SoupStrainer('tr', attrs={'class': 'athing'})
+BLOG_ARTICLES = SoupStrainer('article')
+BLOG_POSTS = SoupStrainer('div', attrs={'class': 'post'})
+PAGE_IMAGES = SoupStrainer(['meta', 'img'])
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    Pick the BeautifulSoup tree builder to use
+
+    Args:
+        backend: 'lxml' or 'html.parser', defaults to Config.HTML_PARSER
+
+    Returns:
+        The requested backend, or 'html.parser' if lxml is not installed
+    """
+    backend = backend or Config.HTML_PARSER
+    if backend == 'lxml' and not LXML_AVAILABLE:
+        logger.warning("lxml is not installed, falling back to html.parser")
+        return 'html.parser'
+    return backend
+
+def make_soup(markup: str, parse_only: Optional[SoupStrainer] = None, backend: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parse markup with the configured backend
+
+    Args:
+        markup: HTML to parse
+        parse_only: Optional strainer so only matching subtrees are built
+        backend: Override for the configured backend
+
+    Returns:
+        Parsed document
+    """
+    return BeautifulSoup(markup, resolve_backend(backend), parse_only=parse_only)
+
+def html_to_text(markup: str, backend: Optional[str] = None) -> str:
+    """
+    Extract the text of an HTML fragment, skipping scripts and styles
+
+    With the lxml backend the text is taken straight from an lxml tree,
+    without building a BeautifulSoup tree on top of it.
+    """
+    if not markup or not markup.strip():
+        return ""
+
+    if resolve_backend(backend) == 'lxml':
+        try:
+            fragment = lxml.html.fragment_fromstring(markup, create_parent='div')
+            etree.strip_elements(fragment, 'script', 'style', with_tail=False)
+            return fragment.text_content()
+        except (etree.ParserError, ValueError) as e:
+            logger.debug(f"lxml could not parse fragment, using html.parser: {e}")
+
+    soup = BeautifulSoup(markup, 'html.parser')
+    for element in soup(["script", "style"]):
+        element.decompose()
+    return soup.get_text()
+
+def clean_html_content(html_content: str) -> str:
+    """Clean HTML content and extract plain text"""
+    if not html_content:
+        return ""
+
+    # First decode HTML entities
+    decoded = html.unescape(html_content)
+
+    # Extract text without script and style elements
+    text = html_to_text(decoded)
+
+    # Clean up whitespace
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = ' '.join(chunk for chunk in chunks if chunk)
+
+    # Limit length to avoid very long descriptions
+    if len(text) > 300:
+        text = text[:300] + "..."
+
+    return text
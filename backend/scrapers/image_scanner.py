@@ -0,0 +1,113 @@
+import re
+from typing import Dict, Optional
+from urllib.parse import urljoin
+
+# Meta tags that name the article image, in order of preference
+META_IMAGE_KEYS = ('og:image', 'twitter:image', 'image')
+
+_META_TAG = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+_IMG_TAG = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+_HEAD_END = re.compile(r'</head\s*>|<body\b', re.IGNORECASE)
+_ATTRIBUTE = re.compile(
+    r'([a-zA-Z_:][-\w:.]*)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))'
+)
+
+def parse_attributes(tag: str) -> Dict[str, str]:
+    """Parse the attributes of a single HTML start tag"""
+    attributes = {}
+    for match in _ATTRIBUTE.finditer(tag):
+        name = match.group(1).lower()
+        value = next((group for group in match.groups()[1:] if group is not None), '')
+        attributes.setdefault(name, value)
+    return attributes
+
+def absolute_url(value: str, base_url: str) -> Optional[str]:
+    """Turn an image reference found in a page into an absolute URL"""
+    value = value.strip()
+    if not value:
+        return None
+    if value.startswith('http'):
+        return value
+    if value.startswith('//'):
+        return 'https:' + value
+    try:
+        return urljoin(base_url, value)
+    except ValueError:
+        return None
+
+class MetaImageScanner:
+    """
+    Incrementally scans an HTML document for the article image
+
+    Chunks of the page are fed in as they arrive. Open Graph / Twitter meta
+    tags are looked for until the end of <head>; after that the first
+    reasonable <img> is used. Only a trailing incomplete tag is buffered
+    between chunks, so memory stays small no matter how large the page is.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.in_head = True
+        self._buffer = ''
+        self._meta_images: Dict[str, str] = {}
+
+    def feed(self, text: str) -> Optional[str]:
+        """
+        Feed the next decoded chunk of the page
+
+        Args:
+            text: Next piece of the document
+
+        Returns:
+            The image URL as soon as it is known, otherwise None
+        """
+        buffer = self._buffer + text
+        image_url = None
+
+        if self.in_head:
+            head_end = _HEAD_END.search(buffer)
+            head_part = buffer[:head_end.start()] if head_end else buffer
+            image_url = self._scan_meta(head_part)
+
+            if image_url is None and head_end:
+                # Head finished without a meta image, fall back to <img> tags
+                self.in_head = False
+                buffer = buffer[head_end.start():]
+
+        if image_url is None and not self.in_head:
+            image_url = self._scan_img(buffer)
+
+        self._buffer = self._incomplete_tail(buffer)
+        return image_url
+
+    def _scan_meta(self, text: str) -> Optional[str]:
+        for match in _META_TAG.finditer(text):
+            attributes = parse_attributes(match.group(0))
+            key = (attributes.get('property') or attributes.get('name') or '').lower()
+            content = attributes.get('content')
+            if key in META_IMAGE_KEYS and content and key not in self._meta_images:
+                url = absolute_url(content, self.base_url)
+                if url:
+                    self._meta_images[key] = url
+
+        for key in META_IMAGE_KEYS:
+            if key in self._meta_images:
+                return self._meta_images[key]
+        return None
+
+    def _scan_img(self, text: str) -> Optional[str]:
+        for match in _IMG_TAG.finditer(text):
+            src = parse_attributes(match.group(0)).get('src')
+            if src and not src.startswith('data:') and len(src) > 10:
+                url = absolute_url(src, self.base_url)
+                if url:
+                    return url
+        return None
+
+    @staticmethod
+    def _incomplete_tail(text: str) -> str:
+        # Everything up to the last complete tag has been scanned already
+        last_open = text.rfind('<')
+        if last_open != -1 and '>' not in text[last_open:]:
+            return text[last_open:]
+        return ''
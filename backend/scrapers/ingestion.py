@@ -0,0 +1,313 @@
+import asyncio
+import logging
+import random
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from config import Config
+from scrapers.news_scraper import NewsScraper, SOURCES
+from utils.article_store import ArticleStore, NewsSnapshot, article_store
+from utils.cache_manager import CacheResult
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for the articles of a run another worker leads
+SHARED_POLL_INTERVAL = 0.5
+
+class NewsIngestor:
+    """
+    Scrapes all sources on a fixed interval and publishes the result as a snapshot
+
+    API requests only read the current snapshot. The scheduler runs as a
+    task on the application's event loop, so it shares the pooled HTTP
+    client and the parse executor with the rest of the app.
+
+    When the store is shared between workers, a run first takes articles
+    another worker ingested less than an interval ago. Otherwise one worker
+    claims the run and scrapes while the others wait for its articles, so
+    N workers scrape the sources as often as one.
+    """
+
+    def __init__(
+        self,
+        store: ArticleStore,
+        interval: Optional[float] = None,
+        deadline: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        scraper_factory: Callable[[], NewsScraper] = NewsScraper
+    ):
+        """
+        Args:
+            store: Store the scraped articles are written to
+            interval: Seconds between ingestion runs, defaults to Config.SCRAPER_REFRESH_INTERVAL
+            deadline: Seconds a run waits for the sources, defaults to Config.SCRAPER_DEADLINE
+            max_retries: Attempts per run, defaults to Config.SCRAPER_MAX_RETRIES
+            scraper_factory: Callable creating the scraper used for a run
+        """
+        self.store = store
+        self.interval = interval or Config.SCRAPER_REFRESH_INTERVAL
+        self.deadline = deadline or Config.SCRAPER_DEADLINE
+        self.max_retries = max(1, max_retries or Config.SCRAPER_MAX_RETRIES)
+        self.scraper_factory = scraper_factory
+        self._task: Optional[asyncio.Task] = None
+        self._running: Optional[asyncio.Future] = None
+        self.runs = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        # Sources finished in the current run, and queues of the streams following it
+        self._run_progress: Dict[str, Tuple[List[Dict[str, Any]], str]] = {}
+        self._listeners: Set[asyncio.Queue] = set()
+        # Late sources waiting to be merged into the snapshot, the task merging
+        # them, and whether a run is between taking its version and sharing
+        self._late_sources: Dict[str, Tuple[List[Dict[str, Any]], str]] = {}
+        self._late_merge: Optional[asyncio.Future] = None
+        self._publishing = False
+
+    async def run_once(self) -> NewsSnapshot:
+        """
+        Scrape all sources once and publish the result
+
+        Sources still running at the deadline are published as 'pending' and
+        merged into the snapshot, with their final status, when they end. With a shared store the
+        articles may instead come from the run of another worker.
+        """
+        self._run_progress = {}
+        if self.store.is_shared:
+            snapshot = await self._take_shared()
+            if snapshot is not None:
+                # Streams following this run get the sources of the taken snapshot
+                for source in snapshot.sources:
+                    self._source_finished(source, snapshot.news_data[source], snapshot.source_status[source])
+                return snapshot
+            try:
+                return await self._scrape()
+            finally:
+                await self.store.release_lease()
+        return await self._scrape()
+
+    async def _take_shared(self) -> Optional[NewsSnapshot]:
+        # Articles another worker ingested, None once this worker holds the lease to scrape
+        snapshot = await self.store.load_shared(self.interval, refresh=self.load_snapshot)
+        if snapshot is not None:
+            return snapshot
+
+        lease = self.deadline + Config.SCRAPER_TIMEOUT
+        loop = asyncio.get_running_loop()
+        give_up = loop.time() + lease
+        while not await self.store.acquire_lease(lease):
+            if loop.time() >= give_up:
+                raise RuntimeError("Timed out waiting for another worker's ingestion run")
+            await asyncio.sleep(SHARED_POLL_INTERVAL)
+            snapshot = await self.store.load_shared(self.interval, refresh=self.load_snapshot)
+            if snapshot is not None:
+                logger.info(f"Took articles ingested by another worker (snapshot version {snapshot.version})")
+                return snapshot
+        return None
+
+    async def _scrape(self) -> NewsSnapshot:
+        async with self.scraper_factory() as scraper:
+            news_data = await scraper.scrape_all_sources(
+                deadline=self.deadline,
+                on_late_source=self._merge_late_source,
+                on_source=self._source_finished
+            )
+            source_status = dict(scraper.source_status)
+
+            if not any(news_data.values()) and 'pending' not in source_status.values():
+                raise RuntimeError("No source returned any articles")
+
+            # Published before leaving the scraper, which may wait there for the
+            # late sources. Those finishing meanwhile are held back until this
+            # run's snapshot is out, or they would be merged into the one before
+            self._publishing = True
+            try:
+                if self._late_merge is not None and not self._late_merge.done():
+                    await asyncio.shield(self._late_merge)
+                version = await self.store.next_version()
+                snapshot = await self.store.publish_async(
+                    news_data, refresh=self.load_snapshot, source_status=source_status, version=version
+                )
+                await self.store.share(snapshot)
+            finally:
+                self._publishing = False
+                self._start_late_merge()
+
+        # The late sources the scraper waited for are merged before the run ends
+        if self._late_merge is not None and not self._late_merge.done():
+            await asyncio.shield(self._late_merge)
+        return snapshot
+
+    def _source_finished(self, source: str, news_items: List[Dict[str, Any]], status: str) -> None:
+        self._run_progress[source] = (news_items, status)
+        for queue in self._listeners:
+            queue.put_nowait((source, news_items, status))
+
+    def _merge_late_source(self, source: str, news_items: List[Dict[str, Any]], status: str) -> None:
+        # Publishing takes a version, which may come from the shared counter,
+        # and is done off the event loop, so the merge is done by one task at a time
+        self._late_sources[source] = (news_items, status)
+        self._start_late_merge()
+
+    async def _publish_late_sources(
+        self, late_sources: Dict[str, Tuple[List[Dict[str, Any]], str]], version: Optional[int] = None
+    ) -> Optional[NewsSnapshot]:
+        # Publish the latest snapshot with these sources and their final
+        # status merged in, None if there is nothing to merge
+        snapshot = self.store.latest
+        if snapshot is None:
+            return None
+        # Sources a newer run already has are left as they are
+        late_sources = {
+            source: late for source, late in late_sources.items()
+            if snapshot.source_status.get(source) != 'ok'
+        }
+        if not late_sources:
+            return None
+
+        news_data = dict(snapshot.news_data, **{source: news_items for source, (news_items, _) in late_sources.items()})
+        source_status = dict(snapshot.source_status, **{source: status for source, (_, status) in late_sources.items()})
+        merged = await self.store.publish_async(
+            news_data, refresh=self.load_snapshot, source_status=source_status, version=version
+        )
+        logger.info(f"Merged late sources {', '.join(late_sources)} (snapshot version {merged.version})")
+        return merged
+
+    def _start_late_merge(self) -> None:
+        if self._late_sources and not self._publishing and (self._late_merge is None or self._late_merge.done()):
+            self._late_merge = asyncio.ensure_future(self._merge_late())
+
+    async def _merge_late(self) -> None:
+        # Late sources finishing while a version is taken are picked up by the next pass
+        while self._late_sources:
+            version = await self.store.next_version()
+            late_sources, self._late_sources = self._late_sources, {}
+            merged = await self._publish_late_sources(late_sources, version)
+            if merged is not None:
+                await self.store.share(merged)
+
+    async def _ingest(self) -> bool:
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                snapshot = await self.run_once()
+                self.runs += 1
+                self.last_error = None
+                logger.info(f"Ingested {len(snapshot.latest)} articles (snapshot version {snapshot.version})")
+                return True
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"Ingestion attempt {attempt}/{self.max_retries} failed: {e}")
+                if attempt < self.max_retries:
+                    await asyncio.sleep(random.uniform(Config.SCRAPER_DELAY_MIN, Config.SCRAPER_DELAY_MAX))
+
+        self.failures += 1
+        if self.store.is_empty:
+            # Let requests answer with an empty result instead of waiting on every call
+            self.store.publish({}, refresh=self.load_snapshot)
+        return False
+
+    async def refresh(self) -> bool:
+        """
+        Run an ingestion now, joining a run that is already in progress
+
+        Returns:
+            True if a snapshot with fresh articles was published
+        """
+        return await asyncio.shield(self._start_run())
+
+    def _start_run(self) -> asyncio.Future:
+        if self._running is None or self._running.done():
+            self._running = asyncio.ensure_future(self._ingest())
+        return self._running
+
+    async def load_snapshot(self) -> NewsSnapshot:
+        """Run an ingestion and return the newest snapshot, used when the cached one is stale or missing"""
+        await self.refresh()
+        return self.store.latest
+
+    async def get_snapshot(self) -> CacheResult:
+        """
+        Get the snapshot the API should serve
+
+        Only waits for an ingestion when there is no usable snapshot, e.g.
+        right after startup; a stale snapshot is served while a background
+        ingestion replaces it.
+
+        Returns:
+            CacheResult with the snapshot and whether it was stale
+        """
+        return await self.store.fetch(self.load_snapshot)
+
+    async def stream_sources(self, timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, List[Dict[str, Any]], str]]:
+        """
+        Run an ingestion (or join the one in progress) and yield each source as it finishes
+
+        Args:
+            timeout: Seconds to wait for the next source, defaults to Config.SCRAPER_TIMEOUT
+
+        Yields:
+            (source name, news items, status) in completion order, late sources included
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._listeners.add(queue)
+        try:
+            if self._running is not None and not self._running.done():
+                # Replay what the run in progress has already finished
+                for source, (news_items, status) in self._run_progress.items():
+                    queue.put_nowait((source, news_items, status))
+            self._start_run()
+
+            remaining = set(SOURCES)
+            while remaining:
+                try:
+                    source, news_items, status = await asyncio.wait_for(
+                        queue.get(), timeout or Config.SCRAPER_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    break
+                if source in remaining:
+                    remaining.discard(source)
+                    yield source, news_items, status
+
+            for source in remaining:
+                yield source, [], 'timed_out'
+        finally:
+            self._listeners.discard(queue)
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the ingestion schedule on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"News ingestion scheduled every {self.interval} seconds")
+
+    async def stop(self) -> None:
+        """Stop the ingestion schedule"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get ingestion statistics
+
+        Returns:
+            Dictionary with the schedule, run counters and the store state
+        """
+        return {
+            'scheduled': self._task is not None and not self._task.done(),
+            'interval_seconds': self.interval,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'store': self.store.get_stats()
+        }
+
+# Shared instance used by the whole process
+news_ingestor = NewsIngestor(article_store)
@@ -0,0 +1,77 @@
+import re
+from typing import Dict, Iterable
+
+# Suffixes still counted as the keyword, e.g. "interviews"; a possessive
+# such as "developer's" matches anyway, as the apostrophe ends the word
+_PLURAL_SUFFIX = r"(?:s|es)?"
+
+# Names of languages, tools and services, which have no plural; for some of
+# them the suffixed form is an unrelated word ("goes", "rests", "reacts")
+NO_PLURAL_KEYWORDS = frozenset({
+    'python', 'javascript', 'typescript', 'java', 'go', 'rust', 'kotlin', 'swift',
+    'react', 'angular', 'vue', 'django', 'flask', 'spring', 'laravel', 'express',
+    'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'ai', 'web3', 'devops', 'git', 'github',
+    'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'redis', 'elasticsearch',
+    'rest', 'graphql', 'serverless', 'leetcode', 'hackerrank', 'codeforces'
+})
+
+class KeywordMatcher:
+    """
+    Counts keyword hits in one pass with a single precompiled regex
+
+    Keywords only match on word boundaries, so 'ai' does not match inside
+    "said" and 'go' does not match inside "Google". Plurals count, except
+    for names, so "goes" is not 'go'. Matches may overlap, so "coding
+    interview" counts both 'coding interview' and 'interview'.
+    """
+
+    def __init__(self, keywords: Iterable[str], no_plural: Iterable[str] = NO_PLURAL_KEYWORDS):
+        """
+        Args:
+            keywords: Keywords to count, matched case-insensitively
+            no_plural: Keywords only matched as written, without a plural suffix
+        """
+        # Lowercase and drop duplicates while keeping the order
+        self.keywords = tuple(dict.fromkeys(keyword.lower() for keyword in keywords))
+        no_plural = {keyword.lower() for keyword in no_plural}
+
+        alternatives = []
+        for keyword in self.keywords:
+            alternative = '(' + re.escape(keyword) + ')'
+            if keyword[-1].isalnum():
+                if keyword not in no_plural:
+                    alternative += _PLURAL_SUFFIX
+                alternative += r'(?![a-z0-9])'
+            alternatives.append(alternative)
+
+        # Longer keywords first so "coding interview" wins over a shorter prefix at
+        # the same position; the lookahead makes every start position a candidate
+        order = sorted(range(len(self.keywords)), key=lambda i: len(self.keywords[i]), reverse=True)
+        self._group_keywords = [self.keywords[i] for i in order]
+        self._pattern = re.compile(
+            r'(?<![a-z0-9])(?=' + '|'.join(alternatives[i] for i in order) + ')'
+        )
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """
+        Count how often each keyword occurs in the text
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Mapping of keyword to number of hits, only keywords that occur
+        """
+        hits: Dict[str, int] = {}
+        for match in self._pattern.finditer(text.lower()):
+            keyword = self._group_keywords[match.lastindex - 1]
+            hits[keyword] = hits.get(keyword, 0) + 1
+        return hits
+
+    def score(self, text: str) -> int:
+        """Number of distinct keywords occurring in the text"""
+        return len(self.counts(text))
+
+    def is_relevant(self, title: str, content: str = "") -> bool:
+        """Check if any keyword occurs in the title or content"""
+        return self._pattern.search((title + " " + content).lower()) is not None
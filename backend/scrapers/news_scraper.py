@@ -1,553 +1,545 @@
 import asyncio
 import aiohttp
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
-import feedparser
-import re
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Awaitable, Callable, Tuple
 import logging
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
+from contextlib import asynccontextmanager
+from functools import partial
 import time
 import random
-import html
+import codecs
+
+from config import Config
+from scrapers.html_parser import make_soup, clean_html_content, PAGE_IMAGES
+from scrapers.keyword_matcher import KeywordMatcher
+from scrapers.source_parsers import (
+    image_from_entry, image_from_markup,
+    parse_rss_feed, parse_hackernews, parse_blog_index
+)
+from scrapers.image_scanner import MetaImageScanner, absolute_url
+from utils.http_client import http_client, conditional_cache, ConditionalRequestCache
+from utils.parse_executor import parse_executor, ParseExecutor
+from utils.image_cache import image_cache as default_image_cache, ImageURLCache
+from utils.article_store import flatten_news
+from utils.fingerprint_store import fingerprint_store as default_fingerprint_store, FingerprintStore
+from utils.date_utils import parse_published_date
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Placeholder used when no article image can be found
+DEFAULT_IMAGE_URL = "https://picsum.photos/400/200?random=1"
+
+# Keyword matcher for relevance filtering and scoring, compiled once per process
+KEYWORD_MATCHER = KeywordMatcher(Config.CODING_KEYWORDS + Config.INTERVIEW_KEYWORDS)
+
+# Scraper method of every source, in the order results are reported
+SOURCES = {
+    'techcrunch': 'scrape_techcrunch',
+    'hackernews': 'scrape_hackernews',
+    'dev_to': 'scrape_dev_to',
+    'leetcode_blog': 'scrape_leetcode_blog',
+    'geeksforgeeks': 'scrape_geeksforgeeks',
+    'stackoverflow_blog': 'scrape_stackoverflow_blog'
+}
+
+def relevance_score(news: Dict[str, Any]) -> int:
+    """Number of distinct coding and interview keywords in a news item"""
+    return KEYWORD_MATCHER.score(news.get('title', '') + " " + news.get('description', ''))
+
 class NewsScraper:
-    def __init__(self):
-        self.session = None
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        max_concurrency: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+        validators: Optional[ConditionalRequestCache] = None,
+        executor: Optional[ParseExecutor] = None,
+        image_cache: Optional[ImageURLCache] = None,
+        fingerprints: Optional[FingerprintStore] = None
+    ):
+        self.session = session
+        self._owns_session = False
+        # Validators for conditional GETs, shared across scraper instances by default
+        self.validators = validators if validators is not None else conditional_cache
         self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': Config.USER_AGENT
         }
         
         # Keywords for filtering relevant news
-        self.coding_keywords = [
-            'python', 'javascript', 'typescript', 'java', 'c++', 'c#', 'go', 'rust', 'kotlin', 'swift',
-            'react', 'angular', 'vue', 'node.js', 'django', 'flask', 'spring', 'laravel', 'express',
-            'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'machine learning', 'ai', 'artificial intelligence',
-            'data science', 'blockchain', 'web3', 'cybersecurity', 'devops', 'git', 'github'
-        ]
+        self.coding_keywords = list(Config.CODING_KEYWORDS)
+        self.interview_keywords = list(Config.INTERVIEW_KEYWORDS)
         
-        self.interview_keywords = [
-            'interview', 'coding interview', 'technical interview', 'leetcode', 'hackerrank', 'codeforces',
-            'data structures', 'algorithms', 'system design', 'behavioral interview', 'resume', 'career',
-            'job search', 'placement', 'campus recruitment', 'internship', 'software engineer', 'developer'
-        ]
+        # One compiled matcher shared by filtering and trending scores
+        self.matcher = KEYWORD_MATCHER
+        
+        # Limits for concurrent article page fetches during image extraction
+        self.max_concurrency = max_concurrency or Config.IMAGE_FETCH_CONCURRENCY
+        self.per_host_concurrency = per_host_concurrency or Config.IMAGE_FETCH_PER_HOST
+        self._fetch_semaphore: Optional[asyncio.Semaphore] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        # Picklable relevance check handed to the parsers, which may run in another process
+        self.relevance_check = self.matcher.is_relevant
+        self.executor = executor if executor is not None else parse_executor
+        
+        # Persistent article URL -> image URL cache
+        self.image_cache = image_cache if image_cache is not None else default_image_cache
+        
+        # Articles processed in earlier cycles, skipped by incremental parsing
+        self.fingerprints = fingerprints if fingerprints is not None else default_fingerprint_store
+        
+        # Outcome of each source in the last scrape_all_sources call: ok, pending, timed_out or error
+        self.source_status: Dict[str, str] = {}
+        self._late_sources: set = set()
 
     async def __aenter__(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession(headers=self.headers)
+        await self._ensure_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
-            self.session = None
+        await self.close()
 
     async def _ensure_session(self):
-        """Ensure session is created"""
+        """Ensure session is available, borrowing the shared client when it is running"""
         if not self.session:
-            self.session = aiohttp.ClientSession(headers=self.headers)
+            shared_session = http_client.session
+            if shared_session is not None:
+                self.session = shared_session
+            else:
+                self.session = aiohttp.ClientSession(headers=self.headers)
+                self._owns_session = True
 
-    def clean_html_content(self, html_content: str) -> str:
-        """Clean HTML content and extract plain text"""
-        if not html_content:
-            return ""
-        
-        # First decode HTML entities
-        decoded = html.unescape(html_content)
-        
-        # Use BeautifulSoup to extract text
-        soup = BeautifulSoup(decoded, 'html.parser')
+    async def close(self):
+        """Release the session, closing it only if this scraper created it"""
+        if self.session and self._owns_session:
+            # Sources still running past the deadline need the session until their own timeout
+            if self._late_sources:
+                await asyncio.wait(self._late_sources)
+            await self.session.close()
+        self.session = None
+        self._owns_session = False
+        await self.flush_image_cache()
+
+    async def _cached_image(self, url: str) -> Tuple[bool, Optional[str]]:
+        """Look up an article image in the image cache, in a thread as it may read SQLite"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.image_cache.get, url)
+
+    async def flush_image_cache(self) -> None:
+        """Write the images found since the last flush to disk, in a thread"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.image_cache.flush)
+
+    @asynccontextmanager
+    async def _fetch_slot(self, url: str):
+        """Hold a global and a per-host slot while fetching an article page"""
+        if self._fetch_semaphore is None:
+            self._fetch_semaphore = asyncio.Semaphore(self.max_concurrency)
         
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
+        host = urlparse(url).netloc.lower()
+        host_semaphore = self._host_semaphores.get(host)
+        if host_semaphore is None:
+            host_semaphore = asyncio.Semaphore(self.per_host_concurrency)
+            self._host_semaphores[host] = host_semaphore
         
-        # Get text and clean it up
-        text = soup.get_text()
+        # Wait for the host first so a busy host does not hold global slots
+        async with host_semaphore:
+            async with self._fetch_semaphore:
+                yield
+
+    async def resolve_images(self, candidates: List[Tuple[Dict[str, Any], Callable[[], Awaitable[str]]]]) -> None:
+        """
+        Resolve image URLs for collected articles concurrently
         
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
+        Args:
+            candidates: Pairs of news item and a callable returning its image URL
+        """
+        if not candidates:
+            return
         
-        # Limit length to avoid very long descriptions
-        if len(text) > 300:
-            text = text[:300] + "..."
+        results = await asyncio.gather(
+            *(resolver() for _, resolver in candidates),
+            return_exceptions=True
+        )
         
-        return text
+        for (news_item, _), image_url in zip(candidates, results):
+            if isinstance(image_url, Exception):
+                logger.debug(f"Image extraction failed for {news_item.get('url')}: {image_url}")
+                image_url = DEFAULT_IMAGE_URL
+            news_item['image_url'] = image_url
+
+    def clean_html_content(self, html_content: str) -> str:
+        """Clean HTML content and extract plain text"""
+        return clean_html_content(html_content)
 
     async def extract_image_url(self, entry, soup=None) -> str:
         """Extract image URL from RSS entry or HTML content"""
         try:
-            # Try to get image from RSS media content
-            if hasattr(entry, 'media_content') and entry.media_content:
-                return entry.media_content[0]['url']
-            
-            # Try to get image from RSS enclosures
-            if hasattr(entry, 'enclosures') and entry.enclosures:
-                for enclosure in entry.enclosures:
-                    if enclosure.get('type', '').startswith('image/'):
-                        return enclosure.get('href', '')
-            
-            # Try to get image from RSS links
-            if hasattr(entry, 'links') and entry.links:
-                for link in entry.links:
-                    if link.get('type', '').startswith('image/'):
-                        return link.get('href', '')
+            # Try to get image from the RSS entry itself
+            image_url = image_from_entry(entry)
+            if image_url:
+                return image_url
             
             # Try to extract from HTML content if available
             if soup:
-                # Look for common image selectors
-                img_selectors = [
-                    'img[src]',
-                    'meta[property="og:image"]',
-                    'meta[name="twitter:image"]',
-                    'meta[property="twitter:image"]'
-                ]
-                
-                for selector in img_selectors:
-                    img_elem = soup.select_one(selector)
-                    if img_elem:
-                        src = img_elem.get('src') or img_elem.get('content')
-                        if src:
-                            return src
+                image_url = image_from_markup(soup)
+                if image_url:
+                    return image_url
             
             # If we have an entry with a link, try to visit the actual article page
             if hasattr(entry, 'link') and entry.link:
-                try:
-                    await self._ensure_session()
-                    # Reduced timeout for faster response
-                    async with self.session.get(entry.link, timeout=5) as response:
-                        if response.status == 200:
-                            article_content = await response.text()
-                            article_soup = BeautifulSoup(article_content, 'html.parser')
-                            
-                            # Look for images in the article content
-                            img_selectors = [
-                                'meta[property="og:image"]',
-                                'meta[name="twitter:image"]',
-                                'meta[property="twitter:image"]',
-                                'meta[property="image"]',
-                                'meta[name="image"]'
-                            ]
-                            
-                            for selector in img_selectors:
-                                img_elem = article_soup.select_one(selector)
-                                if img_elem:
-                                    content_attr = img_elem.get('content')
-                                    if content_attr:
-                                        # Make sure it's an absolute URL
-                                        if content_attr.startswith('http'):
-                                            return content_attr
-                                        elif content_attr.startswith('//'):
-                                            return 'https:' + content_attr
-                                        else:
-                                            # Try to construct absolute URL
-                                            try:
-                                                from urllib.parse import urljoin
-                                                return urljoin(entry.link, content_attr)
-                                            except:
-                                                continue
-                            
-                            # Look for any img tag with a reasonable src
-                            for img in article_soup.find_all('img'):
-                                src = img.get('src')
-                                if src and not src.startswith('data:') and len(src) > 10:
-                                    if src.startswith('http'):
-                                        return src
-                                    elif src.startswith('//'):
-                                        return 'https:' + src
-                                    else:
-                                        try:
-                                            from urllib.parse import urljoin
-                                            return urljoin(entry.link, src)
-                                        except:
-                                            continue
-                                    
-                except Exception as e:
-                    logger.debug(f"Could not fetch article content for image extraction: {e}")
+                return await self.extract_image_from_url(entry.link)
             
             # Default placeholder image - using a working URL
-            return "https://picsum.photos/400/200?random=1"
+            return DEFAULT_IMAGE_URL
             
         except Exception as e:
             logger.warning(f"Error extracting image: {e}")
-            return "https://picsum.photos/400/200?random=1"
+            return DEFAULT_IMAGE_URL
 
     async def extract_image_from_url(self, url: str) -> str:
         """Extract image from a given article URL"""
+        # Known articles (and known failures) skip the network entirely
+        found, cached_image_url = await self._cached_image(url)
+        if found:
+            return cached_image_url or DEFAULT_IMAGE_URL
+        
+        image_url = None
         try:
             await self._ensure_session()
-            async with self.session.get(url, timeout=5) as response:
+            # Reduced timeout for faster response
+            async with self._fetch_slot(url), self.session.get(url, timeout=5) as response:
                 if response.status == 200:
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    # Look for Open Graph and Twitter meta images first
-                    meta_selectors = [
-                        'meta[property="og:image"]',
-                        'meta[name="twitter:image"]',
-                        'meta[property="twitter:image"]',
-                        'meta[property="image"]',
-                        'meta[name="image"]'
-                    ]
-                    
-                    for selector in meta_selectors:
-                        meta_elem = soup.select_one(selector)
-                        if meta_elem:
-                            content_attr = meta_elem.get('content')
-                            if content_attr:
-                                if content_attr.startswith('http'):
-                                    return content_attr
-                                elif content_attr.startswith('//'):
-                                    return 'https:' + content_attr
-                    
-                    # Look for any img tag with a reasonable src
-                    for img in soup.find_all('img'):
-                        src = img.get('src')
-                        if src and not src.startswith('data:') and len(src) > 10:
-                            if src.startswith('http'):
-                                return src
-                            elif src.startswith('//'):
-                                return 'https:' + src
-                            else:
-                                try:
-                                    from urllib.parse import urljoin
-                                    return urljoin(url, src)
-                                except:
-                                    continue
+                    if Config.IMAGE_STREAMING_FETCH:
+                        image_url = await self._scan_image_stream(response, url)
+                    else:
+                        image_url = self._find_image_in_page(await response.text(), url)
                     
         except Exception as e:
             logger.debug(f"Could not extract image from URL {url}: {e}")
         
-        return "https://picsum.photos/400/200?random=1"
+        # Failures are cached as well, with a shorter TTL; flush_image_cache writes them
+        self.image_cache.set(url, image_url)
+        return image_url or DEFAULT_IMAGE_URL
+
+    async def _scan_image_stream(self, response: aiohttp.ClientResponse, url: str) -> Optional[str]:
+        """
+        Read an article page in chunks until its image is found
+        
+        The download stops as soon as a meta image is seen, or once the first
+        usable <img> after </head> is found, so most of the page is never read.
+        """
+        scanner = MetaImageScanner(url)
+        try:
+            decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        
+        received = 0
+        async for chunk in response.content.iter_chunked(Config.IMAGE_SCAN_CHUNK_SIZE):
+            received += len(chunk)
+            image_url = scanner.feed(decoder.decode(chunk))
+            if image_url:
+                return image_url
+            if received >= Config.IMAGE_SCAN_MAX_BYTES:
+                logger.debug(f"No image in the first {received} bytes of {url}")
+                break
+        
+        return None
+
+    def _find_image_in_page(self, content: str, url: str) -> Optional[str]:
+        """Find the article image in a fully downloaded page"""
+        # Only meta and img tags are needed to find the image
+        soup = make_soup(content, parse_only=PAGE_IMAGES)
+        
+        # Look for Open Graph and Twitter meta images first
+        meta_selectors = [
+            'meta[property="og:image"]',
+            'meta[name="twitter:image"]',
+            'meta[property="twitter:image"]',
+            'meta[property="image"]',
+            'meta[name="image"]'
+        ]
+        
+        for selector in meta_selectors:
+            meta_elem = soup.select_one(selector)
+            if meta_elem:
+                image_url = absolute_url(meta_elem.get('content') or '', url)
+                if image_url:
+                    return image_url
+        
+        # Look for any img tag with a reasonable src
+        for img in soup.find_all('img'):
+            src = img.get('src')
+            if src and not src.startswith('data:') and len(src) > 10:
+                image_url = absolute_url(src, url)
+                if image_url:
+                    return image_url
+        
+        return None
 
     def is_relevant_news(self, title: str, content: str = "") -> bool:
         """Check if the news is relevant to coding or interview preparation"""
-        text = (title + " " + content).lower()
+        return self.matcher.is_relevant(title, content)
+
+    def relevance_score(self, news: Dict[str, Any]) -> int:
+        """Number of distinct coding and interview keywords in a news item"""
+        return relevance_score(news)
+
+    async def _fetch_source(
+        self,
+        url: str,
+        source_label: str,
+        parse_func: Callable[..., List[Dict[str, Any]]],
+        incremental: bool = False,
+        **parse_options
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch a feed or index page with a conditional GET and parse it if it changed
         
-        # Check for coding-related keywords
-        coding_matches = sum(1 for keyword in self.coding_keywords if keyword.lower() in text)
+        Args:
+            url: Feed or index page URL
+            source_label: Human readable source name used in log messages
+            parse_func: Function from scrapers.source_parsers turning the body into news items
+            incremental: Skip articles processed in earlier cycles (parse_func must accept `seen`)
+            **parse_options: Extra arguments for parse_func
+            
+        Returns:
+            List of news items, reused from the previous parse on a 304 response
+            
+        Raises:
+            aiohttp.ClientError: If the request fails or the status is not 200 or 304
+        """
+        await self._ensure_session()
+        request_headers = self.validators.request_headers(url)
         
-        # Check for interview-related keywords
-        interview_matches = sum(1 for keyword in self.interview_keywords if keyword.lower() in text)
+        async with self.session.get(url, headers=request_headers) as response:
+            if response.status == 304:
+                cached_items = self.validators.get_parsed(url)
+                if cached_items is not None:
+                    logger.debug(f"{source_label} not modified, reusing parsed items")
+                    return [dict(item) for item in cached_items]
+            
+            if response.status != 200:
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history, status=response.status,
+                    message=f"{source_label} returned status {response.status}"
+                )
+            
+            content = await response.text()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+        
+        news_items = await self._parse_source(content, parse_func, incremental, **parse_options)
+        self.validators.store(url, news_items, etag=etag, last_modified=last_modified)
+        return [dict(item) for item in news_items]
+
+    async def _parse_source(
+        self,
+        content: str,
+        parse_func: Callable[..., List[Dict[str, Any]]],
+        incremental: bool = False,
+        **parse_options
+    ) -> List[Dict[str, Any]]:
+        """
+        Parse a whole source as one job in the parse executor, then resolve missing images
+        
+        In incremental mode articles processed in an earlier cycle come back
+        from the parser as stubs and are replaced by the kept items, so only
+        new articles are cleaned, filtered, scored and have their image
+        resolved. Kept items still showing the placeholder image go through
+        the image cache again.
+        """
+        if incremental:
+            parse_options['seen'] = self.fingerprints.known()
+        parsed_items = await self.executor.run(
+            parse_func, content, is_relevant=self.relevance_check, **parse_options
+        )
+        
+        news_items = []
+        new_items = []
+        image_candidates = []
+        retried_items = []
+        for news_item in parsed_items:
+            if 'title' in news_item:
+                new_items.append(news_item)
+                news_items.append(news_item)
+            elif news_item.get('relevant') is False:
+                self.fingerprints.put(news_item['fingerprint'], None)
+            else:
+                kept_item = self.fingerprints.get(news_item['fingerprint'])
+                if kept_item is not None:
+                    news_items.append(kept_item)
+                    # The image was not found last time; the image cache's
+                    # negative TTL decides when the page is fetched again
+                    if kept_item.get('image_url') == DEFAULT_IMAGE_URL and kept_item['url'].startswith('http'):
+                        image_candidates.append((kept_item, partial(self.extract_image_from_url, kept_item['url'])))
+                        retried_items.append(kept_item)
+        
+        for news_item in new_items:
+            if news_item['image_url']:
+                continue
+            if news_item['url'].startswith('http'):
+                image_candidates.append((news_item, partial(self.extract_image_from_url, news_item['url'])))
+            else:
+                news_item['image_url'] = DEFAULT_IMAGE_URL
+        
+        await self.resolve_images(image_candidates)
+        for news_item in retried_items:
+            if news_item['image_url'] != DEFAULT_IMAGE_URL:
+                self.fingerprints.put(news_item['fingerprint'], news_item)
         
-        return coding_matches > 0 or interview_matches > 0
+        if incremental:
+            for news_item in new_items:
+                news_item['relevance_score'] = relevance_score(news_item)
+                published_ts = parse_published_date(news_item.get('published_date'))
+                news_item['published_ts'] = published_ts if published_ts is not None else time.time()
+                self.fingerprints.put(news_item['fingerprint'], news_item)
+            logger.debug(f"Processed {len(new_items)} new articles, kept {len(news_items) - len(new_items)}")
+        return news_items
 
     async def scrape_techcrunch(self) -> List[Dict[str, Any]]:
         """Scrape TechCrunch for tech news"""
-        try:
-            await self._ensure_session()
-            url = "https://techcrunch.com/feed/"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    feed = feedparser.parse(content)
-                    
-                    news_items = []
-                    for entry in feed.entries[:20]:  # Get latest 20 articles
-                        if self.is_relevant_news(entry.title, entry.get('summary', '')):
-                            # Clean the description
-                            clean_description = self.clean_html_content(entry.get('summary', ''))
-                            
-                            # Extract image
-                            image_url = await self.extract_image_url(entry)
-                            
-                            news_items.append({
-                                'title': entry.title,
-                                'description': clean_description,
-                                'url': entry.link,
-                                'published_date': entry.get('published', ''),
-                                'source': 'TechCrunch',
-                                'category': 'tech',
-                                'image_url': image_url
-                            })
-                    return news_items
-                else:
-                    logger.warning(f"TechCrunch returned status {response.status}")
-                    return []
-        except Exception as e:
-            logger.error(f"Error scraping TechCrunch: {e}")
-            return []
+        return await self._fetch_source(
+            "https://techcrunch.com/feed/", "TechCrunch",
+            parse_rss_feed, incremental=True, source='TechCrunch', category='tech'
+        )
 
     async def scrape_hackernews(self) -> List[Dict[str, Any]]:
         """Scrape Hacker News"""
-        try:
-            await self._ensure_session()
-            url = "https://news.ycombinator.com/"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    news_items = []
-                    # Find all story rows
-                    stories = soup.find_all('tr', class_='athing')
-                    
-                    for story in stories[:30]:  # Get top 30 stories
-                        title_elem = story.find('span', class_='titleline')
-                        if title_elem:
-                            title_link = title_elem.find('a')
-                            if title_link:
-                                title = title_link.get_text(strip=True)
-                                url = title_link.get('href', '')
-                                
-                                if title and self.is_relevant_news(title):
-                                    # Extract image from the actual article page
-                                    image_url = await self.extract_image_from_url(url)
-                                    
-                                    news_items.append({
-                                        'title': title,
-                                        'description': f"Hacker News story: {title}",
-                                        'url': url,
-                                        'published_date': datetime.now().strftime('%Y-%m-%d'),
-                                        'source': 'Hacker News',
-                                        'category': 'tech',
-                                        'image_url': image_url
-                                    })
-                    return news_items
-                else:
-                    logger.warning(f"Hacker News returned status {response.status}")
-                    return []
-        except Exception as e:
-            logger.error(f"Error scraping Hacker News: {e}")
-            return []
+        return await self._fetch_source(
+            "https://news.ycombinator.com/", "Hacker News",
+            parse_hackernews, incremental=True
+        )
 
     async def scrape_dev_to(self) -> List[Dict[str, Any]]:
         """Scrape Dev.to for programming articles"""
-        try:
-            await self._ensure_session()
-            url = "https://dev.to/feed"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    feed = feedparser.parse(content)
-                    
-                    news_items = []
-                    for entry in feed.entries[:20]:
-                        if self.is_relevant_news(entry.title, entry.get('summary', '')):
-                            # Clean the description
-                            clean_description = self.clean_html_content(entry.get('summary', ''))
-                            
-                            # Extract image
-                            image_url = await self.extract_image_url(entry)
-                            
-                            news_items.append({
-                                'title': entry.title,
-                                'description': clean_description,
-                                'url': entry.link,
-                                'published_date': entry.get('published', ''),
-                                'source': 'Dev.to',
-                                'category': 'programming',
-                                'image_url': image_url
-                            })
-                    return news_items
-                else:
-                    logger.warning(f"Dev.to returned status {response.status}")
-                    return []
-        except Exception as e:
-            logger.error(f"Error scraping Dev.to: {e}")
-            return []
+        return await self._fetch_source(
+            "https://dev.to/feed", "Dev.to",
+            parse_rss_feed, incremental=True, source='Dev.to', category='programming'
+        )
 
     async def scrape_leetcode_blog(self) -> List[Dict[str, Any]]:
         """Scrape LeetCode blog for interview preparation"""
-        try:
-            await self._ensure_session()
-            url = "https://leetcode.com/blog/"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    news_items = []
-                    # Look for blog post links
-                    articles = soup.find_all('article') or soup.find_all('div', class_='post')
-                    
-                    for article in articles[:15]:
-                        title_elem = article.find('h2') or article.find('h3')
-                        if title_elem:
-                            title = title_elem.get_text(strip=True)
-                            if title and self.is_relevant_news(title):
-                                link = title_elem.find('a') or article.find('a')
-                                url = urljoin("https://leetcode.com/blog", link.get('href', '')) if link else ""
-                                
-                                # Get description
-                                desc_elem = article.find('p')
-                                description = desc_elem.get_text(strip=True) if desc_elem else ""
-                                
-                                # Extract image from the actual article page if we have a URL
-                                if url and url.startswith('http'):
-                                    image_url = await self.extract_image_from_url(url)
-                                else:
-                                    image_url = await self.extract_image_url(None, article)
-                                
-                                news_items.append({
-                                    'title': title,
-                                    'description': description,
-                                    'url': url,
-                                    'published_date': datetime.now().strftime('%Y-%m-%d'),
-                                    'source': 'LeetCode Blog',
-                                    'category': 'interview',
-                                    'image_url': image_url
-                                })
-                    return news_items
-                else:
-                    logger.warning(f"LeetCode blog returned status {response.status}")
-                    return []
-        except Exception as e:
-            logger.error(f"Error scraping LeetCode blog: {e}")
-            return []
+        return await self._fetch_source(
+            "https://leetcode.com/blog/", "LeetCode blog",
+            parse_blog_index, incremental=True, base_url="https://leetcode.com/blog",
+            source='LeetCode Blog', category='interview'
+        )
 
     async def scrape_geeksforgeeks(self) -> List[Dict[str, Any]]:
         """Scrape GeeksforGeeks for interview preparation"""
-        try:
-            await self._ensure_session()
-            url = "https://www.geeksforgeeks.org/"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    news_items = []
-                    # Look for article links
-                    articles = soup.find_all('article') or soup.find_all('div', class_='post')
-                    
-                    for article in articles[:15]:
-                        title_elem = article.find('h2') or article.find('h3')
-                        if title_elem:
-                            title = title_elem.get_text(strip=True)
-                            if title and self.is_relevant_news(title):
-                                link = title_elem.find('a') or article.find('a')
-                                url = urljoin("https://www.geeksforgeeks.org", link.get('href', '')) if link else ""
-                                
-                                # Get description
-                                desc_elem = article.find('p')
-                                description = desc_elem.get_text(strip=True) if desc_elem else ""
-                                
-                                # Extract image from the actual article page if we have a URL
-                                if url and url.startswith('http'):
-                                    image_url = await self.extract_image_from_url(url)
-                                else:
-                                    image_url = await self.extract_image_url(None, article)
-                                
-                                news_items.append({
-                                    'title': title,
-                                    'description': description,
-                                    'url': url,
-                                    'published_date': datetime.now().strftime('%Y-%m-%d'),
-                                    'source': 'GeeksforGeeks',
-                                    'category': 'interview',
-                                    'image_url': image_url
-                                })
-                    return news_items
-                else:
-                    logger.warning(f"GeeksforGeeks returned status {response.status}")
-                    return []
-        except Exception as e:
-            logger.error(f"Error scraping GeeksforGeeks: {e}")
-            return []
+        return await self._fetch_source(
+            "https://www.geeksforgeeks.org/", "GeeksforGeeks",
+            parse_blog_index, incremental=True, base_url="https://www.geeksforgeeks.org",
+            source='GeeksforGeeks', category='interview'
+        )
 
     async def scrape_stackoverflow_blog(self) -> List[Dict[str, Any]]:
         """Scrape Stack Overflow blog"""
+        return await self._fetch_source(
+            "https://stackoverflow.blog/", "Stack Overflow blog",
+            parse_blog_index, incremental=True, base_url="https://stackoverflow.blog",
+            source='Stack Overflow Blog', category='programming'
+        )
+
+    async def _scrape_source(
+        self,
+        name: str,
+        timeout: float,
+        on_source: Optional[Callable[[str, List[Dict[str, Any]], str], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Scrape one source within its timeout, recording how it ended"""
         try:
-            await self._ensure_session()
-            url = "https://stackoverflow.blog/"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    news_items = []
-                    # Look for blog post links
-                    articles = soup.find_all('article') or soup.find_all('div', class_='post')
-                    
-                    for article in articles[:15]:
-                        title_elem = article.find('h2') or article.find('h3')
-                        if title_elem:
-                            title = title_elem.get_text(strip=True)
-                            if title and self.is_relevant_news(title):
-                                link = title_elem.find('a') or article.find('a')
-                                url = urljoin("https://stackoverflow.blog", link.get('href', '')) if link else ""
-                                
-                                # Get description
-                                desc_elem = article.find('p')
-                                description = desc_elem.get_text(strip=True) if desc_elem else ""
-                                
-                                # Extract image from the actual article page if we have a URL
-                                if url and url.startswith('http'):
-                                    image_url = await self.extract_image_from_url(url)
-                                else:
-                                    image_url = await self.extract_image_url(None, article)
-                                
-                                news_items.append({
-                                    'title': title,
-                                    'description': description,
-                                    'url': url,
-                                    'published_date': datetime.now().strftime('%Y-%m-%d'),
-                                    'source': 'Stack Overflow Blog',
-                                    'category': 'programming',
-                                    'image_url': image_url
-                                })
-                    return news_items
-                else:
-                    logger.warning(f"Stack Overflow blog returned status {response.status}")
-                    return []
+            news_items = await asyncio.wait_for(getattr(self, SOURCES[name])(), timeout)
+            status = 'ok'
+        except asyncio.TimeoutError:
+            logger.warning(f"{name} did not finish within {timeout} seconds")
+            news_items, status = [], 'timed_out'
         except Exception as e:
-            logger.error(f"Error scraping Stack Overflow blog: {e}")
-            return []
+            logger.error(f"Error scraping {name}: {e}")
+            news_items, status = [], 'error'
+        
+        self.source_status[name] = status
+        if on_source is not None:
+            on_source(name, news_items, status)
+        return news_items
 
-    async def scrape_all_sources(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Scrape all news sources concurrently"""
-        await self._ensure_session()
+    def _late_source_done(
+        self,
+        name: str,
+        on_late_source: Optional[Callable[[str, List[Dict[str, Any]], str], None]],
+        task: asyncio.Future
+    ) -> None:
+        self._late_sources.discard(task)
+        if task.cancelled():
+            return
         
-        tasks = [
-            self.scrape_techcrunch(),
-            self.scrape_hackernews(),
-            self.scrape_dev_to(),
-            self.scrape_leetcode_blog(),
-            self.scrape_geeksforgeeks(),
-            self.scrape_stackoverflow_blog()
-        ]
+        # Failures are handed on too, so the source stops being reported pending
+        news_items, status = task.result(), self.source_status.get(name)
+        logger.info(f"{name} ended after the deadline ({status}) with {len(news_items)} items")
+        if on_late_source is not None:
+            on_late_source(name, news_items, status)
+
+    async def scrape_all_sources(
+        self,
+        deadline: Optional[float] = None,
+        source_timeout: Optional[float] = None,
+        on_late_source: Optional[Callable[[str, List[Dict[str, Any]], str], None]] = None,
+        on_source: Optional[Callable[[str, List[Dict[str, Any]], str], None]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Scrape all news sources concurrently
+        
+        Each source gets its own timeout. Once the deadline passes the call
+        returns what has finished; sources still running are marked
+        'pending' in self.source_status, keep running in the background and
+        are handed to on_late_source when they end, whether or not they
+        succeed.
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        Args:
+            deadline: Seconds to wait for the sources, None waits for every source
+            source_timeout: Seconds a single source may take, defaults to Config.SCRAPER_TIMEOUT
+            on_late_source: Called with (source name, items, status) for a source ending after the deadline
+            on_source: Called with (source name, items, status) as each source ends, in completion order
+            
+        Returns:
+            Mapping of source name to news items, empty for sources that failed or are pending
+        """
+        await self._ensure_session()
+        self.fingerprints.prune()
+        source_timeout = source_timeout or Config.SCRAPER_TIMEOUT
+        self.source_status = {name: 'pending' for name in SOURCES}
         
-        # Process results and filter out exceptions
-        news_data = {
-            'techcrunch': results[0] if not isinstance(results[0], Exception) else [],
-            'hackernews': results[1] if not isinstance(results[1], Exception) else [],
-            'dev_to': results[2] if not isinstance(results[2], Exception) else [],
-            'leetcode_blog': results[3] if not isinstance(results[3], Exception) else [],
-            'geeksforgeeks': results[4] if not isinstance(results[4], Exception) else [],
-            'stackoverflow_blog': results[5] if not isinstance(results[5], Exception) else []
+        tasks = {
+            name: asyncio.ensure_future(self._scrape_source(name, source_timeout, on_source))
+            for name in SOURCES
         }
+        _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        
+        news_data = {}
+        for name, task in tasks.items():
+            if task in pending:
+                news_data[name] = []
+                self._late_sources.add(task)
+                task.add_done_callback(partial(self._late_source_done, name, on_late_source))
+            else:
+                news_data[name] = task.result()
         
+        if pending:
+            logger.info(f"Deadline reached, still waiting for: {', '.join(n for n, t in tasks.items() if t in pending)}")
+        # Images of late sources are written by the next flush, at the latest in close()
+        await self.flush_image_cache()
         return news_data
 
     async def get_latest_news(self, category: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """Get latest news with optional category filtering"""
         all_news = await self.scrape_all_sources()
         
-        # Flatten all news items
-        flat_news = []
-        for source, news_list in all_news.items():
-            if news_list:  # Only process if news_list is not empty
-                for news in news_list:
-                    news['source_name'] = source
-                    flat_news.append(news)
-        
-        # Filter by category if specified
-        if category:
-            flat_news = [news for news in flat_news if news.get('category') == category]
-        
-        # Sort by date (newest first) and limit results
-        flat_news.sort(key=lambda x: x.get('published_date', ''), reverse=True)
-        
-        return flat_news[:limit]
+        # Flatten, filter and sort newest first, then limit results
+        return flatten_news(all_news, category)[:limit]
 
     def add_delay(self):
         """Add random delay to avoid being blocked"""
@@ -0,0 +1,199 @@
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+from urllib.parse import urljoin
+
+import feedparser
+
+from scrapers.html_parser import make_soup, clean_html_content, HACKERNEWS_STORIES, BLOG_ARTICLES, BLOG_POSTS
+from utils.url_utils import url_fingerprint
+
+# Parsers are plain module-level functions working on strings, so a whole source
+# can be submitted to a thread or process pool as one job. Images that can only be
+# found on the article page are left as None and resolved later by NewsScraper.
+#
+# When a parser gets the `seen` fingerprints of articles processed in an earlier
+# cycle it skips all work for them and emits a stub {'fingerprint': ...} in their
+# place, and a stub with 'relevant': False for new articles that are filtered out.
+# NewsScraper swaps the stubs for the items it kept from earlier cycles.
+
+# Predicate deciding whether a title (and optional content) is relevant
+RelevanceCheck = Callable[[str, str], bool]
+
+def image_from_entry(entry) -> Optional[str]:
+    """Get the image URL an RSS entry carries itself, if any"""
+    # Try to get image from RSS media content
+    if hasattr(entry, 'media_content') and entry.media_content:
+        return entry.media_content[0]['url']
+
+    # Try to get image from RSS enclosures
+    if hasattr(entry, 'enclosures') and entry.enclosures:
+        for enclosure in entry.enclosures:
+            if enclosure.get('type', '').startswith('image/'):
+                return enclosure.get('href', '')
+
+    # Try to get image from RSS links
+    if hasattr(entry, 'links') and entry.links:
+        for link in entry.links:
+            if link.get('type', '').startswith('image/'):
+                return link.get('href', '')
+
+    return None
+
+def image_from_markup(soup) -> Optional[str]:
+    """Get an image URL from an already parsed piece of HTML, if any"""
+    # Look for common image selectors
+    img_selectors = [
+        'img[src]',
+        'meta[property="og:image"]',
+        'meta[name="twitter:image"]',
+        'meta[property="twitter:image"]'
+    ]
+
+    for selector in img_selectors:
+        img_elem = soup.select_one(selector)
+        if img_elem:
+            src = img_elem.get('src') or img_elem.get('content')
+            if src:
+                return src
+
+    return None
+
+def skip_stub(fingerprint: str, seen: Optional[FrozenSet[str]]) -> Optional[Dict[str, Any]]:
+    """Stub standing in for an article processed in an earlier cycle, None if it is new"""
+    if seen is not None and fingerprint in seen:
+        return {'fingerprint': fingerprint}
+    return None
+
+def parse_rss_feed(
+    content: str,
+    source: str,
+    category: str,
+    is_relevant: RelevanceCheck,
+    seen: Optional[FrozenSet[str]] = None
+) -> List[Dict[str, Any]]:
+    """Parse an RSS feed into news items"""
+    feed = feedparser.parse(content)
+
+    news_items = []
+    for entry in feed.entries[:20]:  # Get latest 20 articles
+        fingerprint = url_fingerprint(entry.get('link', '') or entry.title)
+        stub = skip_stub(fingerprint, seen)
+        if stub:
+            news_items.append(stub)
+        elif is_relevant(entry.title, entry.get('summary', '')):
+            news_items.append({
+                'title': entry.title,
+                'description': clean_html_content(entry.get('summary', '')),
+                'url': entry.link,
+                'published_date': entry.get('published', ''),
+                'source': source,
+                'category': category,
+                # None means the image is looked up on the article page
+                'image_url': image_from_entry(entry),
+                'fingerprint': fingerprint
+            })
+        elif seen is not None:
+            news_items.append({'fingerprint': fingerprint, 'relevant': False})
+    return news_items
+
+def parse_hackernews(
+    content: str,
+    is_relevant: RelevanceCheck,
+    seen: Optional[FrozenSet[str]] = None
+) -> List[Dict[str, Any]]:
+    """Parse the Hacker News front page into news items"""
+    # Only the story rows are built into the tree
+    soup = make_soup(content, parse_only=HACKERNEWS_STORIES)
+
+    news_items = []
+    # Find all story rows
+    stories = soup.find_all('tr', class_='athing')
+
+    for story in stories[:30]:  # Get top 30 stories
+        title_elem = story.find('span', class_='titleline')
+        if title_elem:
+            title_link = title_elem.find('a')
+            if title_link:
+                title = title_link.get_text(strip=True)
+                url = title_link.get('href', '')
+                if not title:
+                    continue
+
+                fingerprint = url_fingerprint(url or title)
+                stub = skip_stub(fingerprint, seen)
+                if stub:
+                    news_items.append(stub)
+                elif is_relevant(title, ""):
+                    news_items.append({
+                        'title': title,
+                        # The front page only has titles
+                        'description': "",
+                        'url': url,
+                        # The page has no date, so the story is stamped when first seen
+                        'published_date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                        'source': 'Hacker News',
+                        'category': 'tech',
+                        # Image comes from the actual article page
+                        'image_url': None,
+                        'fingerprint': fingerprint
+                    })
+                elif seen is not None:
+                    news_items.append({'fingerprint': fingerprint, 'relevant': False})
+    return news_items
+
+def parse_blog_index(
+    content: str,
+    base_url: str,
+    source: str,
+    category: str,
+    is_relevant: RelevanceCheck,
+    seen: Optional[FrozenSet[str]] = None
+) -> List[Dict[str, Any]]:
+    """Parse a blog index page with <article> or div.post entries into news items"""
+    # Look for blog post links, parsing only the post subtrees
+    articles = (
+        make_soup(content, parse_only=BLOG_ARTICLES).find_all('article')
+        or make_soup(content, parse_only=BLOG_POSTS).find_all('div', class_='post')
+    )
+
+    news_items = []
+    for article in articles[:15]:
+        title_elem = article.find('h2') or article.find('h3')
+        if title_elem:
+            title = title_elem.get_text(strip=True)
+            if not title:
+                continue
+
+            link = title_elem.find('a') or article.find('a')
+            url = urljoin(base_url, link.get('href', '')) if link else ""
+            fingerprint = url_fingerprint(url or f"{base_url}/{title}")
+            stub = skip_stub(fingerprint, seen)
+            if stub:
+                news_items.append(stub)
+            elif not is_relevant(title, ""):
+                if seen is not None:
+                    news_items.append({'fingerprint': fingerprint, 'relevant': False})
+            else:
+                # Get description
+                desc_elem = article.find('p')
+                description = desc_elem.get_text(strip=True) if desc_elem else ""
+
+                # Extract image from the actual article page if we have a URL,
+                # otherwise from the index markup itself
+                if url and url.startswith('http'):
+                    image_url = None
+                else:
+                    image_url = image_from_markup(article)
+
+                news_items.append({
+                    'title': title,
+                    'description': description,
+                    'url': url,
+                    # The index has no date, so the post is stamped when first seen
+                    'published_date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                    'source': source,
+                    'category': category,
+                    'image_url': image_url,
+                    'fingerprint': fingerprint
+                })
+    return news_items
@@ -1,7 +1,35 @@
 import pytest
 import asyncio
-from scrapers.news_scraper import NewsScraper
-from utils.cache_manager import CacheManager
+import json
+import time
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from scrapers.news_scraper import NewsScraper, DEFAULT_IMAGE_URL, SOURCES
+from scrapers.image_scanner import MetaImageScanner
+from scrapers.html_parser import make_soup, html_to_text, HACKERNEWS_STORIES, BLOG_ARTICLES
+from utils.cache_manager import CacheManager, estimate_size
+from utils.cache_backends import LocalBackend, create_backend
+from utils.http_client import http_client, ConditionalRequestCache
+from utils.loop_monitor import EventLoopMonitor
+from utils.parse_executor import ParseExecutor
+from scrapers.source_parsers import parse_hackernews
+from scrapers.keyword_matcher import KeywordMatcher
+from utils.image_cache import ImageURLCache
+from utils.url_utils import normalize_url, url_fingerprint
+from utils.fingerprint_store import FingerprintStore
+from utils.article_store import ArticleStore
+from utils.dedupe import NearDuplicateIndex, collapse_duplicates, minhash
+from utils.search_index import SearchIndex
+from utils.trending import TrendingIndex
+from utils.time_index import TimeIndex
+from utils.date_utils import parse_published_date
+from scrapers.ingestion import NewsIngestor
+from api import news_routes
+from pathlib import Path
+from fastapi import HTTPException
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
 
 class TestNewsScraper:
     """Basic tests for the news scraper"""
@@ -33,6 +61,381 @@ class TestNewsScraper:
         interview_title = "Top 10 coding interview questions for 2024"
         assert scraper.is_relevant_news(interview_title) == True
     
+    def test_keyword_matcher_word_boundaries(self):
+        """Test that short keywords no longer match inside other words"""
+        scraper = NewsScraper()
+        
+        assert scraper.is_relevant_news("Rainbow said the Google team won") == False
+        assert scraper.is_relevant_news("Go 1.22 ships range-over-func") == True
+        assert scraper.is_relevant_news("AI-assisted code review") == True
+        assert scraper.is_relevant_news("C++20 modules in practice") == True
+        
+        # Names take no plural suffix, whose forms are other words
+        assert scraper.is_relevant_news("The show goes on") == False
+        assert scraper.is_relevant_news("The team rests before the final") == False
+        assert scraper.is_relevant_news("She expresses her thanks") == False
+        assert scraper.is_relevant_news("Go's new release") == True
+        assert scraper.is_relevant_news("Designing REST APIs") == True
+    
+    def test_keyword_matcher_counts(self):
+        """Test that per-keyword hit counts are returned in one pass"""
+        matcher = KeywordMatcher(['interview', 'coding interview', 'python', 'node.js'])
+        
+        counts = matcher.counts("Coding interview tips: Python, more Python and Node.js interviews")
+        assert counts == {'coding interview': 1, 'interview': 2, 'python': 2, 'node.js': 1}
+        assert matcher.score("Python interview") == 2
+    
+    @pytest.mark.asyncio
+    async def test_image_resolution_concurrency(self):
+        """Test that image resolution respects the global and per-host limits"""
+        scraper = NewsScraper(max_concurrency=3, per_host_concurrency=1)
+        active = {"total": 0, "peak": 0}
+        active_hosts = {}
+        
+        async def fake_fetch(url):
+            host = url.split('/')[2]
+            async with scraper._fetch_slot(url):
+                active["total"] += 1
+                active_hosts[host] = active_hosts.get(host, 0) + 1
+                active["peak"] = max(active["peak"], active["total"])
+                assert active_hosts[host] == 1
+                await asyncio.sleep(0.01)
+                active_hosts[host] -= 1
+                active["total"] -= 1
+            return url + "/image.png"
+        
+        items = [{'url': f"https://host{i % 5}.example.com/post/{i}"} for i in range(20)]
+        await scraper.resolve_images([
+            (item, lambda url=item['url']: fake_fetch(url)) for item in items
+        ])
+        
+        assert active["peak"] == 3
+        assert all(item['image_url'] == item['url'] + "/image.png" for item in items)
+    
+    @pytest.mark.asyncio
+    async def test_conditional_get_reuses_parsed_items(self):
+        """Test that a 304 response reuses the previous parse"""
+        requests_seen = []
+        
+        async def feed(request):
+            requests_seen.append(request.headers.get('If-None-Match'))
+            if request.headers.get('If-None-Match') == '"v1"':
+                return web.Response(status=304)
+            return web.Response(text="<rss></rss>", headers={'ETag': '"v1"'})
+        
+        app = web.Application()
+        app.router.add_get('/feed', feed)
+        parse_calls = []
+        
+        def parse(content, is_relevant):
+            parse_calls.append(content)
+            return [{'title': 'Python 3.13 released', 'url': 'https://example.com/a', 'image_url': 'https://example.com/a.png'}]
+        
+        async with TestServer(app) as server:
+            url = str(server.make_url('/feed'))
+            async with NewsScraper(validators=ConditionalRequestCache()) as scraper:
+                first = await scraper._fetch_source(url, "Test feed", parse)
+                first[0]['source_name'] = 'test'
+                second = await scraper._fetch_source(url, "Test feed", parse)
+        
+        assert requests_seen == [None, '"v1"']
+        assert len(parse_calls) == 1
+        assert second == [{'title': 'Python 3.13 released', 'url': 'https://example.com/a', 'image_url': 'https://example.com/a.png'}]
+    
+    @pytest.mark.asyncio
+    async def test_failing_source_reported_as_error(self):
+        """Test that a source that is down counts as an error, not as empty"""
+        async def down(request):
+            return web.Response(status=503)
+        
+        app = web.Application()
+        app.router.add_get('/feed', down)
+        
+        async with TestServer(app) as server:
+            url = str(server.make_url('/feed'))
+            async with NewsScraper(validators=ConditionalRequestCache()) as scraper:
+                scraper.scrape_hackernews = lambda: scraper._fetch_source(url, "Test feed", parse_hackernews)
+                assert await scraper._scrape_source('hackernews', timeout=5) == []
+                
+                async def unreachable(*args, **kwargs):
+                    raise aiohttp.ClientConnectionError("connection refused")
+                
+                scraper._fetch_source = unreachable
+                await scraper._scrape_source('techcrunch', timeout=5)
+        
+        assert scraper.source_status == {'hackernews': 'error', 'techcrunch': 'error'}
+    
+    @pytest.mark.parametrize("backend", ["html.parser", "lxml"])
+    def test_strained_parsing_backends(self, backend):
+        """Test that both parser backends find the same entries in restricted trees"""
+        hackernews = (FIXTURES_DIR / "hackernews.html").read_text(encoding="utf-8")
+        stories = make_soup(hackernews, parse_only=HACKERNEWS_STORIES, backend=backend).find_all('tr', class_='athing')
+        assert len(stories) == 30
+        assert stories[0].find('span', class_='titleline').find('a').get('href').startswith('https://')
+        
+        blog = (FIXTURES_DIR / "blog_index.html").read_text(encoding="utf-8")
+        articles = make_soup(blog, parse_only=BLOG_ARTICLES, backend=backend).find_all('article')
+        assert len(articles) == 15
+        
+        text = html_to_text('<p>Hello <b>world</b></p><script>var x = 1;</script>', backend=backend)
+        assert text == "Hello world"
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+    async def test_parse_executor_modes(self, mode):
+        """Test that a whole source can be parsed in every executor mode"""
+        scraper = NewsScraper(executor=ParseExecutor(mode=mode, max_workers=1))
+        content = (FIXTURES_DIR / "hackernews.html").read_text(encoding="utf-8")
+        try:
+            news_items = await scraper.executor.run(parse_hackernews, content, is_relevant=scraper.relevance_check)
+        finally:
+            scraper.executor.shutdown()
+        
+        assert news_items
+        assert all(item['source'] == 'Hacker News' and item['image_url'] is None for item in news_items)
+    
+    @pytest.mark.asyncio
+    async def test_event_loop_monitor(self):
+        """Test that blocking the event loop is recorded as a stall"""
+        monitor = EventLoopMonitor(interval=0.01, stall_threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.1)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+        
+        stats = monitor.get_stats()
+        assert stats['stalls'] >= 1
+        assert stats['max_lag_ms'] >= 50
+    
+    def test_meta_image_scanner_chunks(self):
+        """Test that the streaming scanner finds meta images split across chunks"""
+        page = (
+            '<html><head><title>Post</title>'
+            '<meta name="twitter:image" content="/img/card.png">'
+            '</head><body>' + '<p>text</p>' * 1000 + '</body></html>'
+        )
+        scanner = MetaImageScanner("https://blog.example.com/post/1")
+        found = None
+        consumed = 0
+        for start in range(0, len(page), 7):
+            consumed = start + 7
+            found = scanner.feed(page[start:start + 7])
+            if found:
+                break
+        
+        assert found == "https://blog.example.com/img/card.png"
+        assert consumed < 200
+    
+    def test_meta_image_scanner_img_fallback(self):
+        """Test that the scanner falls back to <img> tags after </head>"""
+        scanner = MetaImageScanner("https://blog.example.com/post/1")
+        assert scanner.feed('<html><head><meta property="og:title" content="x"></he') is None
+        assert scanner.feed('ad><body><img src="data:image/png;base64,xx"><img src="//cdn.exa') is None
+        assert scanner.feed('mple.com/cover.jpg" alt="">') == "https://cdn.example.com/cover.jpg"
+    
+    @pytest.mark.asyncio
+    async def test_streaming_image_extraction(self):
+        """Test that the article image is found without reading the whole page"""
+        async def article(request):
+            response = web.StreamResponse()
+            await response.prepare(request)
+            await response.write(b'<html><head><meta property="og:image" content="https://img.example.com/a.png">')
+            await response.write(b'</head><body>' + b'x' * 1024 * 1024 + b'</body></html>')
+            return response
+        
+        app = web.Application()
+        app.router.add_get('/article', article)
+        
+        async with TestServer(app) as server:
+            async with NewsScraper(image_cache=ImageURLCache(':memory:')) as scraper:
+                image_url = await scraper.extract_image_from_url(str(server.make_url('/article')))
+        
+        assert image_url == "https://img.example.com/a.png"
+    
+    @pytest.mark.asyncio
+    async def test_image_cache_skips_network(self):
+        """Test that found images and failures are both cached"""
+        hits = []
+        
+        async def article(request):
+            hits.append(request.path)
+            if request.path == '/dead':
+                return web.Response(status=404)
+            return web.Response(text='<html><head><meta property="og:image" content="https://img.example.com/b.png"></head></html>')
+        
+        app = web.Application()
+        app.router.add_get('/article', article)
+        app.router.add_get('/dead', article)
+        cache = ImageURLCache(':memory:', ttl=60, negative_ttl=30)
+        
+        async with TestServer(app) as server:
+            article_url = str(server.make_url('/article'))
+            dead_url = str(server.make_url('/dead'))
+            async with NewsScraper(image_cache=cache) as scraper:
+                for _ in range(2):
+                    assert await scraper.extract_image_from_url(article_url + "?utm_source=x") == "https://img.example.com/b.png"
+                    assert await scraper.extract_image_from_url(dead_url) == DEFAULT_IMAGE_URL
+                # Same article once tracking parameters are dropped
+                assert await scraper.extract_image_from_url(article_url + "/") == "https://img.example.com/b.png"
+        
+        assert hits == ['/article', '/dead']
+        assert cache.get(dead_url) == (True, None)
+    
+    @pytest.mark.asyncio
+    async def test_image_cache_writes_once_per_scrape(self, tmp_path):
+        """Test that images found while scraping are written in one flush"""
+        path = str(tmp_path / "images.db")
+        cache = ImageURLCache(path, ttl=60, negative_ttl=30)
+        cache.set("https://example.com/a", "https://img.example.com/a.png")
+        cache.set("https://example.com/b", None)
+        
+        # Visible to lookups at once, but not on disk yet
+        assert cache.get_many(["https://example.com/a?utm_source=x", "https://example.com/b", "https://example.com/c"]) == {
+            "https://example.com/a?utm_source=x": "https://img.example.com/a.png",
+            "https://example.com/b": None
+        }
+        other = ImageURLCache(path, ttl=60, negative_ttl=30)
+        assert other.get("https://example.com/a") == (False, None)
+        
+        async with NewsScraper(image_cache=cache):
+            pass
+        assert other.get_many(["https://example.com/a", "https://example.com/b"]) == {
+            "https://example.com/a": "https://img.example.com/a.png",
+            "https://example.com/b": None
+        }
+        assert cache.flush() == 0
+        cache.close()
+        other.close()
+    
+    def test_normalize_url(self):
+        """Test that URL variants of the same article share one key"""
+        assert normalize_url("HTTPS://Example.com:443/post/1/?utm_source=rss&b=2&a=1#comments") == "https://example.com/post/1?a=1&b=2"
+        assert normalize_url("http://example.com") == "http://example.com/"
+    
+    def test_fingerprint_store(self):
+        """Test that URL variants share a fingerprint and unseen articles are forgotten"""
+        fingerprint = url_fingerprint("https://example.com/post/1?utm_source=rss")
+        assert fingerprint == url_fingerprint("HTTPS://Example.com/post/1/")
+        
+        store = FingerprintStore(retention=60)
+        store.put(fingerprint, {'title': 'Post'})
+        store.put("irrelevant", None)
+        assert store.known() == {fingerprint, "irrelevant"}
+        assert store.get(fingerprint) == {'title': 'Post'}
+        assert store.get("irrelevant") is None
+        
+        store._entries["irrelevant"]['last_seen'] -= 120
+        assert store.prune() == 1
+        assert store.known() == {fingerprint}
+    
+    @pytest.mark.asyncio
+    async def test_source_deadlines(self):
+        """Sources past the deadline are reported pending and delivered when they finish"""
+        def source(delay, items=None, error=None):
+            async def scrape():
+                await asyncio.sleep(delay)
+                if error:
+                    raise error
+                return items or [{'title': f'after {delay}s'}]
+            return scrape
+        
+        late = []
+        async with NewsScraper() as scraper:
+            scraper.scrape_techcrunch = source(0)
+            scraper.scrape_hackernews = source(0)
+            scraper.scrape_dev_to = source(0, error=RuntimeError("boom"))
+            scraper.scrape_leetcode_blog = source(0.2)
+            scraper.scrape_geeksforgeeks = source(0.3)  # beyond the source timeout
+            scraper.scrape_stackoverflow_blog = source(0.01)
+            
+            started = time.perf_counter()
+            news_data = await scraper.scrape_all_sources(
+                deadline=0.1, source_timeout=0.25,
+                on_late_source=lambda name, items, status: late.append((name, items, status))
+            )
+            assert time.perf_counter() - started < 0.2
+            assert scraper.source_status == {
+                'techcrunch': 'ok', 'hackernews': 'ok', 'dev_to': 'error',
+                'leetcode_blog': 'pending', 'geeksforgeeks': 'pending', 'stackoverflow_blog': 'ok'
+            }
+            assert news_data['techcrunch'] and news_data['leetcode_blog'] == []
+        
+        # Leaving the context waited for the late sources, failed ones included
+        assert late == [('leetcode_blog', [{'title': 'after 0.2s'}], 'ok'), ('geeksforgeeks', [], 'timed_out')]
+        assert scraper.source_status['leetcode_blog'] == 'ok'
+        assert scraper.source_status['geeksforgeeks'] == 'timed_out'
+    
+    @pytest.mark.asyncio
+    async def test_incremental_parsing_skips_known_articles(self):
+        """Articles seen in an earlier cycle are not filtered or resolved again"""
+        content = (FIXTURES_DIR / "hackernews.html").read_text(encoding="utf-8")
+        scraper = NewsScraper(executor=ParseExecutor(mode="inline"), fingerprints=FingerprintStore())
+        relevance_calls = []
+        image_calls = []
+        
+        def is_relevant(title, text=""):
+            relevance_calls.append(title)
+            return scraper.matcher.is_relevant(title, text)
+        
+        async def extract_image_from_url(url):
+            image_calls.append(url)
+            return "https://example.com/image.png"
+        
+        scraper.relevance_check = is_relevant
+        scraper.extract_image_from_url = extract_image_from_url
+        
+        first = await scraper._parse_source(content, parse_hackernews, incremental=True)
+        assert len(relevance_calls) == 30
+        assert first and len(image_calls) == len(first)
+        assert all(item['relevance_score'] >= 1 for item in first)
+        assert first[0]['fingerprint'] == url_fingerprint(first[0]['url'])
+        
+        # Second cycle over the same page: nothing is processed again
+        second = await scraper._parse_source(content, parse_hackernews, incremental=True)
+        assert len(relevance_calls) == 30
+        assert len(image_calls) == len(first)
+        assert second == first
+        
+        # A new story is the only one processed
+        new_story = (
+            '<tr class="athing"><td><span class="titleline">'
+            '<a href="https://example.com/new-python">New Python release</a></span></td></tr>'
+        )
+        third = await scraper._parse_source(new_story + content, parse_hackernews, incremental=True)
+        assert relevance_calls[30:] == ['New Python release']
+        assert image_calls[-1] == 'https://example.com/new-python'
+        # The page is capped at 30 stories, so the last one dropped off
+        assert third[1:] == first[:-1]
+    
+    @pytest.mark.asyncio
+    async def test_kept_articles_retry_placeholder_image(self):
+        """Kept articles whose image lookup failed are looked up again, until an image is found"""
+        content = (FIXTURES_DIR / "hackernews.html").read_text(encoding="utf-8")
+        scraper = NewsScraper(executor=ParseExecutor(mode="inline"), fingerprints=FingerprintStore())
+        image_calls = []
+        found = set()
+        
+        async def extract_image_from_url(url):
+            image_calls.append(url)
+            return "https://example.com/image.png" if url in found else DEFAULT_IMAGE_URL
+        
+        scraper.extract_image_from_url = extract_image_from_url
+        
+        first = await scraper._parse_source(content, parse_hackernews, incremental=True)
+        assert first and all(item['image_url'] == DEFAULT_IMAGE_URL for item in first)
+        
+        # The page of the first story now has an image
+        found.add(first[0]['url'])
+        second = await scraper._parse_source(content, parse_hackernews, incremental=True)
+        assert len(image_calls) == 2 * len(first)
+        assert second[0]['image_url'] == "https://example.com/image.png"
+        assert all(item['image_url'] == DEFAULT_IMAGE_URL for item in second[1:])
+        
+        # Once found, the image is kept without another lookup
+        await scraper._parse_source(content, parse_hackernews, incremental=True)
+        assert len(image_calls) == 3 * len(first) - 1
+    
     @pytest.mark.asyncio
     async def test_scraper_context_manager(self):
         """Test that the scraper works as a context manager"""
@@ -40,6 +443,437 @@ class TestNewsScraper:
             assert scraper.session is not None
             # Test that we can access session methods
             assert hasattr(scraper.session, 'get')
+    
+    @pytest.mark.asyncio
+    async def test_scraper_borrows_shared_client(self):
+        """Test that the scraper borrows the shared session and leaves it open"""
+        session = await http_client.start()
+        try:
+            async with NewsScraper() as scraper:
+                assert scraper.session is session
+            assert not session.closed
+        finally:
+            await http_client.close()
+        assert session.closed
+
+class FakeScraper:
+    """Stands in for NewsScraper, counting the ingestion runs"""
+    
+    runs = 0
+    news_data = {}
+    source_status = {}
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+    
+    async def scrape_all_sources(self, **options):
+        type(self).runs += 1
+        await asyncio.sleep(0.01)
+        return self.news_data
+
+class TestNewsIngestor:
+    """Tests for the background ingestion and the article store"""
+    
+    @pytest.mark.asyncio
+    async def test_requests_read_from_snapshot(self):
+        """Concurrent cold-start requests share one ingestion run"""
+        FakeScraper.runs = 0
+        FakeScraper.news_data = {
+            'hackernews': [{'title': 'Old', 'category': 'tech', 'published_date': '2024-01-01'}],
+            'dev_to': [{'title': 'New', 'category': 'programming', 'published_date': '2024-02-01'}]
+        }
+        store = ArticleStore(CacheManager())
+        ingestor = NewsIngestor(store, interval=60, max_retries=1, scraper_factory=FakeScraper)
+        
+        results = await asyncio.gather(*(ingestor.get_snapshot() for _ in range(20)))
+        assert FakeScraper.runs == 1
+        assert all(result.value is store.latest for result in results)
+        
+        snapshot = store.latest
+        assert snapshot.version == 1
+        assert [news['title'] for news in snapshot.latest] == ['New', 'Old']
+        assert snapshot.latest[0]['source_name'] == 'dev_to'
+        assert [news['title'] for news in snapshot.select(category='tech')] == ['Old']
+        assert snapshot.select(source='dev_to')[0]['title'] == 'New'
+        assert snapshot.select(category='tech', source='dev_to') == []
+        assert snapshot.summary['sources']['hackernews'] == {'count': 1, 'status': 'ok', 'categories': {'tech': 1}}
+        
+        # Reading again does not scrape
+        result = await ingestor.get_snapshot()
+        assert FakeScraper.runs == 1 and result.cached and not result.stale
+    
+    def test_near_duplicates_collapsed(self):
+        """The same story from several sources is served once, with the others under also_on"""
+        news_data = {
+            'techcrunch': [{'title': 'Python 3.13 released with experimental JIT compiler',
+                            'description': 'The Python core team shipped its yearly release, headlined by a copy-and-patch JIT',
+                            'url': 'https://techcrunch.com/python', 'category': 'tech', 'published_date': '2024-03-02'}],
+            'hackernews': [{'title': 'Python 3.13 released with experimental JIT compiler', 'description': '',
+                            'url': 'https://python.org/3.13', 'category': 'tech', 'published_date': '2024-03-01'}],
+            'dev_to': [
+                {'title': 'Python 3.13 is out with an experimental JIT compiler',
+                 'description': 'Here is what changed for everyday code and how to try the JIT yourself',
+                 'url': 'https://dev.to/python', 'category': 'tech', 'published_date': '2024-03-01'},
+                {'title': 'Rust 1.80 adds new lint checks', 'description': 'The Rust release ships stricter lints',
+                 'url': 'https://dev.to/rust', 'category': 'tech', 'published_date': '2024-02-01'}
+            ]
+        }
+        snapshot = ArticleStore(CacheManager()).publish(news_data)
+        
+        assert [news['url'] for news in snapshot.latest] == ['https://techcrunch.com/python', 'https://dev.to/rust']
+        assert sorted(other['url'] for other in snapshot.latest[0]['also_on']) == ['https://dev.to/python', 'https://python.org/3.13']
+        assert snapshot.latest[1]['also_on'] == []
+        assert len(snapshot.select(category='tech')) == 2
+        # The source view still lists every article of the source
+        assert len(snapshot.select(source='dev_to')) == 2
+        
+        index = NearDuplicateIndex(threshold=0.6)
+        index.add('a', minhash(news_data['techcrunch'][0]))
+        assert [key for _, key in index.query(minhash(news_data['dev_to'][0]))] == ['a']
+        assert index.query(minhash(news_data['dev_to'][1])) == []
+    
+    def test_similar_titles_not_collapsed(self):
+        """Stories sharing a title pattern stay apart, within a source and across sources"""
+        news_items = [
+            {'title': 'Ask HN: How do you learn Python?', 'source_name': 'hackernews', 'url': 'https://news.ycombinator.com/item?id=1'},
+            {'title': 'Ask HN: How do you learn Rust?', 'source_name': 'hackernews', 'url': 'https://news.ycombinator.com/item?id=2'},
+            {'title': 'Show HN: A Python debugger', 'source_name': 'hackernews', 'url': 'https://example.com/pdb'},
+            {'title': 'Show HN: A Rust debugger', 'source_name': 'hackernews', 'url': 'https://example.com/rdb'},
+            {'title': 'How to learn Rust in 2024', 'source_name': 'dev_to', 'url': 'https://dev.to/rust'}
+        ]
+        representatives = collapse_duplicates([dict(news) for news in news_items], threshold=0.6)
+        
+        assert [news['url'] for news in representatives] == [news['url'] for news in news_items]
+        assert all(news['also_on'] == [] for news in representatives)
+    
+    def test_search_index(self):
+        """The search index ranks with BM25 and answers phrase, prefix and category queries"""
+        news_items = [
+            {'title': 'Python 3.13 released', 'description': 'The new Python ships a JIT compiler',
+             'category': 'tech', 'url': 'https://example.com/python'},
+            {'title': 'Rust web frameworks compared', 'description': 'Python developers try Rust',
+             'category': 'programming', 'url': 'https://example.com/rust'},
+            {'title': 'JIT compilers explained', 'description': 'How a JIT compiler works in Python',
+             'category': 'tech', 'url': 'https://example.com/jit'}
+        ]
+        index = SearchIndex()
+        index.sync(news_items)
+        
+        def urls(query, **options):
+            results, _ = index.search(query, **options)
+            return [news['url'].rsplit('/', 1)[1] for _, news in results]
+        
+        # A title match outranks a description match
+        assert urls('python') == ['python', 'rust', 'jit']
+        assert urls('python', category='tech') == ['python', 'jit']
+        assert urls('python rust') == ['rust']
+        assert sorted(urls('"jit compiler"')) == ['jit', 'python']
+        assert urls('"compiler python"') == []
+        assert urls('compil*')[0] == 'jit'
+        assert urls('') == []
+        
+        # Articles that left the feed are dropped, edited ones reindexed
+        index.sync([news_items[0], dict(news_items[1], title='Go web frameworks compared')])
+        assert urls('rust') == ['rust']
+        assert urls('go') == ['rust']
+        assert urls('jit') == ['python']
+        assert index.get_stats()['documents'] == 2
+    
+    def test_time_ordering(self):
+        """Dates in any format are parsed once and order the articles, with range queries"""
+        news_data = {
+            'techcrunch': [
+                {'title': 'Evening', 'published_date': 'Tue, 10 Sep 2024 18:00:00 +0000'},
+                {'title': 'Morning', 'published_date': 'Tue, 10 Sep 2024 08:00:00 +0000'}
+            ],
+            'hackernews': [{'title': 'Noon', 'published_date': '2024-09-10T12:00:00+00:00'}],
+            'dev_to': [
+                {'title': 'Undated'},
+                {'title': 'Day before', 'published_date': '2024-09-09'}
+            ]
+        }
+        snapshot = ArticleStore(CacheManager()).publish(news_data)
+        
+        assert [news['title'] for news in snapshot.latest] == ['Evening', 'Noon', 'Morning', 'Day before', 'Undated']
+        assert snapshot.latest[1]['published_ts'] == parse_published_date('2024-09-10T12:00:00Z')
+        
+        noon = parse_published_date('2024-09-10T12:00:00Z')
+        assert [news['title'] for news in snapshot.select(since=noon)] == ['Evening', 'Noon']
+        assert [news['title'] for news in snapshot.select(until=noon - 1, since=1)] == ['Morning', 'Day before']
+        assert [news['title'] for news in snapshot.select(source='techcrunch', until=noon)] == ['Morning']
+        
+        index = TimeIndex(snapshot.latest)
+        assert index.range(since=noon + 1, until=noon + 2) == []
+    
+    def test_trending_index(self):
+        """Trending ranks keyword relevance decayed by age and is precomputed per snapshot"""
+        now = 1_700_000_000
+        hour = 3600
+        index = TrendingIndex(half_life=hour)
+        articles = {
+            'relevant-old': {'relevance_score': 7, 'published_ts': now - 4 * hour},
+            'relevant-new': {'relevance_score': 3, 'published_ts': now - hour},
+            'fresh': {'relevance_score': 0, 'published_ts': now},
+            'rfc822': {'relevance_score': 1, 'published_date': 'Tue, 14 Nov 2023 21:13:20 +0000'},
+            'undated': {'relevance_score': 2}
+        }
+        index.sync(articles.items(), now=now)
+        
+        top = index.top(5, now=now)
+        assert [news for _, news in top][:2] == [articles['undated'], articles['relevant-new']]
+        assert [round(score, 3) for score, _ in top] == [3.0, 2.0, 1.0, 1.0, 0.5]
+        
+        # Aging shifts every score equally, so the order holds without recomputing
+        later = index.top(2, now=now + hour)
+        assert [news for _, news in later] == [articles['undated'], articles['relevant-new']]
+        assert [round(score, 3) for score, _ in later] == [1.5, 1.0]
+        
+        del articles['undated'], articles['rfc822']
+        index.sync(articles.items(), now=now)
+        assert [news for _, news in index.top(10, now=now)] == [
+            articles['relevant-new'], articles['fresh'], articles['relevant-old']
+        ]
+        
+        snapshot = ArticleStore(CacheManager()).publish({'hackernews': [
+            {'title': 'Python tips', 'category': 'tech', 'relevance_score': 1},
+            {'title': 'Rust and Go interview prep', 'category': 'tech', 'relevance_score': 4}
+        ]})
+        assert [news['title'] for _, news in snapshot.trending] == ['Rust and Go interview prep', 'Python tips']
+    
+    @pytest.mark.asyncio
+    async def test_publish_async_keeps_loop_free(self):
+        """Snapshots and indexes are built off the event loop, and published in call order"""
+        news_data = {
+            source: [
+                {'title': f'{source} story {i} ' + ' '.join(f'{source}{(i * 7 + j) % 3000}' for j in range(8)),
+                 'description': ' '.join(f'term{(i * 11 + j) % 3000}' for j in range(40)),
+                 'url': f'https://example.com/{source}/{i}', 'category': 'tech', 'relevance_score': i % 5}
+                for i in range(150)
+            ]
+            for source in ('techcrunch', 'dev_to')
+        }
+        store = ArticleStore(CacheManager(), executor=ParseExecutor(mode="thread", max_workers=1))
+        gaps = []
+        
+        async def ticker():
+            while True:
+                started = time.perf_counter()
+                await asyncio.sleep(0.001)
+                gaps.append(time.perf_counter() - started)
+        
+        ticking = asyncio.ensure_future(ticker())
+        first, second = await asyncio.gather(
+            store.publish_async(news_data),
+            store.publish_async({'techcrunch': news_data['techcrunch'][:10]})
+        )
+        ticking.cancel()
+        
+        assert len(gaps) > 5 and max(gaps) < 0.1
+        assert (first.version, second.version) == (1, 2)
+        assert store.peek() is second and len(second.latest) == 10
+        assert store.search_index.get_stats()['documents'] == 10
+        assert len(first.latest) == 300 and first.trending
+    
+    @pytest.mark.asyncio
+    async def test_workers_share_ingestion(self):
+        """Workers sharing a cache backend scrape once and serve the same versions"""
+        FakeScraper.runs = 0
+        FakeScraper.news_data = {'hackernews': [{'title': 'Shared', 'category': 'tech', 'url': 'https://example.com/1'}]}
+        FakeScraper.source_status = {}
+        backend = LocalBackend()
+        stores = [ArticleStore(CacheManager(backend=backend)) for _ in range(3)]
+        ingestors = [NewsIngestor(store, interval=60, max_retries=1, scraper_factory=FakeScraper) for store in stores]
+        
+        # Started together: one claims the run, the others wait for its articles
+        assert all(await asyncio.gather(*(ingestor.refresh() for ingestor in ingestors)))
+        assert FakeScraper.runs == 1
+        assert {store.version for store in stores} == {1}
+        assert len({store.epoch for store in stores}) == 1
+        assert all(store.latest.latest[0]['title'] == 'Shared' for store in stores)
+        assert await backend.get("news_snapshot:lease") is None
+        
+        # Started later, within the interval, a worker takes what is shared
+        late = ArticleStore(CacheManager(backend=backend))
+        await NewsIngestor(late, interval=60, max_retries=1, scraper_factory=FakeScraper).refresh()
+        assert FakeScraper.runs == 1 and late.version == 1
+        
+        # A worker's own next run scrapes again, under the next shared version
+        FakeScraper.news_data = {'hackernews': [{'title': 'Newer', 'category': 'tech', 'url': 'https://example.com/2'}]}
+        await ingestors[1].refresh()
+        assert FakeScraper.runs == 2 and stores[1].version == 2
+        await ingestors[0].refresh()
+        assert FakeScraper.runs == 2 and stores[0].version == 2
+        assert stores[0].changes_since(1) == ({'https://example.com/2'}, {'https://example.com/1'})
+        
+        assert create_backend('memory') is None
+        assert isinstance(create_backend('local'), LocalBackend)
+        with pytest.raises(ValueError):
+            create_backend('memcached://localhost')
+    
+    @pytest.mark.asyncio
+    async def test_shared_late_sources_not_lost(self):
+        """Late sources finishing while a shared version is taken land in the run's snapshot"""
+        class SlowBackend(LocalBackend):
+            async def batch(self, operations):
+                await asyncio.sleep(0.05)
+                return await super().batch(operations)
+        
+        class LateScraper(FakeScraper):
+            async def scrape_all_sources(self, on_late_source=None, **options):
+                self.source_status = {'hackernews': 'ok', 'dev_to': 'pending', 'geeksforgeeks': 'pending'}
+                loop = asyncio.get_running_loop()
+                # Both finish while the run waits for its version
+                loop.call_later(0.01, on_late_source, 'dev_to', [{'title': 'Late one', 'category': 'tech'}], 'ok')
+                loop.call_later(0.02, on_late_source, 'geeksforgeeks', [{'title': 'Late two', 'category': 'tech'}], 'ok')
+                return {'hackernews': [{'title': 'On time', 'category': 'tech'}], 'dev_to': [], 'geeksforgeeks': []}
+        
+        backend = SlowBackend()
+        store = ArticleStore(CacheManager(backend=backend))
+        ingestor = NewsIngestor(store, interval=60, max_retries=1, scraper_factory=LateScraper)
+        assert await ingestor.refresh()
+        await asyncio.sleep(0.2)
+        
+        assert store.latest.source_status == {'hackernews': 'ok', 'dev_to': 'ok', 'geeksforgeeks': 'ok'}
+        assert {news['title'] for news in store.latest.latest} == {'On time', 'Late one', 'Late two'}
+        other = ArticleStore(CacheManager(backend=backend))
+        assert (await other.load_shared(60)).version == store.version
+    
+    @pytest.mark.asyncio
+    async def test_stream_takes_shared_snapshot(self):
+        """A stream on a worker taking another worker's articles gets every source from them"""
+        FakeScraper.runs = 0
+        FakeScraper.news_data = {
+            source: [{'title': f'{source} story', 'category': 'tech', 'url': f'https://example.com/{source}'}]
+            for source in SOURCES
+        }
+        FakeScraper.source_status = {}
+        backend = LocalBackend()
+        await NewsIngestor(ArticleStore(CacheManager(backend=backend)), interval=60, max_retries=1,
+                           scraper_factory=FakeScraper).refresh()
+        
+        ingestor = NewsIngestor(ArticleStore(CacheManager(backend=backend)), interval=60, max_retries=1,
+                                scraper_factory=FakeScraper)
+        started = time.perf_counter()
+        streamed = [record async for record in ingestor.stream_sources(timeout=2)]
+        
+        assert time.perf_counter() - started < 1
+        assert FakeScraper.runs == 1
+        assert sorted(source for source, _, _ in streamed) == sorted(SOURCES)
+        assert all(status == 'ok' and news_items[0]['title'] == f'{source} story' for source, news_items, status in streamed)
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kind", ["local", "redis"])
+    async def test_cache_backends(self, kind):
+        """Both backends behave the same, singly and in batches"""
+        from utils.cache_backends import CacheBackend, RedisBackend
+        
+        with pytest.raises(TypeError):
+            CacheBackend()
+        if kind == "redis":
+            fakeredis = pytest.importorskip("fakeredis")
+            backend = RedisBackend("redis://fake", client=fakeredis.FakeAsyncRedis())
+        else:
+            backend = LocalBackend()
+        
+        assert await backend.get("a") is None
+        await backend.set("a", b"1")
+        assert await backend.get("a") == b"1"
+        assert await backend.add("a", b"2") is False
+        assert await backend.add("b", b"2", ttl=0.05) is True
+        assert await backend.incr("counter") == 1
+        assert await backend.delete("a") is True and await backend.delete("a") is False
+        await asyncio.sleep(0.1)
+        assert await backend.get("b") is None
+        
+        assert await backend.batch([
+            ('add', "epoch", b"e1"),
+            ('get', "epoch"),
+            ('incr', "counter"),
+            ('set', "c", b"3", 60),
+            ('delete', "c")
+        ]) == [True, b"e1", 2, None, True]
+        
+        # Shared versions are taken in one batch
+        store = ArticleStore(CacheManager(backend=backend))
+        assert await store.next_version() == 1
+        await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_run_keeps_articles(self):
+        """A run where every source fails does not wipe the stored articles"""
+        FakeScraper.news_data = {'hackernews': [{'title': 'Kept', 'category': 'tech'}]}
+        store = ArticleStore(CacheManager())
+        ingestor = NewsIngestor(store, interval=60, max_retries=1, scraper_factory=FakeScraper)
+        assert await ingestor.refresh()
+        
+        FakeScraper.news_data = {'hackernews': [], 'dev_to': []}
+        assert not await ingestor.refresh()
+        assert ingestor.failures == 1
+        assert store.latest.latest[0]['title'] == 'Kept'
+    
+    @pytest.mark.asyncio
+    async def test_scheduler_start_stop(self):
+        """The scheduler ingests right away and stops cleanly"""
+        FakeScraper.runs = 0
+        FakeScraper.news_data = {'hackernews': [{'title': 'Scheduled', 'category': 'tech'}]}
+        store = ArticleStore(CacheManager())
+        ingestor = NewsIngestor(store, interval=60, max_retries=1, scraper_factory=FakeScraper)
+        
+        ingestor.start()
+        await asyncio.sleep(0.05)
+        assert ingestor.get_stats()['scheduled']
+        await ingestor.stop()
+        
+        assert FakeScraper.runs == 1
+        assert not store.is_empty
+
+    @pytest.mark.asyncio
+    async def test_late_source_merged_into_snapshot(self):
+        """A source finishing after the deadline is published in a new snapshot"""
+        store = ArticleStore(CacheManager())
+        ingestor = NewsIngestor(store, max_retries=1, scraper_factory=FakeScraper)
+        store.publish(
+            {'hackernews': [{'title': 'On time', 'category': 'tech'}], 'dev_to': []},
+            source_status={'dev_to': 'pending'}
+        )
+        assert store.latest.summary['sources']['dev_to']['status'] == 'pending'
+        
+        ingestor._merge_late_source('dev_to', [{'title': 'Late', 'category': 'programming'}], 'ok')
+        await ingestor._late_merge
+        snapshot = store.latest
+        assert snapshot.version == 2
+        assert snapshot.source_status == {'hackernews': 'ok', 'dev_to': 'ok'}
+        assert [news['title'] for news in snapshot.select(source='dev_to')] == ['Late']
+        
+        # Only sources the current snapshot is still missing are merged
+        ingestor._merge_late_source('dev_to', [], 'error')
+        await ingestor._late_merge
+        assert store.latest.version == 2
+    
+    @pytest.mark.asyncio
+    async def test_late_source_failure_published(self):
+        """A source failing after the deadline is published with its final status, not left pending"""
+        def make_scraper():
+            scraper = NewsScraper()
+            for name, method in SOURCES.items():
+                async def scrape(name=name):
+                    if name == 'dev_to':
+                        await asyncio.sleep(0.05)
+                        raise RuntimeError("boom")
+                    return [{'title': f'{name} story', 'category': 'tech'}]
+                setattr(scraper, method, scrape)
+            return scraper
+        
+        store = ArticleStore(CacheManager())
+        ingestor = NewsIngestor(store, deadline=0.01, max_retries=1, scraper_factory=make_scraper)
+        assert await ingestor.refresh()
+        
+        assert store.latest.source_status['dev_to'] == 'error'
+        assert store.latest.summary['sources']['dev_to']['status'] == 'error'
+        assert set(store.latest.source_status.values()) == {'ok', 'error'}
 
 class TestCacheManager:
     """Basic tests for the cache manager"""
@@ -108,6 +942,468 @@ class TestCacheManager:
         assert "average_age_seconds" in stats
         assert stats["total_entries"] >= 2
 
+    def test_cache_bounded_eviction(self):
+        """Entry and byte caps evict by LRU or LFU and are reported in the stats"""
+        lru = CacheManager(max_entries=3, max_bytes=0, policy='lru')
+        for key in ('a', 'b', 'c'):
+            lru.set(key, key)
+        lru.get('a')
+        lru.set('d', 'd')
+        assert lru.get('b') is None
+        assert [lru.get(key) for key in ('a', 'c', 'd')] == ['a', 'c', 'd']
+        
+        lfu = CacheManager(max_entries=3, max_bytes=0, policy='lfu')
+        for key in ('a', 'b', 'c'):
+            lfu.set(key, key)
+        for _ in range(3):
+            lfu.get('a')
+        lfu.get('b')
+        lfu.set('d', 'd')
+        assert lfu.get('c') is None
+        # Replacing a value keeps its use count
+        lfu.set('a', 'A')
+        lfu.set('e', 'e')
+        assert lfu.get('a') == 'A'
+        assert lfu.get('d') is None
+        
+        sized = CacheManager(max_entries=0, max_bytes=100, policy='lru')
+        sized.set('x', b'x' * 60)
+        sized.set('y', b'y' * 60)
+        assert sized.get('x') is None
+        sized.set('huge', b'z' * 101)
+        assert sized.get('huge') is None and sized.get('y') is not None
+        stats = sized.get_stats()
+        assert stats['total_bytes'] == 60
+        assert stats['evictions'] == 1 and stats['evicted_bytes'] == 60
+        
+        # Sizes count nested values, so a big snapshot cannot slip under the cap
+        assert estimate_size([{'a': 'x' * 10000}]) > 10000
+        snapshot = ArticleStore(CacheManager()).publish({'hackernews': [
+            {'title': f'Story {i}', 'description': 'x' * 1000 + str(i), 'category': 'tech'} for i in range(50)
+        ]})
+        assert snapshot.nbytes > 50 * 1000
+        assert estimate_size(snapshot) == snapshot.nbytes
+        
+        # LFU buckets stay ordered as counts grow and buckets empty
+        lfu = CacheManager(max_entries=3, max_bytes=0, policy='lfu')
+        lfu.set('a', 'a')
+        lfu.set('b', 'b')
+        lfu.get('a')
+        lfu.get('b')
+        lfu.get('b')
+        lfu.delete('a')
+        lfu.set('c', 'c')
+        lfu.set('d', 'd')
+        lfu.get('c')
+        lfu.set('e', 'e')
+        assert lfu.get('d') is None
+        assert [lfu.get(key) for key in ('b', 'c', 'e')] == ['b', 'c', 'e']
+
+        with pytest.raises(ValueError):
+            CacheManager(policy='fifo')
+    
+    @pytest.mark.asyncio
+    async def test_expiry_sweeper(self):
+        """Expired entries are counted and removed by the sweeper, not by reading the stats"""
+        cache = CacheManager()
+        for i in range(600):
+            cache.set(f"short{i}", i, expire=0.01)
+        cache.set("stale", "value", expire=0.01, stale_ttl=60)
+        cache.set("long", "value", expire=60)
+        # Setting a key again leaves its old heap items outdated
+        cache.set("short0", 0, expire=0.01)
+        await asyncio.sleep(0.02)
+        
+        stats = cache.get_stats()
+        assert stats['total_entries'] == 602
+        assert stats['expired_entries'] == 0 and stats['stale_entries'] == 0
+        
+        # A limited pass pops 100 heap items, one of them outdated
+        assert cache.clear_expired(limit=100) == 99
+        stats = cache.get_stats()
+        assert stats['total_entries'] == 503 and stats['stale_entries'] == 1
+        
+        cache.start_sweeper(interval=0.01)
+        await asyncio.sleep(0.05)
+        await cache.stop_sweeper()
+        
+        stats = cache.get_stats()
+        assert stats['total_entries'] == 2 and stats['expired_entries'] == 0
+        assert stats['expirations'] == 600
+        assert cache.get("stale") == "value" and cache.get("long") == "value"
+        assert cache.get_stats()['hits'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_get_or_compute_coalesces_misses(self):
+        """Concurrent misses run the computation once and share its result"""
+        cache = CacheManager()
+        calls = 0
+        
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return []
+        
+        results = await asyncio.gather(*(cache.get_or_compute("herd", compute) for _ in range(100)))
+        assert calls == 1
+        assert all(result == [] for result in results)
+        
+        # The empty result is cached like any other value
+        await cache.get_or_compute("herd", compute)
+        assert calls == 1
+        assert cache.get_stats()["in_flight"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_get_or_compute_does_not_cache_errors(self):
+        """A failed computation reaches every waiter and is retried on the next call"""
+        cache = CacheManager()
+        
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+        
+        results = await asyncio.gather(*(cache.get_or_compute("flaky", fail) for _ in range(5)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        
+        async def succeed():
+            return "ok"
+        
+        assert await cache.get_or_compute("flaky", succeed) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self):
+        """Stale values are served at once while one background refresh runs"""
+        cache = CacheManager()
+        refreshes = 0
+        
+        async def refresh():
+            nonlocal refreshes
+            refreshes += 1
+            await asyncio.sleep(0.01)
+            return "fresh"
+        
+        cache.set("swr", "old", expire=0.2, stale_ttl=60, refresh=refresh)
+        await asyncio.sleep(0.25)
+        
+        results = [await cache.fetch("swr", refresh, expire=60) for _ in range(10)]
+        assert all(result.value == "old" and result.stale for result in results)
+        assert cache.get("swr") == "old"
+        assert cache.get_stats()["stale_entries"] == 1
+        
+        await asyncio.sleep(0.05)
+        assert refreshes == 1
+        result = await cache.fetch("swr", refresh, expire=60)
+        assert result.value == "fresh" and not result.stale and result.cached
+    
+    @pytest.mark.asyncio
+    async def test_hard_expiry_recomputes(self):
+        """Past the stale window the caller waits for a new value"""
+        cache = CacheManager()
+        cache.set("hard", "old", expire=0, stale_ttl=0)
+        await asyncio.sleep(0.01)
+        
+        async def compute():
+            return "new"
+        
+        result = await cache.fetch("hard", compute, expire=60)
+        assert result.value == "new" and not result.stale and not result.cached
+
+@pytest.mark.asyncio
+async def test_latest_news_misses_scrape_once(monkeypatch):
+    """100 concurrent /news/latest misses cause exactly one scrape"""
+    FakeScraper.runs = 0
+    FakeScraper.news_data = {'hackernews': [{'title': 'Only once', 'category': 'tech'}]}
+    store = ArticleStore(CacheManager())
+    monkeypatch.setattr(news_routes, 'news_ingestor', NewsIngestor(store, max_retries=1, scraper_factory=FakeScraper))
+    
+    responses = await asyncio.gather(*(
+        news_routes.get_latest_news(category=None, limit=50, source=None, use_cache=True, since=None, until=None, since_cursor=None)
+        for _ in range(100)
+    ))
+    assert FakeScraper.runs == 1
+    assert sum(not response["cached"] for response in responses) == 1
+    assert all(response["data"][0]["title"] == 'Only once' for response in responses)
+
+@pytest.mark.asyncio
+async def test_endpoints_slice_one_snapshot(monkeypatch):
+    """Any limit, category or source is served from one cached snapshot"""
+    FakeScraper.runs = 0
+    FakeScraper.news_data = {
+        'hackernews': [{'title': f'HN {i}', 'category': 'tech', 'published_date': f'2024-01-{i + 10}'} for i in range(5)],
+        'dev_to': [{'title': f'Dev {i}', 'category': 'programming', 'published_date': f'2024-02-{i + 10}'} for i in range(5)]
+    }
+    cache = CacheManager()
+    store = ArticleStore(cache)
+    monkeypatch.setattr(news_routes, 'news_ingestor', NewsIngestor(store, max_retries=1, scraper_factory=FakeScraper))
+    
+    top = await news_routes.get_latest_news(category=None, limit=20, source=None, use_cache=True, since=None, until=None, since_cursor=None)
+    three = await news_routes.get_latest_news(category=None, limit=3, source=None, use_cache=True, since=None, until=None, since_cursor=None)
+    tech = await news_routes.get_news_by_category(category='tech', limit=2)
+    dev = await news_routes.get_news_by_source(source_name='dev_to', limit=50)
+    summary = await news_routes.get_news_summary()
+    search = await news_routes.search_news(query='dev', category=None, limit=2)
+    recent = await news_routes.get_latest_news(
+        category=None, limit=50, source=None, use_cache=True, since='2024-02-12', until='1707782400', since_cursor=None
+    )
+    
+    assert FakeScraper.runs == 1
+    assert cache.get_stats()['total_entries'] == 1
+    assert three['data'] == top['data'][:3]
+    assert [news['title'] for news in tech['data']] == ['HN 4', 'HN 3']
+    assert dev['count'] == 5
+    assert summary['data']['total_articles'] == 10
+    assert search['count'] == 2 and search['total'] == 5
+    # 1707782400 is 2024-02-13 00:00 UTC
+    assert [news['title'] for news in recent['data']] == ['Dev 3', 'Dev 2']
+    with pytest.raises(HTTPException):
+        news_routes.parse_time_param('last tuesday', 'since')
+
+@pytest.mark.asyncio
+async def test_latest_news_delta_sync(monkeypatch):
+    """A cursor from an earlier response gets only what changed since"""
+    FakeScraper.news_data = {'hackernews': [
+        {'title': 'A', 'url': 'https://example.com/a', 'category': 'tech', 'published_date': '2024-01-01'},
+        {'title': 'B', 'url': 'https://example.com/b', 'category': 'tech', 'published_date': '2024-01-02'}
+    ]}
+    store = ArticleStore(CacheManager())
+    monkeypatch.setattr(news_routes, 'news_ingestor', NewsIngestor(store, max_retries=1, scraper_factory=FakeScraper))
+    
+    async def latest(since_cursor=None, limit=50):
+        return await news_routes.get_latest_news(
+            category=None, limit=limit, source=None, use_cache=True, since=None, until=None, since_cursor=since_cursor
+        )
+    
+    first = await latest()
+    assert [news['title'] for news in first['data']] == ['B', 'A']
+    
+    unchanged = await latest(first['cursor'])
+    assert unchanged['changed'] is False and 'data' not in unchanged
+    assert unchanged['cursor'] == first['cursor']
+    
+    store.publish({'hackernews': [
+        FakeScraper.news_data['hackernews'][1],
+        {'title': 'C', 'url': 'https://example.com/c', 'category': 'tech', 'published_date': '2024-01-03'}
+    ]})
+    delta = await latest(first['cursor'])
+    assert delta['changed'] and not delta['reset']
+    assert [news['title'] for news in delta['data']] == ['C']
+    assert delta['removed'] == ['https://example.com/a']
+    assert (await latest(delta['cursor']))['changed'] is False
+    
+    # Unknown cursors and cursors of another view get the whole view
+    for cursor in ('not-a-cursor', first['cursor']):
+        reset = await latest(cursor, limit=1 if cursor == first['cursor'] else 50)
+        assert reset['reset'] and [news['title'] for news in reset['data']][:1] == ['C']
+    
+    # An article leaving a limited view lets the next one move up into it
+    top = await latest(limit=1)
+    assert [news['title'] for news in top['data']] == ['C']
+    store.publish({'hackernews': [FakeScraper.news_data['hackernews'][1]]})
+    shifted = await latest(top['cursor'], limit=1)
+    assert not shifted['reset']
+    assert [news['title'] for news in shifted['data']] == ['B']
+    assert shifted['removed'] == ['https://example.com/c']
+
+@pytest.mark.asyncio
+async def test_stream_emits_sources_as_they_finish(monkeypatch):
+    """The stream sends fast sources before slow ones finish, then a summary"""
+    delays = {'techcrunch': 0, 'hackernews': 0.01, 'dev_to': 0.02,
+              'leetcode_blog': 0.02, 'geeksforgeeks': 0.3, 'stackoverflow_blog': 0.02}
+    runs = 0
+    
+    def make_scraper():
+        nonlocal runs
+        runs += 1
+        scraper = NewsScraper()
+        for name, method in SOURCES.items():
+            async def scrape(name=name):
+                await asyncio.sleep(delays[name])
+                return [{'title': f'{name} story', 'category': 'tech', 'published_date': '2024-01-01'}]
+            setattr(scraper, method, scrape)
+        return scraper
+    
+    ingestor = NewsIngestor(ArticleStore(CacheManager()), deadline=0.1, max_retries=1, scraper_factory=make_scraper)
+    monkeypatch.setattr(news_routes, 'news_ingestor', ingestor)
+    
+    started = time.perf_counter()
+    records = []
+    async for record in news_routes.news_stream_records(category=None, limit=50):
+        if not records:
+            time_to_first = time.perf_counter() - started
+        records.append(record)
+    
+    assert time_to_first < 0.1
+    assert records[0]['source'] == 'techcrunch'
+    assert records[0]['data'][0]['source_name'] == 'techcrunch'
+    assert [r['source'] for r in records[:-1]][-1] == 'geeksforgeeks'
+    assert records[-1]['type'] == 'summary'
+    assert records[-1]['count'] == 6
+    assert set(records[-1]['source_status'].values()) == {'ok'}
+    
+    # With a snapshot in place the stream is served from it without scraping
+    records = [record async for record in news_routes.news_stream_records(category=None, limit=4)]
+    assert runs == 1
+    assert records[-1]['count'] == 4
+    
+    # The late source is merged into the snapshot once its task completes
+    await asyncio.sleep(0.05)
+    assert ingestor.store.latest.source_status['geeksforgeeks'] == 'ok'
+
+@pytest.mark.asyncio
+async def test_stream_formats(monkeypatch):
+    """The endpoint speaks NDJSON by default and SSE on request"""
+    import httpx
+    from fastapi import FastAPI
+    
+    store = ArticleStore(CacheManager())
+    store.publish({'hackernews': [{'title': 'Streamed', 'category': 'tech'}]})
+    monkeypatch.setattr(news_routes, 'news_ingestor', NewsIngestor(store, scraper_factory=FakeScraper))
+    app = FastAPI()
+    app.include_router(news_routes.router, prefix="/api/v1")
+    
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/v1/news/latest/stream")
+        assert response.headers['content-type'].startswith('application/x-ndjson')
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line['type'] for line in lines] == ['source', 'summary']
+        assert lines[0]['data'][0]['title'] == 'Streamed'
+        
+        response = await client.get("/api/v1/news/latest/stream?format=sse")
+        assert response.headers['content-type'].startswith('text/event-stream')
+        assert response.text.startswith('event: source\ndata: {')
+        assert 'event: summary' in response.text
+
+@pytest.mark.asyncio
+async def test_snapshot_etags(monkeypatch):
+    """News responses carry the snapshot version as ETag and revalidate to 304"""
+    import httpx
+    from fastapi import FastAPI
+    from api.http_cache import SnapshotCacheMiddleware
+    
+    store = ArticleStore(CacheManager(), expire=600)
+    store.publish({'hackernews': [{'title': 'Cached story', 'category': 'tech'}]})
+    monkeypatch.setattr(news_routes, 'news_ingestor', NewsIngestor(store, scraper_factory=FakeScraper))
+    app = FastAPI()
+    app.add_middleware(SnapshotCacheMiddleware, store=lambda: store)
+    app.include_router(news_routes.router, prefix="/api/v1")
+    
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.get("/api/v1/news/latest?limit=5")
+        etag = first.headers['etag']
+        assert first.status_code == 200
+        assert 0 < int(first.headers['cache-control'].split('max-age=')[1]) <= 600
+        
+        # Same snapshot: same body, and a conditional request gets no body at all
+        second = await client.get("/api/v1/news/latest?limit=5")
+        assert second.content == first.content
+        revalidated = await client.get("/api/v1/news/latest?limit=5", headers={'If-None-Match': etag})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b''
+        assert revalidated.headers['etag'] == etag
+        
+        summary = await client.get("/api/v1/news/summary", headers={'If-None-Match': f'"other", W/{etag}'})
+        assert summary.status_code == 304
+        
+        # Invalid parameters are rejected before validators are looked at
+        invalid = await client.get("/api/v1/news/category/sports", headers={'If-None-Match': '*'})
+        assert invalid.status_code == 400
+        invalid = await client.get("/api/v1/news/latest?limit=abc", headers={'If-None-Match': '*'})
+        assert invalid.status_code == 422
+        
+        # Streams are never tagged
+        stream = await client.get("/api/v1/news/latest/stream")
+        assert 'etag' not in stream.headers
+        
+        store.publish({'hackernews': [{'title': 'Fresh story', 'category': 'tech'}]})
+        changed = await client.get("/api/v1/news/latest?limit=5", headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['etag'] != etag
+        assert changed.json()['data'][0]['title'] == 'Fresh story'
+
+@pytest.mark.asyncio
+async def test_stale_responses_have_own_etag(monkeypatch):
+    """A body saying the snapshot is stale does not share the ETag of the fresh one"""
+    import httpx
+    from fastapi import FastAPI
+    from api.http_cache import SnapshotCacheMiddleware
+    
+    store = ArticleStore(CacheManager(), expire=1, stale_ttl=60)
+    store.publish({'hackernews': [{'title': 'Cached story', 'category': 'tech'}]})
+    monkeypatch.setattr(news_routes, 'news_ingestor', NewsIngestor(store, scraper_factory=FakeScraper))
+    app = FastAPI()
+    app.add_middleware(SnapshotCacheMiddleware, store=lambda: store)
+    app.include_router(news_routes.router, prefix="/api/v1")
+    
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        fresh = await client.get("/api/v1/news/latest?limit=5")
+        assert fresh.json()['stale'] is False
+        
+        await asyncio.sleep(1.1)
+        stale = await client.get("/api/v1/news/latest?limit=5", headers={'If-None-Match': fresh.headers['etag']})
+        assert stale.status_code == 200
+        assert stale.json()['stale'] is True
+        assert stale.headers['etag'] != fresh.headers['etag']
+        
+        revalidated = await client.get("/api/v1/news/latest?limit=5", headers={'If-None-Match': stale.headers['etag']})
+        assert revalidated.status_code == 304
+
+@pytest.mark.asyncio
+async def test_responses_encoded_once(monkeypatch):
+    """Cached news responses are served as stored bytes, compressed as the client accepts"""
+    import httpx
+    from fastapi import FastAPI
+    from api.http_cache import FastJSONResponse, SnapshotCacheMiddleware
+    from utils.encoding import choose_encoding
+    
+    assert choose_encoding('gzip, deflate, br', ['br', 'gzip']) == 'br'
+    assert choose_encoding('br;q=0.5, gzip', ['br', 'gzip']) == 'gzip'
+    assert choose_encoding('identity', ['br', 'gzip']) is None
+    assert choose_encoding('*;q=0.1', ['gzip']) == 'gzip'
+    
+    store = ArticleStore(CacheManager(), expire=600)
+    store.publish({'hackernews': [
+        {'title': f'Story {i}', 'description': ' '.join(f'word{i}x{j}' for j in range(15)), 'category': 'tech'}
+        for i in range(40)
+    ]})
+    monkeypatch.setattr(news_routes, 'news_ingestor', NewsIngestor(store, scraper_factory=FakeScraper))
+    reads = []
+    current_snapshot = news_routes.current_snapshot
+    
+    async def counting_snapshot(use_cache=True):
+        reads.append(use_cache)
+        return await current_snapshot(use_cache)
+    
+    monkeypatch.setattr(news_routes, 'current_snapshot', counting_snapshot)
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(SnapshotCacheMiddleware, store=lambda: store, encodings=['gzip'])
+    app.include_router(news_routes.router, prefix="/api/v1")
+    
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        plain = await client.get("/api/v1/news/latest?limit=30", headers={'Accept-Encoding': 'identity'})
+        assert 'content-encoding' not in plain.headers
+        assert len(plain.json()['data']) == 30
+        
+        gzipped = await client.get("/api/v1/news/latest?limit=30", headers={'Accept-Encoding': 'gzip'})
+        assert gzipped.headers['content-encoding'] == 'gzip'
+        assert gzipped.headers['vary'] == 'accept-encoding'
+        assert int(gzipped.headers['content-length']) < len(plain.content)
+        assert gzipped.content == plain.content
+        assert gzipped.headers['etag'] != plain.headers['etag']
+        # Only the first request ran the route
+        assert len(reads) == 1
+        
+        revalidated = await client.get(
+            "/api/v1/news/latest?limit=30", headers={'Accept-Encoding': 'gzip', 'If-None-Match': gzipped.headers['etag']}
+        )
+        assert revalidated.status_code == 304
+        
+        # Errors are not cached
+        for _ in range(2):
+            invalid = await client.get("/api/v1/news/category/sports")
+            assert invalid.status_code == 400
+        assert len(reads) == 1
+
 @pytest.mark.asyncio
 async def test_integration_basic():
     """Basic integration test"""
@@ -0,0 +1,499 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from config import Config
+from utils.cache_manager import CacheManager, CacheResult, estimate_size, cache_manager as default_cache_manager
+from utils.date_utils import parse_published_date
+from utils.dedupe import collapse_duplicates
+from utils.encoding import dumps, loads
+from utils.parse_executor import ParseExecutor, parse_executor as default_parse_executor
+from utils.search_index import SearchIndex, document_key
+from utils.time_index import TimeIndex, item_timestamp, merge_by_time
+from utils.trending import TrendingIndex
+
+logger = logging.getLogger(__name__)
+
+def flatten_news(news_data: Dict[str, List[Dict[str, Any]]], category: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Flatten per-source news into one list, newest first
+
+    Items are ordered by 'published_ts', which is parsed from
+    'published_date' for items ingested without one. Each source is put in
+    order on its own (feeds usually already are) and the sources are merged.
+
+    Args:
+        news_data: Mapping of source name to its news items
+        category: Only keep items of this category
+
+    Returns:
+        Copies of the items, each tagged with its 'source_name'
+    """
+    per_source = []
+    for source, news_list in news_data.items():
+        source_news = []
+        for news in news_list or []:
+            if category and news.get('category') != category:
+                continue
+            item = dict(news, source_name=source)
+            if 'published_ts' not in item:
+                item['published_ts'] = parse_published_date(item.get('published_date'))
+            source_news.append(item)
+        source_news.sort(key=item_timestamp, reverse=True)
+        per_source.append(source_news)
+
+    return merge_by_time(per_source)
+
+class NewsSnapshot:
+    """
+    The articles of one ingestion run, with every view the API serves
+
+    Views are built once per run: all articles, per category, per source and
+    per source and category, each newest first. Requests only pick a view and
+    slice it. Items are shared between views, so callers must not modify them.
+
+    Near-duplicate stories from different sources are collapsed into one
+    item listing the others under 'also_on'; the per-source views still
+    hold every article of their source.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        news_data: Dict[str, List[Dict[str, Any]]],
+        source_status: Optional[Dict[str, str]] = None,
+        created_at: Optional[float] = None
+    ):
+        self.version = version
+        self.created_at = created_at if created_at is not None else time.time()
+        self.news_data = news_data
+        self.sources = list(news_data)
+        # ok, pending, timed_out or error for every source
+        self.source_status = {source: 'ok' for source in self.sources}
+        self.source_status.update(source_status or {})
+        all_news = flatten_news(news_data)
+        self.latest = collapse_duplicates(all_news) if Config.DEDUPE_ENABLED else all_news
+
+        self._views: Dict[Tuple[Optional[str], Optional[str]], List[Dict[str, Any]]] = {(None, None): self.latest}
+        for news in self.latest:
+            self._views.setdefault((news.get('category', 'unknown'), None), []).append(news)
+        for source in self.sources:
+            self._views[(None, source)] = []
+        for news in all_news:
+            category, source = news.get('category', 'unknown'), news['source_name']
+            for key in ((None, source), (category, source)):
+                self._views.setdefault(key, []).append(news)
+
+        self.summary = {
+            "total_sources": len(self.sources),
+            "total_articles": len(self.latest),
+            "sources": {
+                source: {
+                    "count": len(self._views[(None, source)]),
+                    "status": self.source_status[source],
+                    "categories": {}
+                }
+                for source in self.sources
+            }
+        }
+        for (category, source), items in self._views.items():
+            if category is not None and source is not None:
+                self.summary["sources"][source]["categories"][category] = len(items)
+
+        # Memory held by the articles and their views, for the cache's accounting
+        self.nbytes = estimate_size((news_data, self._views, self.summary))
+
+        # (trending score, item) pairs as of created_at, set by ArticleStore.publish
+        self.trending: List[Tuple[float, Dict[str, Any]]] = []
+        # Built for a view on its first time range query
+        self._time_indexes: Dict[Tuple[Optional[str], Optional[str]], TimeIndex] = {}
+
+    def select(
+        self,
+        category: Optional[str] = None,
+        source: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the prebuilt view for a category and/or source
+
+        Args:
+            category: Only articles of this category
+            source: Only articles of this source
+            since: Only articles published at or after this time, in epoch seconds
+            until: Only articles published at or before this time, in epoch seconds
+
+        Returns:
+            Articles newest first; slice it, do not modify it
+        """
+        key = (category or None, source or None)
+        view = self._views.get(key, [])
+        if since is None and until is None:
+            return view
+
+        time_index = self._time_indexes.get(key)
+        if time_index is None:
+            time_index = self._time_indexes[key] = TimeIndex(view)
+        return time_index.range(since, until)
+
+class ArticleStore:
+    """
+    Holds the newest snapshot of ingested articles for the API
+
+    The snapshot is kept in the cache under one key, so it gets the cache's
+    soft/hard expiry, background revalidation and miss coalescing. The last
+    published snapshot is also kept here, so a failed ingestion never leaves
+    the API without articles. A full-text index and a trending index over
+    the articles of the newest snapshot are updated on every publish, and
+    the articles each version added and removed are logged for delta syncs.
+    publish_async builds all of that off the event loop.
+
+    If the cache has a shared backend, the articles of each ingestion run
+    are also written there, and the workers of the app take them from
+    there instead of scraping again: versions then come from a shared
+    counter, so every worker serves the same version of the same articles
+    under the same ETags. If the backend fails, the store carries on as
+    if it were not shared.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[CacheManager] = None,
+        key: str = "news_snapshot",
+        expire: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+        executor: Optional[ParseExecutor] = None
+    ):
+        """
+        Args:
+            cache: Cache holding the snapshot, defaults to the shared cache manager
+            key: Cache key of the snapshot
+            expire: Seconds a snapshot is fresh, defaults to Config.CACHE_DEFAULT_TTL
+            stale_ttl: Seconds a stale snapshot is served, defaults to Config.CACHE_STALE_TTL
+            executor: Executor building snapshots for publish_async, defaults to the shared parse executor
+        """
+        self.cache = cache if cache is not None else default_cache_manager
+        self.executor = executor if executor is not None else default_parse_executor
+        self.key = key
+        self.expire = expire or Config.CACHE_DEFAULT_TTL
+        self.stale_ttl = stale_ttl if stale_ttl is not None else Config.CACHE_STALE_TTL
+        self._lock = threading.Lock()
+        # Held while the indexes are synced; publish_async calls also queue on the asyncio lock
+        self._publish_lock = threading.Lock()
+        self._publish_order: Optional[asyncio.Lock] = None
+        self._latest: Optional[NewsSnapshot] = None
+        self.version = 0
+        # Names the version sequence in ETags, as versions restart with the process
+        self.epoch = format(int(time.time()), 'x')
+        self.search_index = SearchIndex()
+        self.trending_index = TrendingIndex()
+        self._article_keys: FrozenSet[str] = frozenset()
+        # version -> (version before, keys added, keys removed); shared versions may skip numbers
+        self._changes: "OrderedDict[int, Tuple[int, FrozenSet[str], FrozenSet[str]]]" = OrderedDict()
+        # (version, view digest) -> keys of the articles a response listed, oldest first
+        self._served_views: "OrderedDict[Tuple[int, str], Tuple[str, ...]]" = OrderedDict()
+
+    @property
+    def is_empty(self) -> bool:
+        """True until the first snapshot has been published"""
+        return self._latest is None
+
+    @property
+    def latest(self) -> Optional[NewsSnapshot]:
+        """The last published snapshot, even if it has expired from the cache"""
+        return self._latest
+
+    def publish(
+        self,
+        news_data: Dict[str, List[Dict[str, Any]]],
+        refresh: Optional[Callable[[], Awaitable[NewsSnapshot]]] = None,
+        source_status: Optional[Dict[str, str]] = None,
+        version: Optional[int] = None,
+        created_at: Optional[float] = None
+    ) -> NewsSnapshot:
+        """
+        Build a new snapshot from an ingestion run and make it current
+
+        Blocks while the snapshot and the indexes are built; code on the
+        event loop uses publish_async.
+
+        Args:
+            news_data: Mapping of source name to its news items
+            refresh: Coroutine function producing the next snapshot once this one is stale
+            source_status: Status of each source, sources not listed count as 'ok'
+            version: Version from next_version, defaults to the one after the current
+            created_at: When the articles were ingested, defaults to now
+
+        Returns:
+            The published snapshot
+        """
+        snapshot = NewsSnapshot(0, news_data, source_status, created_at)
+        self._index(snapshot)
+        return self._commit(snapshot, version, refresh)
+
+    async def publish_async(
+        self,
+        news_data: Dict[str, List[Dict[str, Any]]],
+        refresh: Optional[Callable[[], Awaitable[NewsSnapshot]]] = None,
+        source_status: Optional[Dict[str, str]] = None,
+        version: Optional[int] = None,
+        created_at: Optional[float] = None
+    ) -> NewsSnapshot:
+        """
+        Like publish, without blocking the event loop
+
+        The snapshot, with its duplicate detection and views, is built in
+        the parse executor, and the search and trending indexes are synced
+        in a thread; only the finished snapshot is made current on the
+        loop. Calls are published one at a time, in the order they were made.
+        Takes the same arguments as publish.
+        """
+        if self._publish_order is None:
+            self._publish_order = asyncio.Lock()
+        async with self._publish_order:
+            snapshot = await self.executor.run(NewsSnapshot, 0, news_data, source_status, created_at)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._index, snapshot)
+            return self._commit(snapshot, version, refresh)
+
+    def _index(self, snapshot: NewsSnapshot) -> None:
+        # Sync the search and trending indexes to a snapshot about to be published
+        with self._publish_lock:
+            self.search_index.sync(snapshot.latest)
+            self.trending_index.sync(((document_key(news), news) for news in snapshot.latest), now=snapshot.created_at)
+            snapshot.trending = self.trending_index.top(Config.TRENDING_SIZE, now=snapshot.created_at)
+
+    def _commit(
+        self,
+        snapshot: NewsSnapshot,
+        version: Optional[int],
+        refresh: Optional[Callable[[], Awaitable[NewsSnapshot]]]
+    ) -> NewsSnapshot:
+        # Give an indexed snapshot its version, log its changes and make it current
+        keys = frozenset(document_key(news) for news_list in snapshot.news_data.values() for news in news_list or [])
+        with self._lock:
+            previous_version = self.version
+            self.version = version if version is not None and version > self.version else self.version + 1
+            snapshot.version = self.version
+            self._latest = snapshot
+            self._changes[self.version] = (previous_version, keys - self._article_keys, self._article_keys - keys)
+            self._article_keys = keys
+            while len(self._changes) > Config.DELTA_HISTORY:
+                self._changes.popitem(last=False)
+
+        self.cache.set(self.key, snapshot, expire=self.expire, stale_ttl=self.stale_ttl, refresh=refresh)
+        return snapshot
+
+    def changes_since(self, version: int) -> Optional[Tuple[Set[str], Set[str]]]:
+        """
+        Get the articles added and removed after a version
+
+        Args:
+            version: Snapshot version the client has
+
+        Returns:
+            (keys added, keys removed) up to the newest version, or None if the
+            log no longer reaches back to that version
+        """
+        with self._lock:
+            if version < 0 or version > self.version:
+                return None
+
+            added: Set[str] = set()
+            removed: Set[str] = set()
+            if version == self.version:
+                return added, removed
+            versions = list(self._changes)
+            start = next((i for i, changed in enumerate(versions) if self._changes[changed][0] == version), None)
+            if start is None:
+                return None
+
+            for changed in versions[start:]:
+                _, version_added, version_removed = self._changes[changed]
+                added -= version_removed
+                removed |= version_removed
+                removed -= version_added
+                added |= version_added
+            return added, removed
+
+    def record_view(self, version: int, view: str, keys: List[str]) -> None:
+        """
+        Remember which articles a response listed, to work out deltas of that view later
+
+        Args:
+            version: Snapshot version the response was built from
+            view: Digest of the view's filters
+            keys: document_key of each article listed
+        """
+        with self._lock:
+            self._served_views[(version, view)] = tuple(keys)
+            self._served_views.move_to_end((version, view))
+            while len(self._served_views) > Config.DELTA_VIEWS:
+                self._served_views.popitem(last=False)
+
+    def served_view(self, version: int, view: str) -> Optional[Tuple[str, ...]]:
+        """
+        Get the articles a response of a view listed
+
+        Returns:
+            Their keys in order, None if that response is not remembered or
+            its version is past the DELTA_HISTORY log
+        """
+        if self.changes_since(version) is None:
+            return None
+        with self._lock:
+            return self._served_views.get((version, view))
+
+    @property
+    def is_shared(self) -> bool:
+        """True if the articles are shared with other workers through the cache backend"""
+        return self.cache.backend is not None
+
+    async def next_version(self) -> int:
+        """
+        Take the version for the next snapshot of a new ingestion run
+
+        With a shared backend it comes from the shared counter, and the
+        shared epoch is adopted, so versions are unique across workers. Both
+        are read in one round trip.
+        """
+        backend = self.cache.backend
+        if backend is None:
+            return self.version + 1
+        try:
+            _, epoch, version = await backend.batch([
+                ('add', f"{self.key}:epoch", self.epoch.encode('ascii')),
+                ('get', f"{self.key}:epoch"),
+                ('incr', f"{self.key}:version")
+            ])
+            if epoch:
+                self.epoch = epoch.decode('ascii')
+            return version
+        except Exception as e:
+            logger.error(f"Error taking shared snapshot version: {e}")
+            return self.version + 1
+
+    async def share(self, snapshot: NewsSnapshot) -> None:
+        """Write a snapshot's articles to the shared backend for the other workers"""
+        backend = self.cache.backend
+        if backend is None:
+            return
+        payload = dumps({
+            'version': snapshot.version,
+            'epoch': self.epoch,
+            'created_at': snapshot.created_at,
+            'news_data': snapshot.news_data,
+            'source_status': snapshot.source_status
+        })
+        try:
+            await backend.set(f"{self.key}:data", payload, ttl=self.expire + self.stale_ttl)
+        except Exception as e:
+            logger.error(f"Error sharing snapshot version {snapshot.version}: {e}")
+
+    async def load_shared(
+        self,
+        max_age: float,
+        refresh: Optional[Callable[[], Awaitable[NewsSnapshot]]] = None
+    ) -> Optional[NewsSnapshot]:
+        """
+        Publish the articles another worker shared, if they are newer than ours
+
+        Args:
+            max_age: Seconds since their ingestion after which they are not taken
+            refresh: Coroutine function producing the next snapshot once this one is stale
+
+        Returns:
+            The published snapshot, None if there was nothing newer to take
+        """
+        backend = self.cache.backend
+        if backend is None:
+            return None
+        try:
+            payload = await backend.get(f"{self.key}:data")
+        except Exception as e:
+            logger.error(f"Error reading shared snapshot: {e}")
+            return None
+        if payload is None:
+            return None
+        shared = loads(payload)
+        if shared['version'] <= self.version or time.time() - shared['created_at'] > max_age:
+            return None
+        self.epoch = shared['epoch']
+        return await self.publish_async(
+            shared['news_data'],
+            refresh=refresh,
+            source_status=shared['source_status'],
+            version=shared['version'],
+            created_at=shared['created_at']
+        )
+
+    async def acquire_lease(self, ttl: float) -> bool:
+        """
+        Claim the next ingestion run among the workers
+
+        Args:
+            ttl: Seconds after which the claim lapses, in case this worker dies
+
+        Returns:
+            True if this worker should scrape; always True without a working shared backend
+        """
+        backend = self.cache.backend
+        if backend is None:
+            return True
+        try:
+            return await backend.add(f"{self.key}:lease", self.epoch.encode('ascii'), ttl=ttl)
+        except Exception as e:
+            logger.error(f"Error claiming ingestion run: {e}")
+            return True
+
+    async def release_lease(self) -> None:
+        """Give up the claim on the ingestion run, once its articles are shared or it failed"""
+        if self.cache.backend is None:
+            return
+        try:
+            await self.cache.backend.delete(f"{self.key}:lease")
+        except Exception as e:
+            logger.error(f"Error releasing ingestion run: {e}")
+
+    def fresh_ttl(self) -> Optional[int]:
+        """Seconds the cached snapshot stays fresh, None once it is stale or missing"""
+        return self.cache.get_ttl(self.key)
+
+    def peek(self) -> Optional[NewsSnapshot]:
+        """The cached snapshot without waiting, None if there is none (a stale one starts its refresh)"""
+        return self.cache.get(self.key)
+
+    async def fetch(self, load: Callable[[], Awaitable[NewsSnapshot]]) -> CacheResult:
+        """
+        Get the current snapshot through the cache
+
+        Args:
+            load: Coroutine function producing a snapshot on a miss
+
+        Returns:
+            CacheResult with the snapshot and whether it was stale
+        """
+        return await self.cache.fetch(self.key, load, expire=self.expire, stale_ttl=self.stale_ttl)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics
+
+        Returns:
+            Dictionary with the snapshot version, article count and age in seconds
+        """
+        snapshot = self._latest
+        return {
+            'version': self.version,
+            'total_articles': len(snapshot.latest) if snapshot else 0,
+            'updated_at': snapshot.created_at if snapshot else None,
+            'age_seconds': round(time.time() - snapshot.created_at, 1) if snapshot else None,
+            'search_index': self.search_index.get_stats()
+        }
+
+# Shared instance used by the whole process
+article_store = ArticleStore()
@@ -0,0 +1,221 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:  # pragma: no cover - redis is listed in requirements.txt
+    REDIS_AVAILABLE = False
+
+# ('get', key), ('set', key, value, ttl), ('add', key, value, ttl), ('incr', key) or ('delete', key)
+Operation = Tuple[Any, ...]
+
+class CacheBackend(ABC):
+    """
+    Store of binary values shared by the worker processes of the app
+
+    CacheManager keeps live objects in each process; a backend holds what
+    the processes share, encoded as bytes. Methods are coroutines, as a
+    backend is usually across the network; batch sends several operations
+    in one round trip.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a value, None if it is missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Set a value, expiring after ttl seconds if given"""
+
+    @abstractmethod
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """
+        Set a value only if the key is missing, atomically
+
+        Returns:
+            True if this call set it
+        """
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """Increment a counter starting at 0 and return its new value, atomically"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Delete a key, returning whether it existed"""
+
+    @abstractmethod
+    async def batch(self, operations: Sequence[Operation]) -> List[Any]:
+        """
+        Run several operations in one round trip, in order
+
+        Args:
+            operations: Tuples of a method name and its arguments, e.g. ('incr', key)
+
+        Returns:
+            What each method would have returned
+        """
+
+    async def close(self) -> None:
+        """Release connections"""
+
+class LocalBackend(CacheBackend):
+    """
+    In-process backend with the semantics of the shared one
+
+    Several CacheManagers given the same instance behave like workers
+    sharing a Redis server, which is what the tests use it for.
+    """
+
+    def __init__(self):
+        # key -> (value, expiry time or None)
+        self._values: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    # The underscored methods hold the lock
+
+    def _get(self, key: str) -> Optional[bytes]:
+        item = self._values.get(key)
+        if item is None:
+            return None
+        value, expire_at = item
+        if expire_at is not None and time.time() >= expire_at:
+            del self._values[key]
+            return None
+        return value
+
+    def _set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._values[key] = (bytes(value), time.time() + ttl if ttl is not None else None)
+
+    def _add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        if self._get(key) is not None:
+            return False
+        self._set(key, value, ttl)
+        return True
+
+    def _incr(self, key: str) -> int:
+        current = self._get(key)
+        value = int(current or 0) + 1
+        expire_at = self._values[key][1] if current is not None else None
+        self._values[key] = (str(value).encode('ascii'), expire_at)
+        return value
+
+    def _delete(self, key: str) -> bool:
+        return self._values.pop(key, None) is not None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._set(key, value, ttl)
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            return self._add(key, value, ttl)
+
+    async def incr(self, key: str) -> int:
+        with self._lock:
+            return self._incr(key)
+
+    async def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._delete(key)
+
+    async def batch(self, operations: Sequence[Operation]) -> List[Any]:
+        methods = {'get': self._get, 'set': self._set, 'add': self._add, 'incr': self._incr, 'delete': self._delete}
+        with self._lock:
+            return [methods[name](*args) for name, *args in operations]
+
+class RedisBackend(CacheBackend):
+    """
+    Backend on a Redis server, or anything speaking its protocol
+
+    Values are stored as raw bytes. A batch is sent as one pipeline, so it
+    is a single round trip.
+    """
+
+    def __init__(self, url: str, client: Optional[Any] = None):
+        """
+        Args:
+            url: Server URL, e.g. redis://localhost:6379/0
+            client: redis.asyncio client to use instead of connecting to url
+        """
+        if client is None and not REDIS_AVAILABLE:
+            raise RuntimeError("The redis package is required for a redis:// cache backend")
+        self.url = url
+        self._client = client if client is not None else redis_asyncio.Redis.from_url(url)
+
+    @staticmethod
+    def _px(ttl: Optional[float]) -> Optional[int]:
+        # Milliseconds, as Redis rejects a zero or fractional EX
+        return max(1, int(ttl * 1000)) if ttl is not None else None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        await self._client.set(key, value, px=self._px(ttl))
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return bool(await self._client.set(key, value, px=self._px(ttl), nx=True))
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def delete(self, key: str) -> bool:
+        return bool(await self._client.delete(key))
+
+    async def batch(self, operations: Sequence[Operation]) -> List[Any]:
+        if not operations:
+            return []
+        async with self._client.pipeline(transaction=False) as pipeline:
+            for name, key, *args in operations:
+                if name == 'get':
+                    pipeline.get(key)
+                elif name in ('set', 'add'):
+                    value, ttl = (args + [None])[:2]
+                    pipeline.set(key, value, px=self._px(ttl), nx=name == 'add')
+                elif name == 'incr':
+                    pipeline.incr(key)
+                elif name == 'delete':
+                    pipeline.delete(key)
+                else:
+                    raise ValueError(f"Unknown cache backend operation: {name}")
+            results = await pipeline.execute()
+        # Replies as the single-key methods return them
+        replies = []
+        for (name, *_), reply in zip(operations, results):
+            if name == 'set':
+                reply = None
+            elif name in ('add', 'delete'):
+                reply = bool(reply)
+            replies.append(reply)
+        return replies
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+def create_backend(spec: str) -> Optional[CacheBackend]:
+    """
+    Create the shared cache backend from its configuration
+
+    Args:
+        spec: 'memory' for none (every process on its own), 'local' for the
+            in-process stand-in, or a redis://, rediss:// or unix:// URL
+
+    Returns:
+        The backend, None for 'memory'
+    """
+    spec = (spec or 'memory').strip()
+    if spec == 'memory':
+        return None
+    if spec == 'local':
+        return LocalBackend()
+    if spec.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(spec)
+    raise ValueError(f"Unknown cache backend: {spec}")
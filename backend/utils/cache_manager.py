@@ -1,16 +1,225 @@
+import asyncio
+import heapq
+import sys
 import time
-from typing import Any, Optional, Dict
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, List, NamedTuple, Optional, Dict, Tuple
 import threading
 import logging
 
+from config import Config
+from utils.cache_backends import CacheBackend, create_backend
+
 logger = logging.getLogger(__name__)
 
-class CacheManager:
+class CacheResult(NamedTuple):
+    """A value read through the cache"""
+    value: Any
+    stale: bool  # served past its soft TTL while a refresh runs in the background
+    cached: bool  # False for the caller whose computation produced the value
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate memory held by a cached value, in bytes
+
+    Values that know their size expose it as 'nbytes' (like encoded
+    responses and news snapshots). Strings and bytes count their length.
+    Dicts, lists, tuples and sets count themselves and everything they
+    hold, all the way down, objects held several times only once; anything
+    else its own object size.
+    """
+    size = 0
+    seen = set()
+    pending = [value]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        nbytes = getattr(item, 'nbytes', None)
+        if isinstance(nbytes, int):
+            size += nbytes
+        elif isinstance(item, (bytes, bytearray, str)):
+            size += len(item)
+        else:
+            size += sys.getsizeof(item)
+            if isinstance(item, dict):
+                pending.extend(item.keys())
+                pending.extend(item.values())
+            elif isinstance(item, (list, tuple, set, frozenset, deque)):
+                pending.extend(item)
+    return size
+
+class _LRUPolicy:
+    """Evicts the key used least recently; keys in use order in an OrderedDict"""
+
     def __init__(self):
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def add(self, key: str) -> None:
+        self._order[key] = None
+
+    def touch(self, key: str) -> None:
+        self._order.move_to_end(key)
+
+    def pop(self, key: str) -> None:
+        self._order.pop(key, None)
+
+    def victim(self) -> Optional[str]:
+        return next(iter(self._order), None)
+
+    def clear(self) -> None:
+        self._order.clear()
+
+class _LFUPolicy:
+    """
+    Evicts the key used least often, the least recently used among those
+
+    Keys are bucketed by use count, each bucket in use order, and the
+    buckets are linked in order of count. New keys go to the count 1
+    bucket at the head and a used key moves to the bucket right after its
+    own, so every operation is O(1).
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        # count -> next higher / lower count that has a bucket
+        self._next: Dict[int, Optional[int]] = {}
+        self._prev: Dict[int, Optional[int]] = {}
+        self._head: Optional[int] = None
+
+    def _link(self, count: int, prev: Optional[int]) -> None:
+        # Create the bucket for count right after prev, at the head if None
+        following = self._head if prev is None else self._next[prev]
+        self._buckets[count] = OrderedDict()
+        self._prev[count] = prev
+        self._next[count] = following
+        if prev is None:
+            self._head = count
+        else:
+            self._next[prev] = count
+        if following is not None:
+            self._prev[following] = count
+
+    def _unlink(self, key: str, count: int) -> None:
+        # Take a key out of its bucket, dropping the bucket once empty
+        bucket = self._buckets[count]
+        del bucket[key]
+        if bucket:
+            return
+        prev, following = self._prev.pop(count), self._next.pop(count)
+        del self._buckets[count]
+        if prev is None:
+            self._head = following
+        else:
+            self._next[prev] = following
+        if following is not None:
+            self._prev[following] = prev
+
+    def add(self, key: str) -> None:
+        if self._head != 1:
+            self._link(1, None)
+        self._counts[key] = 1
+        self._buckets[1][key] = None
+
+    def touch(self, key: str) -> None:
+        count = self._counts[key]
+        if self._next[count] != count + 1:
+            self._link(count + 1, count)
+        self._buckets[count + 1][key] = None
+        self._counts[key] = count + 1
+        self._unlink(key, count)
+
+    def pop(self, key: str) -> None:
+        count = self._counts.pop(key, None)
+        if count is not None:
+            self._unlink(key, count)
+
+    def victim(self) -> Optional[str]:
+        if self._head is None:
+            return None
+        return next(iter(self._buckets[self._head]))
+
+    def clear(self) -> None:
+        self._counts.clear()
+        self._buckets.clear()
+        self._next.clear()
+        self._prev.clear()
+        self._head = None
+
+EVICTION_POLICIES = {'lru': _LRUPolicy, 'lfu': _LFUPolicy}
+
+# Entries the sweeper removes before letting other tasks run
+SWEEP_BATCH = 256
+
+class CacheManager:
+    """
+    In-memory cache with soft and hard expiry, miss coalescing and bounded size
+
+    Expiry times are kept in two min-heaps, one for entries turning stale
+    and one for entries past their hard expiry. A sweeper task started
+    with start_sweeper advances through them in small batches every
+    CACHE_CLEANUP_INTERVAL seconds, moving entries between the fresh, stale
+    and expired counts and removing expired ones, so the statistics are
+    running counters and never scan the cache. Reads never return expired
+    entries either way.
+
+    What the worker processes of the app share goes through 'backend', a
+    CacheBackend holding bytes; without one each process is on its own.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        policy: Optional[str] = None,
+        backend: Optional[CacheBackend] = None
+    ):
+        """
+        Args:
+            max_entries: Most entries kept, defaults to Config.CACHE_MAX_ENTRIES (0 for no limit)
+            max_bytes: Most bytes kept, by estimate_size, defaults to Config.CACHE_MAX_BYTES (0 for no limit)
+            policy: 'lru' or 'lfu', which entries make room for new ones, defaults to Config.CACHE_EVICTION_POLICY
+            backend: Backend shared with the other workers, None to share nothing
+        """
+        self.max_entries = max_entries if max_entries is not None else Config.CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes if max_bytes is not None else Config.CACHE_MAX_BYTES
+        self.policy = (policy or Config.CACHE_EVICTION_POLICY).lower()
+        if self.policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown cache eviction policy: {self.policy}")
+        self.backend = backend
         self._cache: Dict[str, Dict[str, Any]] = {}
+        self._eviction = EVICTION_POLICIES[self.policy]()
+        self._bytes = 0
+        self._evictions = 0
+        self._evicted_bytes = 0
+        # (time, sequence, key); an item is outdated once its key was set again or removed
+        self._stale_heap: List[Tuple[float, int, str]] = []
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        # (key, sequence) of expired entries waiting for the sweeper
+        self._expired: Deque[Tuple[str, int]] = deque()
+        self._sequence = 0
+        self._stale_count = 0
+        self._expired_count = 0
+        self._created_sum = 0.0
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._expirations = 0
         self._lock = threading.Lock()
+        # Computations in progress, so concurrent misses for a key share one result
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._sweeper: Optional[asyncio.Task] = None
         
-    def set(self, key: str, value: Any, expire: int = 3600) -> None:
+    def set(
+        self,
+        key: str,
+        value: Any,
+        expire: int = 3600,
+        stale_ttl: int = 0,
+        refresh: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> None:
         """
         Set a value in cache with expiration time in seconds
         
@@ -18,18 +227,115 @@ class CacheManager:
             key: Cache key
             value: Value to cache
             expire: Expiration time in seconds (default: 1 hour)
+            stale_ttl: Seconds after expiry during which the stale value is still served
+            refresh: Coroutine function recomputing the value once it turns stale
         """
         try:
+            size = estimate_size(value)
+            if self.max_bytes and size > self.max_bytes:
+                logger.debug(f"Not caching key: {key}, {size} bytes is over the cache size")
+                self.delete(key)
+                return
             with self._lock:
+                now = time.time()
+                # A replaced entry keeps its place, counting the set as a use,
+                # unless it is the one that has to make room
+                if key in self._cache:
+                    self._eviction.touch(key)
+                self._make_room(size, key)
+                if key in self._cache:
+                    self._remove(key, keep_use=True)
+                else:
+                    self._eviction.add(key)
+                self._sequence += 1
                 self._cache[key] = {
                     'value': value,
-                    'expire_at': time.time() + expire,
-                    'created_at': time.time()
+                    'expire_at': now + expire,
+                    'stale_until': now + expire + stale_ttl,
+                    'created_at': now,
+                    'expire': expire,
+                    'stale_ttl': stale_ttl,
+                    'refresh': refresh,
+                    'size': size,
+                    'sequence': self._sequence,
+                    'state': 'fresh'
                 }
+                self._bytes += size
+                self._created_sum += now
+                if stale_ttl > 0:
+                    heapq.heappush(self._stale_heap, (now + expire, self._sequence, key))
+                heapq.heappush(self._expiry_heap, (now + expire + stale_ttl, self._sequence, key))
+                self._compact()
                 logger.debug(f"Cached data for key: {key}, expires in {expire} seconds")
         except Exception as e:
             logger.error(f"Error setting cache for key {key}: {e}")
     
+    def _make_room(self, size: int, key: str) -> None:
+        # Evict until an entry of this size fits in place of key's; holds the lock
+        while self._cache:
+            replaced = self._cache.get(key)
+            entries = len(self._cache) - (replaced is not None)
+            used = self._bytes - (replaced['size'] if replaced is not None else 0)
+            if not (
+                (self.max_entries and entries >= self.max_entries)
+                or (self.max_bytes and used + size > self.max_bytes)
+            ):
+                return
+            victim = self._eviction.victim()
+            self._evicted_bytes += self._cache[victim]['size']
+            self._evictions += 1
+            self._remove(victim)
+            logger.debug(f"Evicted cache key: {victim}")
+    
+    def _remove(self, key: str, keep_use: bool = False) -> None:
+        # Drop an entry and its accounting, and its use count unless it is
+        # about to be set again; holds the lock
+        entry = self._cache.pop(key)
+        self._bytes -= entry['size']
+        self._created_sum -= entry['created_at']
+        if entry['state'] == 'stale':
+            self._stale_count -= 1
+        elif entry['state'] == 'expired':
+            self._expired_count -= 1
+        if not keep_use:
+            self._eviction.pop(key)
+    
+    def _is_current(self, key: str, sequence: int) -> Optional[Dict[str, Any]]:
+        # The entry a heap item was pushed for, None if it was set again or removed
+        entry = self._cache.get(key)
+        return entry if entry is not None and entry['sequence'] == sequence else None
+    
+    def _advance(self, now: float, limit: Optional[int] = None) -> None:
+        # Move entries whose soft or hard expiry has passed to the stale or
+        # expired count, up to limit of each; holds the lock
+        moved = 0
+        while self._stale_heap and self._stale_heap[0][0] < now and (limit is None or moved < limit):
+            _, sequence, key = heapq.heappop(self._stale_heap)
+            entry = self._is_current(key, sequence)
+            if entry is not None and entry['state'] == 'fresh':
+                entry['state'] = 'stale'
+                self._stale_count += 1
+            moved += 1
+        
+        moved = 0
+        while self._expiry_heap and self._expiry_heap[0][0] < now and (limit is None or moved < limit):
+            _, sequence, key = heapq.heappop(self._expiry_heap)
+            entry = self._is_current(key, sequence)
+            if entry is not None and entry['state'] != 'expired':
+                if entry['state'] == 'stale':
+                    self._stale_count -= 1
+                entry['state'] = 'expired'
+                self._expired_count += 1
+                self._expired.append((key, sequence))
+            moved += 1
+    
+    def _compact(self) -> None:
+        # Rebuild a heap once outdated items make up most of it; holds the lock
+        for heap in (self._stale_heap, self._expiry_heap):
+            if len(heap) > 2 * len(self._cache) + 64:
+                heap[:] = [item for item in heap if self._is_current(item[2], item[1]) is not None]
+                heapq.heapify(heap)
+    
     def get(self, key: str) -> Optional[Any]:
         """
         Get a value from cache
@@ -37,29 +343,140 @@ class CacheManager:
         Args:
             key: Cache key
             
+        Between the soft and the hard expiry the stale value is returned and
+        a single background refresh is started, if the entry has a refresh
+        function and an event loop is running.
+        
         Returns:
             Cached value or None if not found or expired
         """
         try:
-            with self._lock:
-                if key not in self._cache:
-                    return None
-                
-                cache_entry = self._cache[key]
-                
-                # Check if expired
-                if time.time() > cache_entry['expire_at']:
-                    del self._cache[key]
-                    logger.debug(f"Cache expired for key: {key}")
-                    return None
-                
-                logger.debug(f"Cache hit for key: {key}")
-                return cache_entry['value']
-                
+            result = self._lookup(key)
+            return result.value if result else None
         except Exception as e:
             logger.error(f"Error getting cache for key {key}: {e}")
             return None
     
+    def _lookup(self, key: str) -> Optional[CacheResult]:
+        # Like get, but also reports hits on cached falsy values such as []
+        with self._lock:
+            cache_entry = self._cache.get(key)
+            if cache_entry is None:
+                self._misses += 1
+                return None
+            
+            now = time.time()
+            if now > cache_entry['stale_until']:
+                self._remove(key)
+                self._misses += 1
+                self._expirations += 1
+                logger.debug(f"Cache expired for key: {key}")
+                return None
+            
+            self._eviction.touch(key)
+            stale = now > cache_entry['expire_at']
+            self._hits += 1
+            if stale:
+                self._stale_hits += 1
+                if cache_entry['state'] == 'fresh':
+                    cache_entry['state'] = 'stale'
+                    self._stale_count += 1
+        
+        if stale:
+            logger.debug(f"Serving stale cache for key: {key}")
+            self._revalidate(key, cache_entry)
+        else:
+            logger.debug(f"Cache hit for key: {key}")
+        return CacheResult(cache_entry['value'], stale, True)
+    
+    def _revalidate(self, key: str, cache_entry: Dict[str, Any]) -> None:
+        # Start one background refresh for a stale entry
+        if cache_entry['refresh'] is None or key in self._in_flight:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        
+        future = self._start_compute(key, cache_entry['refresh'], cache_entry['expire'], cache_entry['stale_ttl'])
+        future.add_done_callback(lambda done: self._log_refresh_error(key, done))
+    
+    @staticmethod
+    def _log_refresh_error(key: str, future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Background refresh failed for key {key}, keeping stale value: {future.exception()}")
+    
+    def _start_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any]], expire: int, stale_ttl: int
+    ) -> asyncio.Future:
+        future = asyncio.ensure_future(self._compute_and_set(key, compute, expire, stale_ttl))
+        self._in_flight[key] = future
+        return future
+    
+    async def _compute_and_set(
+        self, key: str, compute: Callable[[], Awaitable[Any]], expire: int, stale_ttl: int
+    ) -> Any:
+        try:
+            value = await compute()
+            self.set(key, value, expire, stale_ttl=stale_ttl, refresh=compute)
+            return value
+        finally:
+            self._in_flight.pop(key, None)
+    
+    async def fetch(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expire: int = 3600,
+        stale_ttl: int = 0
+    ) -> CacheResult:
+        """
+        Get a value from cache, computing and caching it on a miss
+        
+        Concurrent misses for the same key are coalesced: the first caller
+        starts the computation and every other caller awaits the same
+        result instead of computing it again. A failed computation is not
+        cached and its error is raised to every waiting caller.
+        
+        Once the value is older than `expire`, it is still served for
+        another `stale_ttl` seconds while one background computation
+        refreshes it. A failed refresh keeps the stale value.
+        
+        Args:
+            key: Cache key
+            compute: Coroutine function producing the value
+            expire: Seconds the value is fresh (default: 1 hour)
+            stale_ttl: Seconds after that during which the stale value is served
+            
+        Returns:
+            CacheResult with the value and whether it was stale or cached
+        """
+        result = self._lookup(key)
+        if result is not None:
+            return result
+        
+        future = self._in_flight.get(key)
+        cached = future is not None
+        if future is None:
+            future = self._start_compute(key, compute, expire, stale_ttl)
+        else:
+            logger.debug(f"Joining in-flight computation for key: {key}")
+        
+        # Shielded so one caller going away does not cancel the others' result
+        value = await asyncio.shield(future)
+        return CacheResult(value, False, cached)
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expire: int = 3600,
+        stale_ttl: int = 0
+    ) -> Any:
+        """Like fetch, returning only the value"""
+        result = await self.fetch(key, compute, expire, stale_ttl)
+        return result.value
+    
     def delete(self, key: str) -> bool:
         """
         Delete a key from cache
@@ -73,7 +490,7 @@ class CacheManager:
         try:
             with self._lock:
                 if key in self._cache:
-                    del self._cache[key]
+                    self._remove(key)
                     logger.debug(f"Deleted cache key: {key}")
                     return True
                 return False
@@ -86,44 +503,108 @@ class CacheManager:
         try:
             with self._lock:
                 self._cache.clear()
+                self._eviction.clear()
+                self._stale_heap.clear()
+                self._expiry_heap.clear()
+                self._expired.clear()
+                self._bytes = 0
+                self._stale_count = 0
+                self._expired_count = 0
+                self._created_sum = 0.0
                 logger.info("Cache cleared")
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
     
-    def clear_expired(self) -> int:
+    def clear_expired(self, limit: Optional[int] = None) -> int:
         """
         Clear expired entries from cache
         
+        Only entries found through the expiry heap are looked at, not the
+        whole cache.
+        
+        Args:
+            limit: Most entries to remove, all expired entries if None
+        
         Returns:
             Number of expired entries removed
         """
         try:
             count = 0
-            current_time = time.time()
-            
             with self._lock:
-                expired_keys = [
-                    key for key, entry in self._cache.items()
-                    if current_time > entry['expire_at']
-                ]
-                
-                for key in expired_keys:
-                    del self._cache[key]
-                    count += 1
-                
-                if count > 0:
-                    logger.info(f"Cleared {count} expired cache entries")
-                
-                return count
+                self._advance(time.time(), limit)
+                while self._expired and (limit is None or count < limit):
+                    key, sequence = self._expired.popleft()
+                    if self._is_current(key, sequence) is not None:
+                        self._remove(key)
+                        count += 1
+                self._expirations += count
+            
+            if count > 0:
+                logger.debug(f"Cleared {count} expired cache entries")
+            return count
                 
         except Exception as e:
             logger.error(f"Error clearing expired cache entries: {e}")
             return 0
     
+    def _sweep_pending(self) -> bool:
+        # Whether expiries are due that the last batch did not get to
+        now = time.time()
+        with self._lock:
+            return bool(
+                self._expired
+                or (self._expiry_heap and self._expiry_heap[0][0] < now)
+                or (self._stale_heap and self._stale_heap[0][0] < now)
+            )
+    
+    async def _sweep(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            removed = 0
+            while True:
+                removed += self.clear_expired(limit=SWEEP_BATCH)
+                if not self._sweep_pending():
+                    break
+                # Let requests run between batches
+                await asyncio.sleep(0)
+            if removed:
+                logger.info(f"Swept {removed} expired cache entries")
+    
+    def start_sweeper(self, interval: Optional[float] = None) -> None:
+        """
+        Start removing expired entries in the background on the running event loop
+        
+        Args:
+            interval: Seconds between sweeps, defaults to Config.CACHE_CLEANUP_INTERVAL
+        """
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep(interval or Config.CACHE_CLEANUP_INTERVAL))
+    
+    async def stop_sweeper(self) -> None:
+        """Stop the background sweeper"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+    
+    async def close(self) -> None:
+        """Stop the sweeper and close the shared backend"""
+        await self.stop_sweeper()
+        if self.backend is not None:
+            await self.backend.close()
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics
         
+        Only reads running counters, so it takes the same time whatever the
+        size of the cache. Entries are counted as stale when read or swept
+        past their soft expiry, and as expired when swept past their hard
+        expiry, so these counts are as of the sweeper's last pass.
+        
         Returns:
             Dictionary with cache statistics
         """
@@ -131,25 +612,26 @@ class CacheManager:
             with self._lock:
                 current_time = time.time()
                 total_entries = len(self._cache)
-                expired_entries = sum(
-                    1 for entry in self._cache.values()
-                    if current_time > entry['expire_at']
-                )
-                
-                # Calculate average age
-                if total_entries > 0:
-                    avg_age = sum(
-                        current_time - entry['created_at']
-                        for entry in self._cache.values()
-                    ) / total_entries
-                else:
-                    avg_age = 0
+                avg_age = current_time - self._created_sum / total_entries if total_entries else 0
                 
                 return {
                     'total_entries': total_entries,
-                    'expired_entries': expired_entries,
-                    'valid_entries': total_entries - expired_entries,
-                    'average_age_seconds': round(avg_age, 2)
+                    'expired_entries': self._expired_count,
+                    'valid_entries': total_entries - self._expired_count,
+                    'stale_entries': self._stale_count,
+                    'in_flight': len(self._in_flight),
+                    'average_age_seconds': round(avg_age, 2),
+                    'hits': self._hits,
+                    'stale_hits': self._stale_hits,
+                    'misses': self._misses,
+                    'expirations': self._expirations,
+                    'policy': self.policy,
+                    'total_bytes': self._bytes,
+                    'max_entries': self.max_entries,
+                    'max_bytes': self.max_bytes,
+                    'evictions': self._evictions,
+                    'evicted_bytes': self._evicted_bytes,
+                    'backend': type(self.backend).__name__ if self.backend is not None else None
                 }
                 
         except Exception as e:
@@ -190,4 +672,6 @@ class CacheManager:
                 
         except Exception as e:
             logger.error(f"Error getting TTL for key {key}: {e}")
-            return None 
\ No newline at end of file
+            return None 
+# Shared instance used by the whole process
+cache_manager = CacheManager(backend=create_backend(Config.CACHE_BACKEND))
@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+def parse_published_date(value: Optional[str]) -> Optional[float]:
+    """
+    Parse the publish date of a news item
+
+    Understands RFC 822 dates from RSS feeds ("Tue, 10 Sep 2024 14:30:00 +0000"),
+    ISO 8601 timestamps and plain "YYYY-MM-DD" dates. Dates without a time
+    zone are taken as UTC.
+
+    Args:
+        value: Date string as scraped
+
+    Returns:
+        Seconds since the epoch, or None if the value cannot be parsed
+    """
+    if not value:
+        return None
+    value = value.strip()
+
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if parsed is None:
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
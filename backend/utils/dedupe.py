@@ -0,0 +1,156 @@
+import hashlib
+import operator
+import random
+import re
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from config import Config
+
+# Signature length and its split into LSH bands; 16 bands of 4 rows make
+# stories with a word overlap (Jaccard) above ~0.5 likely to share a bucket
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Titles with fewer distinct words are too short to compare reliably
+MIN_WORDS = 3
+
+_WORD = re.compile(r'[a-z0-9]+')
+# Prefixes that say what kind of post it is, not what it is about
+_TITLE_PREFIX = re.compile(r'^\s*(?:ask|show|tell|launch)\s+hn\s*[:\-\u2013]\s*', re.IGNORECASE)
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures are stable across processes and restarts
+_rng = random.Random(2718281828)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+Signature = Tuple[int, ...]
+
+@lru_cache(maxsize=65536)
+def _word_hashes(word: str) -> Signature:
+    """The word's hash under every permutation"""
+    value = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'big')
+    return tuple((a * value + b) % _PRIME & _MAX_HASH for a, b in _PERMUTATIONS)
+
+@lru_cache(maxsize=65536)
+def _text_signature(text: str) -> Optional[Signature]:
+    words = set(_WORD.findall(text.lower()))
+    if len(words) < MIN_WORDS:
+        return None
+    return tuple(map(min, zip(*map(_word_hashes, words))))
+
+def minhash(news: Dict[str, Any]) -> Optional[Signature]:
+    """
+    MinHash signature of a news item's title
+
+    The share of equal positions in two signatures estimates the Jaccard
+    similarity of the titles' word sets. Only the title is used: every
+    source writes its own description of a story, which would hide that
+    the headlines match. Signatures are cached by title, so articles kept
+    from an earlier cycle are not hashed again.
+
+    Args:
+        news: News item with a 'title'
+
+    Returns:
+        NUM_PERM hash values, or None if the title has fewer than MIN_WORDS words
+    """
+    return _text_signature(_TITLE_PREFIX.sub('', news.get('title', '')))
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(map(operator.eq, a, b)) / NUM_PERM
+
+class NearDuplicateIndex:
+    """
+    Banded LSH index over MinHash signatures
+
+    Every signature is bucketed by each of its BANDS bands. Similar items
+    very likely agree on at least one whole band, so a lookup only compares
+    the signatures sharing a bucket with the query instead of the whole index.
+    """
+
+    def __init__(self, threshold: Optional[float] = None):
+        """
+        Args:
+            threshold: Smallest estimated Jaccard similarity counted as a
+                near-duplicate, defaults to Config.DEDUPE_THRESHOLD
+        """
+        self.threshold = threshold if threshold is not None else Config.DEDUPE_THRESHOLD
+        self._buckets: List[Dict[Signature, List[Hashable]]] = [{} for _ in range(BANDS)]
+        self._signatures: Dict[Hashable, Signature] = {}
+
+    def add(self, key: Hashable, signature: Signature) -> None:
+        """Index a signature under a key"""
+        self._signatures[key] = signature
+        for band, buckets in enumerate(self._buckets):
+            buckets.setdefault(signature[band * ROWS:(band + 1) * ROWS], []).append(key)
+
+    def query(self, signature: Signature) -> List[Tuple[float, Hashable]]:
+        """
+        Find indexed signatures similar to a signature
+
+        Returns:
+            (similarity, key) pairs at or above the threshold, most similar first
+        """
+        candidates = set()
+        for band, buckets in enumerate(self._buckets):
+            candidates.update(buckets.get(signature[band * ROWS:(band + 1) * ROWS], ()))
+
+        matches = []
+        for key in candidates:
+            score = similarity(signature, self._signatures[key])
+            if score >= self.threshold:
+                matches.append((score, key))
+        matches.sort(key=lambda match: match[0], reverse=True)
+        return matches
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+def collapse_duplicates(news_items: List[Dict[str, Any]], threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Keep one item per cluster of near-duplicate stories
+
+    Items are clustered in one pass: each item joins the most similar
+    earlier representative of a cluster without an item from its source,
+    or becomes a representative itself. A source never posts one story
+    twice, so its similar titles are different stories. Representatives
+    get an 'also_on' list naming their duplicates, which are dropped.
+
+    Args:
+        news_items: News items in order of preference, e.g. newest first,
+            with 'source_name' (or 'source'); representatives are modified in place
+        threshold: Smallest similarity counted as a duplicate, defaults to
+            Config.DEDUPE_THRESHOLD
+
+    Returns:
+        The representatives, in their original order
+    """
+    index = NearDuplicateIndex(threshold)
+    representatives = []
+    # Sources of the items in each representative's cluster
+    cluster_sources: List[Set[Any]] = []
+    for news in news_items:
+        source = news.get('source_name', news.get('source'))
+        signature = minhash(news)
+        matches = index.query(signature) if signature is not None else []
+        cluster = next((key for _, key in matches if source not in cluster_sources[key]), None)
+        if cluster is not None:
+            cluster_sources[cluster].add(source)
+            representatives[cluster]['also_on'].append({
+                'source_name': news.get('source_name'),
+                'source': news.get('source'),
+                'title': news.get('title'),
+                'url': news.get('url')
+            })
+            continue
+
+        if signature is not None:
+            index.add(len(representatives), signature)
+        news['also_on'] = []
+        representatives.append(news)
+        cluster_sources.append({source})
+    return representatives
@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Optional
+
+from config import Config
+
+class FingerprintStore:
+    """
+    Articles already processed by the scrapers, keyed by URL fingerprint
+
+    Relevant articles are kept fully processed (cleaned description,
+    resolved image, relevance score); irrelevant ones are remembered as None
+    so they are skipped as well. Entries not seen for `retention` seconds are
+    pruned.
+    """
+
+    def __init__(self, retention: Optional[int] = None):
+        self.retention = retention or Config.ARTICLE_RETENTION
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._known: Optional[FrozenSet[str]] = None
+        self._lock = threading.Lock()
+
+    def known(self) -> FrozenSet[str]:
+        """Fingerprints of every remembered article, cheap to hand to a parser process"""
+        with self._lock:
+            if self._known is None:
+                self._known = frozenset(self._entries)
+            return self._known
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a processed article and mark it as seen
+
+        Returns:
+            Copy of the processed item, None if unknown or irrelevant
+        """
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            entry['last_seen'] = time.time()
+            return dict(entry['item']) if entry['item'] is not None else None
+
+    def put(self, fingerprint: str, item: Optional[Dict[str, Any]]) -> None:
+        """
+        Remember a processed article
+
+        Args:
+            fingerprint: URL fingerprint of the article
+            item: Processed news item, or None for an irrelevant article
+        """
+        with self._lock:
+            if fingerprint not in self._entries:
+                self._known = None
+            self._entries[fingerprint] = {
+                'item': dict(item) if item is not None else None,
+                'last_seen': time.time()
+            }
+
+    def prune(self) -> int:
+        """
+        Forget articles not seen within the retention period
+
+        Returns:
+            Number of articles forgotten
+        """
+        cutoff = time.time() - self.retention
+        with self._lock:
+            expired = [fp for fp, entry in self._entries.items() if entry['last_seen'] < cutoff]
+            for fingerprint in expired:
+                del self._entries[fingerprint]
+            if expired:
+                self._known = None
+            return len(expired)
+
+    def clear(self) -> None:
+        """Forget every article"""
+        with self._lock:
+            self._entries.clear()
+            self._known = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+# Shared instance used by the whole process
+fingerprint_store = FingerprintStore()
@@ -0,0 +1,128 @@
+import aiohttp
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class HTTPClient:
+    """Process-wide pooled HTTP session shared by the scrapers and the image proxy"""
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> Optional[aiohttp.ClientSession]:
+        """The shared session, or None if the client has not been started"""
+        if self._session is not None and not self._session.closed:
+            return self._session
+        return None
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=Config.HTTP_POOL_LIMIT,
+            limit_per_host=Config.HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=Config.HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=Config.HTTP_DNS_CACHE_TTL
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': Config.USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=Config.SCRAPER_TIMEOUT)
+        )
+
+    async def start(self) -> aiohttp.ClientSession:
+        """Create the shared session (called at application startup)"""
+        if self.session is None:
+            self._session = self._create_session()
+            logger.info("Shared HTTP client started")
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared session (called at application shutdown)"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            logger.info("Shared HTTP client closed")
+
+    @asynccontextmanager
+    async def borrow(self):
+        """
+        Borrow the shared session
+
+        Falls back to a short-lived session when the client has not been
+        started, e.g. when code runs outside the FastAPI application.
+        """
+        if self.session is not None:
+            yield self.session
+            return
+
+        session = aiohttp.ClientSession(headers={'User-Agent': Config.USER_AGENT})
+        try:
+            yield session
+        finally:
+            await session.close()
+
+class ConditionalRequestCache:
+    """Remembers ETag / Last-Modified validators and the parsed result for each URL"""
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """
+        Build the conditional request headers for a URL
+
+        Args:
+            url: Requested URL
+
+        Returns:
+            If-None-Match / If-Modified-Since headers, empty if nothing is stored
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return {}
+
+            headers = {}
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+            return headers
+
+    def get_parsed(self, url: str) -> Optional[Any]:
+        """Get the result parsed from the last full response for a URL"""
+        with self._lock:
+            entry = self._entries.get(url)
+            return entry['parsed'] if entry else None
+
+    def store(self, url: str, parsed: Any, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Store validators and the parsed result for a URL
+
+        Responses without validators are forgotten, since they cannot be revalidated.
+        """
+        with self._lock:
+            if not etag and not last_modified:
+                self._entries.pop(url, None)
+                return
+
+            self._entries[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'parsed': parsed
+            }
+
+    def clear(self) -> None:
+        """Forget all stored validators"""
+        with self._lock:
+            self._entries.clear()
+
+# Shared instances used by the whole process
+http_client = HTTPClient()
+conditional_cache = ConditionalRequestCache()
@@ -0,0 +1,181 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+from utils.url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+class ImageURLCache:
+    """
+    Persistent article URL -> image URL cache backed by SQLite
+
+    Failed lookups are cached too, with a shorter TTL, so dead links are not
+    fetched again on every scrape.
+
+    Writes are kept in memory, where lookups already see them, until flush
+    writes them all in one transaction. Lookups and flush block on SQLite,
+    so async callers run them in a thread.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[int] = None, negative_ttl: Optional[int] = None):
+        self.path = path or Config.IMAGE_CACHE_PATH
+        self.ttl = ttl or Config.IMAGE_CACHE_TTL
+        self.negative_ttl = negative_ttl or Config.IMAGE_CACHE_NEGATIVE_TTL
+        self._connection: Optional[sqlite3.Connection] = None
+        # Normalized article URL -> (image URL, expiry time), not written yet
+        self._pending: Dict[str, Tuple[Optional[str], float]] = {}
+        # Separate locks, so set on the event loop never waits for a flush in progress
+        self._pending_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily so importing the module never touches the disk
+        if self._connection is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            # Readers do not wait for the flush transaction, which needs no fsync of its own
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS image_urls ("
+                "article_url TEXT PRIMARY KEY, image_url TEXT, expire_at REAL NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, article_url: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look up the image for an article
+
+        Args:
+            article_url: Article URL, normalized before lookup
+
+        Returns:
+            (found, image_url) where image_url is None for a cached failure
+        """
+        images = self.get_many([article_url])
+        if article_url in images:
+            return True, images[article_url]
+        return False, None
+
+    def get_many(self, article_urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Look up the images for several articles in one query
+
+        Args:
+            article_urls: Article URLs, normalized before lookup
+
+        Returns:
+            Article URL as given -> image_url (None for a cached failure), for the ones found
+        """
+        keys: Dict[str, List[str]] = {}
+        for article_url in article_urls:
+            keys.setdefault(normalize_url(article_url), []).append(article_url)
+
+        now = time.time()
+        found: Dict[str, Tuple[Optional[str], float]] = {}
+        missing = []
+        with self._pending_lock:
+            for key in keys:
+                if key in self._pending:
+                    found[key] = self._pending[key]
+                else:
+                    missing.append(key)
+        try:
+            with self._lock:
+                connection = self._connect() if missing else None
+                # Stay below SQLite's limit of 999 parameters per statement
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = connection.execute(
+                        "SELECT article_url, image_url, expire_at FROM image_urls "
+                        f"WHERE article_url IN ({', '.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    found.update((key, (image_url, expire_at)) for key, image_url, expire_at in rows)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading image cache: {e}")
+
+        images = {}
+        for key, (image_url, expire_at) in found.items():
+            if expire_at >= now:
+                for article_url in keys[key]:
+                    images[article_url] = image_url
+        return images
+
+    def set(self, article_url: str, image_url: Optional[str]) -> None:
+        """
+        Store the image for an article, written to disk by the next flush
+
+        Args:
+            article_url: Article URL, normalized before storing
+            image_url: Image found on the page, or None if none could be found
+        """
+        expire = self.ttl if image_url else self.negative_ttl
+        with self._pending_lock:
+            self._pending[normalize_url(article_url)] = (image_url, time.time() + expire)
+
+    def flush(self) -> int:
+        """
+        Write the images stored since the last flush in one transaction
+
+        Returns:
+            Number of entries written
+        """
+        with self._pending_lock:
+            pending = dict(self._pending)
+        if not pending:
+            return 0
+
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.executemany(
+                    "INSERT OR REPLACE INTO image_urls (article_url, image_url, expire_at) VALUES (?, ?, ?)",
+                    [(key, image_url, expire_at) for key, (image_url, expire_at) in pending.items()]
+                )
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing image cache: {e}")
+            return 0
+
+        with self._pending_lock:
+            # Keep entries set again while writing, for the next flush
+            for key, entry in pending.items():
+                if self._pending.get(key) == entry:
+                    del self._pending[key]
+        return len(pending)
+
+    def clear_expired(self) -> int:
+        """
+        Remove expired entries
+
+        Returns:
+            Number of entries removed
+        """
+        try:
+            with self._lock:
+                connection = self._connect()
+                cursor = connection.execute("DELETE FROM image_urls WHERE expire_at < ?", (time.time(),))
+                connection.commit()
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Error clearing expired image cache entries: {e}")
+            return 0
+
+    def close(self) -> None:
+        """Write pending entries and close the database connection"""
+        self.flush()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+# Shared instance used by the whole process
+image_cache = ImageURLCache()
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class EventLoopMonitor:
+    """Measures how long the event loop is blocked by synchronous work"""
+
+    def __init__(self, interval: Optional[float] = None, stall_threshold: Optional[float] = None):
+        self.interval = interval or Config.LOOP_MONITOR_INTERVAL
+        self.stall_threshold = stall_threshold or Config.LOOP_STALL_THRESHOLD
+        self._task: Optional[asyncio.Task] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset the collected measurements"""
+        self.samples = 0
+        self.stalls = 0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def record(self, lag: float) -> None:
+        """Record one measured delay of a timer callback, in seconds"""
+        lag = max(lag, 0.0)
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag >= self.stall_threshold:
+            self.stalls += 1
+            logger.debug(f"Event loop was blocked for {lag * 1000:.1f} ms")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            # Anything beyond the requested sleep is time the loop could not run us
+            self.record(loop.time() - started - self.interval)
+
+    def start(self) -> None:
+        """Start sampling on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get event loop blocking statistics
+
+        Returns:
+            Dictionary with sample count, stall count and lag figures in milliseconds
+        """
+        return {
+            'samples': self.samples,
+            'stalls': self.stalls,
+            'max_lag_ms': round(self.max_lag * 1000, 2),
+            'total_blocked_ms': round(self.total_lag * 1000, 2)
+        }
+
+# Shared instance used by the whole process
+loop_monitor = EventLoopMonitor()
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class ParseExecutor:
+    """
+    Runs CPU-bound parsing off the event loop
+
+    Modes:
+        thread: shared thread pool (lxml releases the GIL while parsing)
+        process: process pool, jobs and results must be picklable
+        inline: run on the event loop, as before
+    """
+
+    MODES = ("thread", "process", "inline")
+
+    def __init__(self, mode: Optional[str] = None, max_workers: Optional[int] = None):
+        self.mode = mode or Config.PARSE_EXECUTOR
+        if self.mode not in self.MODES:
+            logger.warning(f"Unknown parse executor '{self.mode}', using thread")
+            self.mode = "thread"
+        self.max_workers = max_workers or Config.PARSE_WORKERS
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.mode == "inline":
+            return None
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="parse"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a parsing function in the pool
+
+        Args:
+            func: Function to run, module-level when using the process pool
+            *args, **kwargs: Arguments passed to the function
+
+        Returns:
+            The function's result
+        """
+        executor = self._get_executor()
+        if executor is None:
+            return func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        """Stop the worker pool (called at application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Shared instance used by the whole process
+parse_executor = ParseExecutor()
@@ -0,0 +1,256 @@
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# A title word counts as often as this many description words
+TITLE_WEIGHT = 2
+
+# Most vocabulary terms a prefix query expands to
+MAX_PREFIX_TERMS = 64
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric words of a text"""
+    return _TOKEN.findall(text.lower())
+
+def document_key(news: Dict[str, Any]) -> str:
+    """Key of a news item in the index: its URL fingerprint, else its URL or title"""
+    return news.get('fingerprint') or news.get('url') or news.get('title', '')
+
+class SearchQuery:
+    """
+    A parsed search query
+
+    Words must all occur in a matching article. A word ending in '*' matches
+    any word starting with it, and words in double quotes must occur next
+    to each other in that order.
+    """
+
+    def __init__(self, text: str):
+        self.terms: List[str] = []
+        self.prefixes: List[str] = []
+        self.phrases: List[List[str]] = []
+        for phrase, word in _QUERY_PART.findall(text):
+            if phrase:
+                tokens = tokenize(phrase)
+                if len(tokens) > 1:
+                    self.phrases.append(tokens)
+                else:
+                    self.terms.extend(tokens)
+            elif word.endswith('*'):
+                self.prefixes.extend(tokenize(word[:-1])[-1:])
+                self.terms.extend(tokenize(word[:-1])[:-1])
+            else:
+                self.terms.extend(tokenize(word))
+
+    def __bool__(self) -> bool:
+        return bool(self.terms or self.prefixes or self.phrases)
+
+class SearchIndex:
+    """
+    In-memory inverted index with BM25 ranking over news titles and descriptions
+
+    Postings keep word positions, so phrase queries are answered from the
+    index; a sorted vocabulary answers prefix queries. The index is
+    updated incrementally: sync() only tokenizes articles it has not seen
+    and drops the ones that left the feed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # term -> {doc id: positions}
+        self._postings: Dict[str, Dict[int, Tuple[int, ...]]] = {}
+        self._vocabulary: List[str] = []
+        self._doc_ids: Dict[str, int] = {}
+        # doc id -> (key, weighted length, title words, category, indexed text)
+        self._docs: Dict[int, Tuple[str, int, int, Optional[str], Tuple[str, str]]] = {}
+        self._items: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, news: Dict[str, Any]) -> None:
+        """Index a news item, replacing an earlier version with the same key"""
+        with self._lock:
+            self._add(news)
+
+    def remove(self, key: str) -> None:
+        """Drop the news item with this key from the index"""
+        with self._lock:
+            self._remove(key)
+
+    def sync(self, news_items: Iterable[Dict[str, Any]]) -> None:
+        """
+        Make the index hold exactly these news items
+
+        Unchanged articles keep their postings; only new or edited ones
+        are tokenized.
+        """
+        with self._lock:
+            current = {}
+            for news in news_items:
+                current[document_key(news)] = news
+            for key in [key for key in self._doc_ids if key not in current]:
+                self._remove(key)
+            for key, news in current.items():
+                doc_id = self._doc_ids.get(key)
+                if doc_id is not None and self._docs[doc_id][4] == (news.get('title', ''), news.get('description', '')):
+                    self._items[doc_id] = news
+                else:
+                    self._add(news)
+
+    def _add(self, news: Dict[str, Any]) -> None:
+        key = document_key(news)
+        if key in self._doc_ids:
+            self._remove(key)
+
+        doc_id = self._next_id
+        self._next_id += 1
+        title, description = news.get('title', ''), news.get('description', '')
+        title_tokens, description_tokens = tokenize(title), tokenize(description)
+
+        positions: Dict[str, List[int]] = {}
+        for position, token in enumerate(title_tokens):
+            positions.setdefault(token, []).append(position)
+        # Leave a gap so phrases do not run from the title into the description
+        offset = len(title_tokens) + 1
+        for position, token in enumerate(description_tokens, offset):
+            positions.setdefault(token, []).append(position)
+
+        for token, token_positions in positions.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            postings[doc_id] = tuple(token_positions)
+
+        length = TITLE_WEIGHT * len(title_tokens) + len(description_tokens)
+        self._doc_ids[key] = doc_id
+        self._docs[doc_id] = (key, length, len(title_tokens), news.get('category'), (title, description))
+        self._items[doc_id] = news
+        self._total_length += length
+
+    def _remove(self, key: str) -> None:
+        doc_id = self._doc_ids.pop(key, None)
+        if doc_id is None:
+            return
+        _, length, _, _, (title, description) = self._docs.pop(doc_id)
+        del self._items[doc_id]
+        self._total_length -= length
+        for token in set(tokenize(title)) | set(tokenize(description)):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        start = bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_TERMS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[Tuple[float, Dict[str, Any]]], int]:
+        """
+        Find the news items matching a query, best match first
+
+        Args:
+            query: Words, "quoted phrases" and prefix* words, all required
+            category: Only match items of this category
+            limit: Most results to return
+
+        Returns:
+            Up to `limit` (BM25 score, news item) pairs and the total number of matches
+        """
+        parsed = SearchQuery(query)
+        if not parsed:
+            return [], 0
+
+        with self._lock:
+            required = list(dict.fromkeys(parsed.terms + [term for phrase in parsed.phrases for term in phrase]))
+            expansions = [self._expand_prefix(prefix) for prefix in parsed.prefixes]
+
+            # Every required term and every prefix must match: start from the
+            # rarest and only probe the other postings for those documents
+            clauses = [[self._postings.get(term, {})] for term in required]
+            clauses.extend([self._postings[term] for term in terms] for terms in expansions)
+            clauses.sort(key=lambda postings: sum(map(len, postings)))
+            candidates = set().union(*clauses[0])
+            for postings in clauses[1:]:
+                candidates = {doc_id for doc_id in candidates if any(doc_id in p for p in postings)}
+
+            if category:
+                candidates = {doc_id for doc_id in candidates if self._docs[doc_id][3] == category}
+            for phrase in parsed.phrases:
+                candidates = {doc_id for doc_id in candidates if self._has_phrase(doc_id, phrase)}
+
+            doc_count = len(self._docs)
+            average_length = self._total_length / doc_count if doc_count else 0
+            idf = {}
+            for term in required + [term for terms in expansions for term in terms]:
+                postings = self._postings.get(term)
+                if postings:
+                    idf[term] = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+
+            # Score term by term, walking whichever is smaller: the postings or the candidates
+            scores = dict.fromkeys(candidates, 0.0)
+            for term, term_idf in idf.items():
+                postings = self._postings[term]
+                if len(postings) < len(scores):
+                    matches = [(doc_id, positions) for doc_id, positions in postings.items() if doc_id in scores]
+                else:
+                    matches = [(doc_id, postings[doc_id]) for doc_id in scores if doc_id in postings]
+                for doc_id, positions in matches:
+                    _, length, title_length, _, _ = self._docs[doc_id]
+                    # Positions before title_length are title words
+                    in_title = bisect_left(positions, title_length)
+                    tf = TITLE_WEIGHT * in_title + len(positions) - in_title
+                    norm = K1 * (1 - B + B * length / average_length)
+                    scores[doc_id] += term_idf * tf * (K1 + 1) / (tf + norm)
+
+            # Newer documents (higher ids) win ties
+            top = heapq.nlargest(limit, ((score, doc_id) for doc_id, score in scores.items()))
+            return [(score, self._items[doc_id]) for score, doc_id in top], len(scores)
+
+    def _has_phrase(self, doc_id: int, phrase: List[str]) -> bool:
+        starts = set(self._postings[phrase[0]][doc_id])
+        for offset, term in enumerate(phrase[1:], 1):
+            starts &= {position - offset for position in self._postings[term][doc_id]}
+            if not starts:
+                return False
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics
+
+        Returns:
+            Dictionary with the number of documents, terms and postings
+        """
+        with self._lock:
+            return {
+                'documents': len(self._docs),
+                'terms': len(self._postings),
+                'postings': sum(len(postings) for postings in self._postings.values())
+            }
@@ -0,0 +1,48 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional
+
+def item_timestamp(news: Dict[str, Any]) -> float:
+    """Publish time of a news item in epoch seconds, 0 if unknown"""
+    published_ts = news.get('published_ts')
+    return published_ts if published_ts is not None else 0.0
+
+def merge_by_time(news_lists: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Merge lists of news items that are each newest first into one such list
+
+    Costs O(n log k) for k lists instead of sorting all n items again.
+    Items published at the same time keep the order of the lists.
+    """
+    return list(heapq.merge(*news_lists, key=item_timestamp, reverse=True))
+
+class TimeIndex:
+    """
+    News items newest first with their publish times, for range queries
+
+    The negated timestamps form an ascending list, so the items published
+    in a time range are found with two binary searches.
+    """
+
+    def __init__(self, news_items: List[Dict[str, Any]]):
+        """
+        Args:
+            news_items: Items ordered newest first by item_timestamp
+        """
+        self.news_items = news_items
+        self._keys = [-item_timestamp(news) for news in news_items]
+
+    def range(self, since: Optional[float] = None, until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Get the items published in a time range, newest first
+
+        Args:
+            since: Earliest publish time in epoch seconds, inclusive
+            until: Latest publish time in epoch seconds, inclusive
+
+        Returns:
+            Slice of the indexed items
+        """
+        start = bisect_left(self._keys, -until) if until is not None else 0
+        end = bisect_right(self._keys, -since) if since is not None else len(self._keys)
+        return self.news_items[start:end]
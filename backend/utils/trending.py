@@ -0,0 +1,124 @@
+import heapq
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+from utils.date_utils import parse_published_date
+
+def trending_key(relevance: float, published_ts: float, decay_rate: float) -> float:
+    """
+    Time-independent rank of an article by trending score
+
+    The trending score (1 + relevance) * exp(-decay_rate * age) is, in log
+    space, log(1 + relevance) + decay_rate * published_ts - decay_rate * now.
+    The last term is the same for every article, so the rest orders
+    articles at any time and never has to be recomputed as they age.
+    """
+    return math.log1p(max(relevance, 0)) + decay_rate * published_ts
+
+class TrendingIndex:
+    """
+    Articles ordered by time-decayed trending score
+
+    Keys are kept in a binary heap. top(k) walks the heap from the root with
+    a small frontier heap and stops after k articles, so it costs O(k log k)
+    whatever the number of articles. Removed articles are skipped lazily and
+    the heap is rebuilt once they make up half of it.
+    """
+
+    def __init__(self, half_life: Optional[float] = None):
+        """
+        Args:
+            half_life: Seconds after which a score has halved, defaults to Config.TRENDING_HALF_LIFE
+        """
+        self.half_life = half_life or Config.TRENDING_HALF_LIFE
+        self.decay_rate = math.log(2) / self.half_life
+        self._lock = threading.Lock()
+        # Max-heap as a min-heap of negated keys: (-key, sequence, article key)
+        self._heap: List[Tuple[float, int, str]] = []
+        # article key -> (sequence, relevance, published_ts, news item)
+        self._entries: Dict[str, Tuple[int, float, float, Dict[str, Any]]] = {}
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _score_inputs(self, news: Dict[str, Any], now: float) -> Tuple[float, float]:
+        # Scored by the scraper at ingest
+        relevance = news.get('relevance_score') or 0
+        published_ts = news.get('published_ts')
+        if published_ts is None:
+            published_ts = parse_published_date(news.get('published_date'))
+        # Undated articles count as published when first seen, and nothing is newer than now
+        return relevance, min(published_ts if published_ts is not None else now, now)
+
+    def sync(self, news_items: Iterable[Tuple[str, Dict[str, Any]]], now: Optional[float] = None) -> None:
+        """
+        Make the index hold exactly these articles
+
+        Articles already indexed keep their key, so only new ones are scored.
+
+        Args:
+            news_items: (article key, news item) pairs
+            now: Current time, defaults to time.time()
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            current = dict(news_items)
+            for key in [key for key in self._entries if key not in current]:
+                del self._entries[key]
+
+            for key, news in current.items():
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries[key] = entry[:3] + (news,)
+                    continue
+                relevance, published_ts = self._score_inputs(news, now)
+                self._sequence += 1
+                self._entries[key] = (self._sequence, relevance, published_ts, news)
+                heapq.heappush(
+                    self._heap,
+                    (-trending_key(relevance, published_ts, self.decay_rate), self._sequence, key)
+                )
+
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = [item for item in self._heap if self._is_live(item)]
+                heapq.heapify(self._heap)
+
+    def _is_live(self, heap_item: Tuple[float, int, str]) -> bool:
+        entry = self._entries.get(heap_item[2])
+        return entry is not None and entry[0] == heap_item[1]
+
+    def top(self, k: int, now: Optional[float] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Get the k articles with the highest trending score
+
+        Args:
+            k: Number of articles
+            now: Time the scores are computed for, defaults to time.time()
+
+        Returns:
+            (trending score, news item) pairs, highest first
+        """
+        now = now if now is not None else time.time()
+        results = []
+        with self._lock:
+            heap = self._heap
+            frontier = [(heap[0], 0)] if heap else []
+            while frontier and len(results) < k:
+                heap_item, position = heapq.heappop(frontier)
+                for child in (2 * position + 1, 2 * position + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], child))
+                if not self._is_live(heap_item):
+                    continue
+                _, relevance, published_ts, news = self._entries[heap_item[2]]
+                results.append((self.score(relevance, published_ts, now), news))
+        return results
+
+    def score(self, relevance: float, published_ts: float, now: Optional[float] = None) -> float:
+        """Trending score of an article at a point in time"""
+        now = now if now is not None else time.time()
+        return (1 + max(relevance, 0)) * math.exp(-self.decay_rate * max(now - published_ts, 0))
@@ -0,0 +1,55 @@
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'ref_src'}
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize an article URL so the same article always maps to the same key
+
+    Lowercases the scheme and host, drops default ports, fragments and
+    tracking parameters, sorts the query and removes a trailing slash.
+
+    Args:
+        url: Article URL
+
+    Returns:
+        Normalized URL, or the stripped input if it cannot be parsed
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if port and DEFAULT_PORTS.get(scheme) != port:
+        host = f"{host}:{port}"
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+def url_fingerprint(url: str) -> str:
+    """
+    Short stable identifier of an article, derived from its normalized URL
+
+    Args:
+        url: Article URL
+
+    Returns:
+        16 hex characters of the SHA-1 of the normalized URL
+    """
+    return hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()[:16]
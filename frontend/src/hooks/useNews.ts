@@ -1,5 +1,6 @@
+import { useEffect, useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { apiService, NewsItem, NewsResponse, NewsSummary } from '@/lib/api';
+import { apiService, NewsItem, NewsResponse, NewsSummary, SourceStatus } from '@/lib/api';
 
 // Query keys for React Query
 export const newsKeys = {
@@ -13,21 +14,107 @@ export const newsKeys = {
   sources: () => [...newsKeys.all, 'sources'] as const,
 };
 
-// Hook for getting latest news
+// Key the backend identifies an article by in delta responses
+export const newsItemKey = (item: NewsItem) => item.fingerprint || item.url || item.title;
+
+// Apply a since_cursor response to the articles already loaded
+export const mergeNewsDelta = (previous: NewsResponse, delta: NewsResponse, limit: number): NewsResponse => {
+  if (delta.changed === false) {
+    return { ...previous, cursor: delta.cursor, timestamp: delta.timestamp };
+  }
+  if (delta.reset) {
+    return delta;
+  }
+
+  const replaced = new Set([...(delta.removed ?? []), ...delta.data.map(newsItemKey)]);
+  const data = [...delta.data, ...previous.data.filter((item) => !replaced.has(newsItemKey(item)))]
+    .sort((a, b) => (b.published_ts ?? 0) - (a.published_ts ?? 0))
+    .slice(0, limit);
+  return { ...delta, data, count: data.length };
+};
+
+// Hook for getting latest news; refetches only download what changed
 export const useLatestNews = (params?: {
   category?: 'tech' | 'programming' | 'interview';
   limit?: number;
   source?: string;
   use_cache?: boolean;
 }) => {
+  const queryClient = useQueryClient();
+  const queryKey = newsKeys.latest(params);
+
   return useQuery({
-    queryKey: newsKeys.latest(params),
-    queryFn: () => apiService.getLatestNews(params),
+    queryKey,
+    queryFn: async () => {
+      const previous = queryClient.getQueryData<NewsResponse>(queryKey);
+      if (!previous?.cursor) {
+        return apiService.getLatestNews(params);
+      }
+      const delta = await apiService.getLatestNews({ ...params, since_cursor: previous.cursor });
+      return mergeNewsDelta(previous, delta, params?.limit ?? 50);
+    },
     staleTime: 5 * 60 * 1000, // 5 minutes
     gcTime: 10 * 60 * 1000, // 10 minutes
   });
 };
 
+// Hook for streaming latest news, showing each source as soon as it arrives
+export const useStreamingNews = (params?: {
+  category?: 'tech' | 'programming' | 'interview';
+  limit?: number;
+}) => {
+  const [items, setItems] = useState<NewsItem[]>([]);
+  const [sourceStatus, setSourceStatus] = useState<Record<string, SourceStatus>>({});
+  const [isLoading, setIsLoading] = useState(true);
+  const [error, setError] = useState<Error | null>(null);
+  const category = params?.category;
+  const limit = params?.limit;
+
+  useEffect(() => {
+    const controller = new AbortController();
+    setItems([]);
+    setSourceStatus({});
+    setIsLoading(true);
+    setError(null);
+
+    apiService
+      .streamLatestNews(
+        (record) => {
+          if (record.type === 'source') {
+            setItems((previous) =>
+              [...previous, ...record.data].sort((a, b) => (b.published_ts ?? 0) - (a.published_ts ?? 0))
+            );
+            setSourceStatus((previous) => ({ ...previous, [record.source]: record.status }));
+          } else if (record.type === 'summary') {
+            setSourceStatus(record.source_status);
+            setIsLoading(false);
+          } else {
+            setError(new Error(record.detail));
+            setIsLoading(false);
+          }
+        },
+        { category, limit },
+        controller.signal
+      )
+      .catch((err) => {
+        if (!controller.signal.aborted) {
+          setError(err);
+          setIsLoading(false);
+        }
+      });
+
+    return () => controller.abort();
+  }, [category, limit]);
+
+  return {
+    data: items,
+    sourceStatus,
+    isLoading,
+    isError: error !== null,
+    error,
+  };
+};
+
 // Hook for getting news by category
 export const useNewsByCategory = (
   category: 'tech' | 'programming' | 'interview',
@@ -7,19 +7,35 @@ export interface NewsItem {
   description: string;
   url: string;
   published_date: string;
+  published_ts?: number | null;
   source: string;
   category: string;
   source_name?: string;
   author?: string;
   relevance_score?: number;
+  score?: number;
+  trending_score?: number;
   image_url?: string;
+  fingerprint?: string;
+  also_on?: Array<Pick<NewsItem, 'source' | 'title' | 'url' | 'source_name'>>;
 }
 
+export type SourceStatus = 'ok' | 'pending' | 'timed_out' | 'error';
+
 export interface NewsResponse {
   success: boolean;
   data: NewsItem[];
+  cursor?: string;
+  // Set on responses to since_cursor requests
+  changed?: boolean;
+  reset?: boolean;
+  removed?: string[];
   cached?: boolean;
+  stale?: boolean;
+  version?: number;
+  source_status?: Record<string, SourceStatus>;
   count?: number;
+  total?: number;
   timestamp: string;
 }
 
@@ -28,10 +44,17 @@ export interface NewsSummary {
   total_articles: number;
   sources: Record<string, {
     count: number;
+    status?: SourceStatus;
     categories: Record<string, number>;
   }>;
 }
 
+// Records sent by /api/v1/news/latest/stream, one per source and a final summary
+export type NewsStreamRecord =
+  | { type: 'source'; source: string; status: SourceStatus; count: number; data: NewsItem[] }
+  | { type: 'summary'; count: number; source_status: Record<string, SourceStatus>; version: number | null; timestamp: string }
+  | { type: 'error'; detail: string };
+
 export interface NewsSource {
   name: string;
   url: string;
@@ -75,6 +98,9 @@ class ApiService {
     limit?: number;
     source?: string;
     use_cache?: boolean;
+    since?: number | string;
+    until?: number | string;
+    since_cursor?: string;
   }): Promise<NewsResponse> {
     const searchParams = new URLSearchParams();
     
@@ -82,11 +108,58 @@ class ApiService {
     if (params?.limit) searchParams.append('limit', params.limit.toString());
     if (params?.source) searchParams.append('source', params.source);
     if (params?.use_cache !== undefined) searchParams.append('use_cache', params.use_cache.toString());
+    if (params?.since !== undefined) searchParams.append('since', params.since.toString());
+    if (params?.until !== undefined) searchParams.append('until', params.until.toString());
+    if (params?.since_cursor) searchParams.append('since_cursor', params.since_cursor);
 
     const endpoint = `/api/v1/news/latest${searchParams.toString() ? `?${searchParams.toString()}` : ''}`;
     return this.makeRequest<NewsResponse>(endpoint);
   }
 
+  // Stream latest news as NDJSON, calling onRecord as each source arrives
+  async streamLatestNews(
+    onRecord: (record: NewsStreamRecord) => void,
+    params?: {
+      category?: 'tech' | 'programming' | 'interview';
+      limit?: number;
+    },
+    signal?: AbortSignal
+  ): Promise<void> {
+    const searchParams = new URLSearchParams();
+
+    if (params?.category) searchParams.append('category', params.category);
+    if (params?.limit) searchParams.append('limit', params.limit.toString());
+
+    const endpoint = `/api/v1/news/latest/stream${searchParams.toString() ? `?${searchParams.toString()}` : ''}`;
+    const response = await fetch(`${this.baseUrl}${endpoint}`, {
+      headers: { Accept: 'application/x-ndjson' },
+      signal,
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      // Hand over every complete line, keep the partial one for the next chunk
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop() ?? '';
+      for (const line of lines) {
+        if (line.trim()) onRecord(JSON.parse(line));
+      }
+    }
+
+    if (buffer.trim()) onRecord(JSON.parse(buffer));
+  }
+
   // Get news by category
   async getNewsByCategory(category: 'tech' | 'programming' | 'interview', limit: number = 50): Promise<NewsResponse> {
     return this.makeRequest<NewsResponse>(`/api/v1/news/category/${category}?limit=${limit}`);